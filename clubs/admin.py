@@ -146,13 +146,13 @@ class ClubAdmin(admin.ModelAdmin):
             club.save()
             
             # Send notification to club president
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=club.president,
-                notification_type='club',
+            from notifications.services import notify
+            notify(
+                club.president,
+                'club',
                 title='Club Approved',
                 message=f'Your club "{club.name}" has been approved and is now active!',
-                related_id=club.id
+                target=club
             )
             
             messages.success(request, f'Club "{club.name}" approved successfully.')
@@ -169,13 +169,13 @@ class ClubAdmin(admin.ModelAdmin):
             club.save()
             
             # Send notification to club president
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=club.president,
-                notification_type='club',
+            from notifications.services import notify
+            notify(
+                club.president,
+                'club',
                 title='Club Rejected',
                 message=f'Your club "{club.name}" has been rejected.',
-                related_id=club.id
+                target=club
             )
             
             messages.success(request, f'Club "{club.name}" rejected.')
@@ -214,15 +214,15 @@ class ClubMembershipRequestAdmin(admin.ModelAdmin):
         )
         
         # Add users to clubs
-        for request_obj in queryset.filter(status='approved'):
+        from notifications.services import notify
+        for request_obj in queryset.filter(status='approved').select_related('club', 'user'):
             request_obj.club.members.add(request_obj.user)
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=request_obj.user,
-                notification_type='club',
+            notify(
+                request_obj.user,
+                'club',
                 title='Membership Approved',
                 message=f'Your membership request for {request_obj.club.name} has been approved.',
-                related_id=request_obj.club.id
+                target=request_obj.club
             )
         
         self.message_user(request, f'{updated} membership request(s) approved.')
@@ -235,14 +235,14 @@ class ClubMembershipRequestAdmin(admin.ModelAdmin):
         )
         
         # Notify users
-        for request_obj in queryset.filter(status='rejected'):
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=request_obj.user,
-                notification_type='club',
+        from notifications.services import notify
+        for request_obj in queryset.filter(status='rejected').select_related('club'):
+            notify(
+                request_obj.user_id,
+                'club',
                 title='Membership Rejected',
                 message=f'Your membership request for {request_obj.club.name} has been rejected.',
-                related_id=request_obj.club.id
+                target=request_obj.club
             )
         
         self.message_user(request, f'{updated} membership request(s) rejected.')
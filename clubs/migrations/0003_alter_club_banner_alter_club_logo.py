@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:40
+
+import uploads.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='club',
+            name='banner',
+            field=models.ImageField(blank=True, null=True, storage=uploads.storage.get_blob_storage, upload_to='club_banners/'),
+        ),
+        migrations.AlterField(
+            model_name='club',
+            name='logo',
+            field=models.ImageField(blank=True, null=True, storage=uploads.storage.get_blob_storage, upload_to='club_logos/'),
+        ),
+    ]
@@ -4,6 +4,7 @@
 from django.db import models
 from users.models import User
 from django.utils import timezone
+from uploads.storage import get_blob_storage
 
 class Club(models.Model):
     STATUS_CHOICES = [
@@ -17,8 +18,8 @@ class Club(models.Model):
     description = models.TextField()
     president = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='clubs_presiding')
     faculty_advisor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='clubs_advising')
-    logo = models.ImageField(upload_to='club_logos/', blank=True, null=True)
-    banner = models.ImageField(upload_to='club_banners/', blank=True, null=True)
+    logo = models.ImageField(upload_to='club_logos/', storage=get_blob_storage, blank=True, null=True)
+    banner = models.ImageField(upload_to='club_banners/', storage=get_blob_storage, blank=True, null=True)
     members = models.ManyToManyField(User, related_name='clubs_joined', blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     category = models.CharField(max_length=100, blank=True)  # Academic, Cultural, Sports, etc.
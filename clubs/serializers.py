@@ -3,6 +3,7 @@
 from rest_framework import serializers
 from .models import Club, ClubMembershipRequest, ClubRole
 from users.serializers import UserBasicSerializer
+from uploads.serializers import ImageSizesField
 from users.models import User  # Add this import
 from django.utils import timezone
 
@@ -34,6 +35,8 @@ class ClubSerializer(serializers.ModelSerializer):
     is_member = serializers.SerializerMethodField()
     can_manage = serializers.SerializerMethodField()
     executive_members = serializers.SerializerMethodField()
+    logo_sizes = ImageSizesField('logo', source='logo')
+    banner_sizes = ImageSizesField('banner', source='banner')
 
     class Meta:
         model = Club
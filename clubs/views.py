@@ -16,7 +16,7 @@ from .serializers import (
 )
 from users.serializers import UserBasicSerializer
 from users.models import User
-from notifications.models import Notification
+from notifications.services import notify, notify_users
 import json
 
 class ClubListCreateView(generics.ListCreateAPIView):
@@ -80,12 +80,12 @@ class ClubListCreateView(generics.ListCreateAPIView):
         
         # Notify faculty advisor if provided
         if club.faculty_advisor:
-            Notification.objects.create(
-                user=club.faculty_advisor,
-                notification_type='club',
+            notify(
+                club.faculty_advisor,
+                'club',
                 title='New Club Created',
                 message=f'You have been assigned as faculty advisor for {club.name}',
-                related_id=club.id
+                target=club
             )
 
 class ClubDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -149,15 +149,13 @@ class JoinClubView(APIView):
                 )
             
             # Notify club president and faculty advisor
-            for user in [club.president, club.faculty_advisor]:
-                if user:
-                    Notification.objects.create(
-                        user=user,
-                        notification_type='club',
-                        title='New Membership Request',
-                        message=f'{request.user.get_full_name()} wants to join {club.name}',
-                        related_id=club.id
-                    )
+            notify_users(
+                [club.president_id, club.faculty_advisor_id],
+                'club',
+                title='New Membership Request',
+                message=f'{request.user.get_full_name()} wants to join {club.name}',
+                target=club
+            )
             
             return Response({
                 'status': 'pending_approval',
@@ -173,12 +171,12 @@ class JoinClubView(APIView):
                 assigned_by=request.user
             )
             
-            Notification.objects.create(
-                user=request.user,
-                notification_type='club',
+            notify(
+                request.user,
+                'club',
                 title='Joined Club',
                 message=f'You have successfully joined {club.name}',
-                related_id=club.id
+                target=club
             )
             
             return Response({
@@ -277,12 +275,12 @@ class ProcessMembershipRequestView(APIView):
             )
             
             # Notify user
-            Notification.objects.create(
-                user=membership_request.user,
-                notification_type='club',
+            notify(
+                membership_request.user,
+                'club',
                 title='Membership Approved',
                 message=f'Your membership request for {club.name} has been approved',
-                related_id=club.id
+                target=club
             )
             
             return Response({'status': 'approved'})
@@ -294,12 +292,12 @@ class ProcessMembershipRequestView(APIView):
             membership_request.save()
             
             # Notify user
-            Notification.objects.create(
-                user=membership_request.user,
-                notification_type='club',
+            notify(
+                membership_request.user,
+                'club',
                 title='Membership Rejected',
                 message=f'Your membership request for {club.name} has been rejected',
-                related_id=club.id
+                target=club
             )
             
             return Response({'status': 'rejected'})
@@ -356,12 +354,12 @@ class AdminClubApprovalView(APIView):
             club.save()
             
             # Notify club president
-            Notification.objects.create(
-                user=club.president,
-                notification_type='club',
+            notify(
+                club.president,
+                'club',
                 title='Club Approved',
                 message=f'Your club {club.name} has been approved and is now active',
-                related_id=club.id
+                target=club
             )
             
             return Response({
@@ -375,12 +373,12 @@ class AdminClubApprovalView(APIView):
             club.save()
             
             # Notify club president
-            Notification.objects.create(
-                user=club.president,
-                notification_type='club',
+            notify(
+                club.president,
+                'club',
                 title='Club Rejected',
                 message=f'Your club {club.name} has been rejected. Reason: {reason}',
-                related_id=club.id
+                target=club
             )
             
             return Response({'status': 'rejected'})
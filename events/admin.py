@@ -1,10 +1,26 @@
 from django.contrib import admin
-from .models import Event
+from .models import Event, EventOccurrenceException, EventOccurrenceRSVP, EventCheckIn
+
+class EventOccurrenceExceptionInline(admin.TabularInline):
+    model = EventOccurrenceException
+    extra = 0
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'event_type', 'club', 'organizer', 'start_date', 'end_date', 'is_active', 'attendee_count', 'is_full')
-    list_filter = ('event_type', 'club', 'is_active')
+    list_filter = ('event_type', 'club', 'is_active', 'recurrence')
     search_fields = ('title', 'description', 'organizer__email', 'club__name')
     readonly_fields = ('created_at', 'updated_at', 'attendee_count', 'is_full')
     filter_horizontal = ('attendees',)
+    inlines = [EventOccurrenceExceptionInline]
+
+@admin.register(EventOccurrenceRSVP)
+class EventOccurrenceRSVPAdmin(admin.ModelAdmin):
+    list_display = ('event', 'occurrence_start', 'user', 'created_at')
+    search_fields = ('event__title', 'user__email')
+
+@admin.register(EventCheckIn)
+class EventCheckInAdmin(admin.ModelAdmin):
+    list_display = ('event', 'occurrence_start', 'user', 'checked_in_by', 'checked_in_at')
+    list_filter = ('event',)
+    search_fields = ('event__title', 'user__email')
\ No newline at end of file
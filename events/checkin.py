@@ -0,0 +1,204 @@
+# unitribe_server/events/checkin.py
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+
+from .models import Event, EventCheckIn
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = 'events.checkin'
+TOKEN_GRACE = timedelta(hours=6)
+SEEN_TIMEOUT = 60 * 60 * 24
+
+class InvalidCheckInToken(Exception):
+    pass
+
+_signer = signing.Signer(salt=TOKEN_SALT, algorithm='sha256')
+
+# ============ TOKENS ============
+def make_token(event, user_id, occurrence_start):
+    """
+    Signed per-attendee check-in token, rendered as a QR code by the client.
+
+    The payload carries everything needed to record the check-in, so the
+    door scanner never has to read the attendee or the RSVP from the database.
+    """
+    expires = occurrence_start + (event.end_date - event.start_date) + TOKEN_GRACE
+    value = f"{event.id}.{user_id}.{int(occurrence_start.timestamp())}.{int(expires.timestamp())}"
+    return _signer.sign(value)
+
+def verify_token(token):
+    """Return (event_id, user_id, occurrence_start) for a valid token"""
+    try:
+        value = _signer.unsign(token)
+        event_id, user_id, occurrence_ts, expires_ts = (int(part) for part in value.split('.'))
+    except (signing.BadSignature, ValueError):
+        raise InvalidCheckInToken('Invalid check-in token')
+
+    if time.time() > expires_ts:
+        raise InvalidCheckInToken('Check-in token has expired')
+
+    occurrence_start = datetime.fromtimestamp(occurrence_ts, tz=dt_timezone.utc)
+    return event_id, user_id, occurrence_start
+
+# ============ ATTENDANCE COUNTER ============
+def _occurrence_key(event_id, occurrence_start):
+    return f"{event_id}:{int(occurrence_start.timestamp())}"
+
+def attendance_count(event_id, occurrence_start):
+    key = f"checkin:count:{_occurrence_key(event_id, occurrence_start)}"
+    count = cache.get(key)
+    if count is None:
+        # Pending rows are not in the table yet - flush them first so a
+        # cold counter starts from the real total
+        checkin_buffer.flush()
+        # Tokens carry whole seconds, so match the occurrence to the second
+        second = datetime.fromtimestamp(int(occurrence_start.timestamp()), tz=dt_timezone.utc)
+        count = EventCheckIn.objects.filter(
+            event_id=event_id,
+            occurrence_start__gte=second,
+            occurrence_start__lt=second + timedelta(seconds=1)
+        ).count()
+        cache.add(key, count, timeout=SEEN_TIMEOUT)
+        count = cache.get(key, count)
+    return count
+
+def _seen_key(event_id, user_id, occurrence_start):
+    return f"checkin:seen:{_occurrence_key(event_id, occurrence_start)}:{user_id}"
+
+def _increment_attendance(event_id, occurrence_start):
+    key = f"checkin:count:{_occurrence_key(event_id, occurrence_start)}"
+    try:
+        return cache.incr(key)
+    except ValueError:
+        return attendance_count(event_id, occurrence_start)
+
+# ============ BATCHED WRITES ============
+class CheckInBuffer:
+    """
+    Collects check-ins in memory and writes them with one bulk INSERT per
+    batch. Duplicate scans are absorbed by the unique constraint
+    (ignore_conflicts), which keeps writes idempotent across workers. A
+    batch with a row that cannot be written (e.g. its user or event was
+    deleted) is retried row by row, and the failed check-ins are forgotten
+    so a rescan records them again. When the write itself fails (e.g. the
+    database is unreachable) the batch goes back in the buffer for the next
+    flush.
+    """
+
+    def __init__(self, batch_size, flush_interval):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def _schedule(self):
+        # Called with the lock held
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def add(self, checkin):
+        with self._lock:
+            self._pending.append(checkin)
+            full = len(self._pending) >= self.batch_size
+            if not full:
+                self._schedule()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if batch:
+            try:
+                self._write(batch)
+            except Exception:
+                # Their seen keys are set, so dropping them would turn every
+                # rescan into already_checked_in. Rows written before the
+                # failure are absorbed by ignore_conflicts on the retry.
+                with self._lock:
+                    self._pending[:0] = batch
+                    self._schedule()
+                logger.exception('Could not write %d check-ins, keeping them for the next flush', len(batch))
+                raise
+        return len(batch)
+
+    def _write(self, batch):
+        try:
+            with transaction.atomic():
+                EventCheckIn.objects.bulk_create(batch, batch_size=self.batch_size, ignore_conflicts=True)
+        except IntegrityError:
+            for checkin in batch:
+                try:
+                    with transaction.atomic():
+                        EventCheckIn.objects.bulk_create([checkin], ignore_conflicts=True)
+                except IntegrityError:
+                    _forget_checkin(checkin)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread opened its own connection
+            connection.close()
+
+    def __len__(self):
+        return len(self._pending)
+
+def _forget_checkin(checkin):
+    """Undo what record_checkin cached for a check-in that was never written"""
+    cache.delete(_seen_key(checkin.event_id, checkin.user_id, checkin.occurrence_start))
+    try:
+        cache.decr(f"checkin:count:{_occurrence_key(checkin.event_id, checkin.occurrence_start)}")
+    except ValueError:
+        pass
+
+checkin_buffer = CheckInBuffer(
+    batch_size=getattr(settings, 'EVENT_CHECKIN_BATCH_SIZE', 200),
+    flush_interval=getattr(settings, 'EVENT_CHECKIN_FLUSH_INTERVAL', 2.0),
+)
+atexit.register(checkin_buffer.flush)
+
+def record_checkin(event_id, user_id, occurrence_start, scanned_by_id, checked_in_at):
+    """
+    Queue a check-in. Returns (created, attendance_count); `created` is False
+    when this attendee was already checked in to the occurrence.
+    """
+    seen_key = _seen_key(event_id, user_id, occurrence_start)
+    if not cache.add(seen_key, 1, timeout=SEEN_TIMEOUT):
+        return False, attendance_count(event_id, occurrence_start)
+
+    checkin_buffer.add(EventCheckIn(
+        event_id=event_id,
+        user_id=user_id,
+        occurrence_start=occurrence_start,
+        checked_in_by_id=scanned_by_id,
+        checked_in_at=checked_in_at,
+    ))
+    return True, _increment_attendance(event_id, occurrence_start)
+
+# ============ SCANNER PERMISSIONS ============
+def event_organizer_id(event_id):
+    """Organizer of an event, cached so scanning does not re-read the event"""
+    key = f"checkin:organizer:{event_id}"
+    organizer_id = cache.get(key)
+    if organizer_id is None:
+        organizer_id = Event.objects.filter(id=event_id).values_list('organizer_id', flat=True).first()
+        if organizer_id is not None:
+            cache.set(key, organizer_id, timeout=SEEN_TIMEOUT)
+    return organizer_id
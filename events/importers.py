@@ -0,0 +1,268 @@
+# unitribe_server/events/importers.py
+
+import csv
+import io
+from datetime import datetime, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Event
+from .recurrence import nth_occurrence_start
+from .serializers import EventImportRowSerializer
+from notifications.services import notify_users
+
+MAX_IMPORT_ROWS = 2000
+
+class ImportFormatError(Exception):
+    pass
+
+# ============ CSV ============
+CSV_COLUMNS = ('title', 'description', 'event_type', 'start_date', 'end_date', 'location',
+               'max_participants', 'recurrence', 'recurrence_interval', 'recurrence_until')
+
+def parse_csv(text):
+    """Rows from a CSV with a header line using the EventCreateSerializer field names"""
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or not {'title', 'start_date', 'end_date'} <= set(reader.fieldnames):
+        raise ImportFormatError('CSV must have at least title, start_date and end_date columns')
+
+    rows = []
+    for row in reader:
+        rows.append({
+            key: value.strip()
+            for key, value in row.items()
+            if key in CSV_COLUMNS and value is not None and value.strip() != ''
+        })
+    return rows
+
+# ============ ICS ============
+ICS_FREQUENCIES = {'DAILY': 'daily', 'WEEKLY': 'weekly', 'MONTHLY': 'monthly'}
+ICS_WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+# RRULE parts the recurrence fields can represent; WKST only matters with several BYDAY days
+RRULE_PARTS = {'FREQ', 'INTERVAL', 'UNTIL', 'COUNT', 'BYDAY', 'WKST'}
+
+def _unfold(text):
+    lines = []
+    for line in text.splitlines():
+        if line[:1] in (' ', '\t') and lines:
+            lines[-1] += line[1:]
+        elif line:
+            lines.append(line)
+    return lines
+
+def _unescape(value):
+    return (value.replace('\\n', '\n').replace('\\N', '\n')
+                 .replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\'))
+
+def _parse_ics_datetime(value, params):
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        parsed = datetime.strptime(value[:8], '%Y%m%d')
+    else:
+        parsed = datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+
+    if value.endswith('Z'):
+        return parsed.replace(tzinfo=dt_timezone.utc).isoformat()
+    if 'TZID' in params:
+        try:
+            return parsed.replace(tzinfo=ZoneInfo(params['TZID'])).isoformat()
+        except ZoneInfoNotFoundError:
+            pass
+    # Floating time - interpreted in the server timezone
+    return timezone.make_aware(parsed).isoformat()
+
+def _add_error(row, message):
+    row.setdefault('_errors', []).append(message)
+
+def _parse_rrule(value, row):
+    """
+    Rules the series fields can hold exactly, or a row error - an RRULE
+    imported only in part would create the wrong events forever
+    """
+    parts = dict(part.split('=', 1) for part in value.split(';') if '=' in part)
+    unsupported = sorted(set(parts) - RRULE_PARTS)
+    if unsupported:
+        _add_error(row, f"Unsupported RRULE parts: {', '.join(unsupported)}")
+        return
+    frequency = ICS_FREQUENCIES.get(parts.get('FREQ'))
+    if not frequency:
+        _add_error(row, f"Unsupported RRULE frequency: {parts.get('FREQ')}")
+        return
+    if 'UNTIL' in parts and 'COUNT' in parts:
+        _add_error(row, 'RRULE cannot have both UNTIL and COUNT')
+        return
+    row['recurrence'] = frequency
+    if 'INTERVAL' in parts:
+        row['recurrence_interval'] = parts['INTERVAL']
+    if 'UNTIL' in parts:
+        try:
+            row['recurrence_until'] = _parse_ics_datetime(parts['UNTIL'], {})
+        except ValueError:
+            _add_error(row, f"Invalid RRULE UNTIL: {parts['UNTIL']}")
+    # COUNT and BYDAY depend on DTSTART, which may come later in the VEVENT
+    row['_rrule'] = parts
+
+def _finish_rrule(row):
+    parts = row.pop('_rrule', None)
+    if parts is None or row.get('_errors'):
+        return
+    try:
+        start = datetime.fromisoformat(row['start_date'])
+    except (KeyError, ValueError):
+        # Missing DTSTART is reported by the serializer
+        return
+
+    if 'BYDAY' in parts:
+        days = parts['BYDAY'].split(',')
+        if row['recurrence'] != 'weekly':
+            _add_error(row, 'RRULE BYDAY is only supported for weekly events')
+        elif len(days) > 1:
+            _add_error(row, f"RRULE BYDAY with several days is not supported: {parts['BYDAY']}")
+        elif days[0] != ICS_WEEKDAYS[start.weekday()]:
+            _add_error(row, f"RRULE BYDAY={days[0]} does not match the start date's weekday ({ICS_WEEKDAYS[start.weekday()]})")
+
+    if 'COUNT' in parts:
+        try:
+            count = int(parts['COUNT'])
+            interval = int(parts.get('INTERVAL', 1))
+        except ValueError:
+            count = interval = 0
+        if count < 1 or interval < 1:
+            _add_error(row, f"Invalid RRULE COUNT: {parts['COUNT']}")
+            return
+        # The series ends at the start of its COUNT-th occurrence
+        series = Event(start_date=start, recurrence=row['recurrence'], recurrence_interval=interval)
+        row['recurrence_until'] = nth_occurrence_start(series, count - 1).isoformat()
+
+def parse_ics(text):
+    """Rows from the VEVENT components of an iCalendar file"""
+    rows = []
+    row = None
+    for line in _unfold(text):
+        name_part, _, value = line.partition(':')
+        name, *param_parts = name_part.split(';')
+        params = dict(param.split('=', 1) for param in param_parts if '=' in param)
+        name = name.upper()
+
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            row = {}
+        elif name == 'END' and value.upper() == 'VEVENT':
+            if row is not None:
+                _finish_rrule(row)
+                rows.append(row)
+            row = None
+        elif row is None:
+            continue
+        elif name == 'SUMMARY':
+            row['title'] = _unescape(value)
+        elif name == 'DESCRIPTION':
+            row['description'] = _unescape(value)
+        elif name == 'LOCATION':
+            row['location'] = _unescape(value)
+        elif name == 'CATEGORIES':
+            row['event_type'] = _unescape(value).split(',')[0].strip().lower()
+        elif name in ('DTSTART', 'DTEND'):
+            try:
+                parsed = _parse_ics_datetime(value, params)
+            except ValueError:
+                _add_error(row, f'Invalid {name}: {value}')
+                continue
+            row['start_date' if name == 'DTSTART' else 'end_date'] = parsed
+        elif name == 'RRULE':
+            _parse_rrule(value, row)
+        elif name in ('EXDATE', 'RDATE'):
+            # Series have no per-date additions or exclusions on import
+            _add_error(row, f'{name} is not supported')
+
+    if not rows and 'BEGIN:VCALENDAR' not in text.upper():
+        raise ImportFormatError('Not an iCalendar file')
+    return rows
+
+def parse_file(uploaded, file_format=None):
+    """Rows from an uploaded CSV or ICS file, format taken from the name if not given"""
+    name = getattr(uploaded, 'name', '') or ''
+    file_format = (file_format or name.rsplit('.', 1)[-1]).lower()
+    raw = uploaded.read()
+    text = raw.decode('utf-8-sig') if isinstance(raw, bytes) else raw
+
+    if file_format == 'csv':
+        return parse_csv(text)
+    if file_format in ('ics', 'ical'):
+        return parse_ics(text)
+    raise ImportFormatError('Unsupported format, expected csv or ics')
+
+# ============ IMPORT ============
+def validate_rows(rows, default_event_type='seminar'):
+    """
+    Validate every row in one pass. Returns (validated, errors) where errors
+    maps 1-based row numbers to serializer errors.
+    """
+    validated = []
+    errors = {}
+    for number, row in enumerate(rows, start=1):
+        if row.get('_errors'):
+            errors[number] = {'non_field_errors': row['_errors']}
+            continue
+        data = dict(row)
+        data.setdefault('event_type', default_event_type)
+        data.setdefault('description', '')
+        data.setdefault('location', '')
+        serializer = EventImportRowSerializer(data=data)
+        if serializer.is_valid():
+            validated.append(serializer.validated_data)
+        else:
+            errors[number] = serializer.errors
+    return validated, errors
+
+def import_events(rows, organizer, club=None, dry_run=False, default_event_type='seminar'):
+    """
+    Validate and bulk-create events. Nothing is written unless every row is
+    valid.
+
+    bulk_create does not send post_save, so the per-event notification loop
+    and reminder scheduling are skipped; club members instead get a single
+    digest notification for the whole import.
+    """
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise ImportFormatError(f'At most {MAX_IMPORT_ROWS} events can be imported at once')
+
+    validated, errors = validate_rows(rows, default_event_type)
+    result = {
+        'total_rows': len(rows),
+        'valid_rows': len(validated),
+        'errors': errors,
+        'created': 0,
+    }
+    if errors or dry_run or not validated:
+        return result
+
+    with transaction.atomic():
+        events = Event.objects.bulk_create([
+            Event(organizer=organizer, club=club, **data)
+            for data in validated
+        ])
+
+        # Auto-RSVP the organizer, as EventListCreateView.perform_create does
+        Attendance = Event.attendees.through
+        Attendance.objects.bulk_create([
+            Attendance(event_id=event.id, user_id=organizer.id)
+            for event in events
+        ])
+
+        if club:
+            message = f'{club.name} added {len(events)} new events'
+            if len(events) == 1:
+                message = f'{club.name} has a new event: {events[0].title}'
+            notify_users(
+                club.members.all(),
+                'club',
+                title='New Club Events',
+                message=message,
+                target=club,
+                exclude=[organizer]
+            )
+
+    result['created'] = len(events)
+    result['event_ids'] = [event.id for event in events]
+    return result
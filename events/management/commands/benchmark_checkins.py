@@ -0,0 +1,102 @@
+#unitribe_server/events/management/commands/benchmark_checkins.py
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from events.checkin import checkin_buffer, make_token
+from events.models import Event, EventCheckIn
+from events.views import EventCheckInView
+from users.models import User
+
+class Command(BaseCommand):
+    help = 'Benchmark door check-in throughput through EventCheckInView on a single worker'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=2000,
+            help='Number of attendees to check in (default: 2000)'
+        )
+        parser.add_argument(
+            '--duplicates',
+            type=float,
+            default=0.1,
+            help='Fraction of scans repeated, as when a QR code is scanned twice (default: 0.1)'
+        )
+        parser.add_argument(
+            '--target',
+            type=int,
+            default=300,
+            help='Check-ins per second to compare against (default: 300)'
+        )
+    
+    def handle(self, *args, **options):
+        count = options['count']
+        
+        # Everything runs in a transaction that is rolled back at the end,
+        # so the benchmark leaves no users, events or check-ins behind
+        with transaction.atomic():
+            organizer = User.objects.create_user(
+                email='checkin-bench-organizer@unitribe.invalid',
+                first_name='Bench',
+                last_name='Organizer',
+                role='faculty'
+            )
+            attendees = User.objects.bulk_create([
+                User(
+                    email=f'checkin-bench-{i}@unitribe.invalid',
+                    username=f'checkin-bench-{i}',
+                    password='!',
+                    student_id=f'bench-{i}'
+                )
+                for i in range(count)
+            ])
+            start = timezone.now() + timedelta(minutes=5)
+            event = Event.objects.create(
+                title='Check-in benchmark',
+                description='',
+                event_type='social',
+                organizer=organizer,
+                start_date=start,
+                end_date=start + timedelta(hours=2),
+                location='Main hall'
+            )
+            
+            tokens = [make_token(event, attendee.id, event.start_date) for attendee in attendees]
+            tokens += tokens[:int(len(tokens) * options['duplicates'])]
+            
+            factory = APIRequestFactory()
+            view = EventCheckInView.as_view()
+            requests = []
+            for token in tokens:
+                request = factory.post('/api/events/checkin/', {'token': token}, format='json')
+                force_authenticate(request, user=organizer)
+                requests.append(request)
+            
+            started = time.perf_counter()
+            statuses = {}
+            for request in requests:
+                response = view(request)
+                key = response.data.get('status', response.status_code)
+                statuses[key] = statuses.get(key, 0) + 1
+            checkin_buffer.flush()
+            elapsed = time.perf_counter() - started
+            
+            stored = EventCheckIn.objects.filter(event=event).count()
+            transaction.set_rollback(True)
+        
+        rate = len(requests) / elapsed
+        self.stdout.write(f"Scans: {len(requests)} in {elapsed:.2f}s ({rate:.0f}/s)")
+        self.stdout.write(f"Results: {statuses}")
+        self.stdout.write(f"Rows written: {stored} (expected {count})")
+        
+        if rate >= options['target'] and stored == count:
+            self.stdout.write(self.style.SUCCESS(f"Throughput meets the {options['target']}/s target"))
+        else:
+            self.stdout.write(self.style.ERROR(f"Throughput below the {options['target']}/s target"))
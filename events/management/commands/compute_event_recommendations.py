@@ -0,0 +1,35 @@
+#unitribe_server/events/management/commands/compute_event_recommendations.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from events.recommendations import compute_recommendations
+
+class Command(BaseCommand):
+    help = 'Recompute "for you" event recommendations from co-attendance and club memberships'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=20,
+            help='Recommendations to keep per user (default: 20)'
+        )
+        parser.add_argument(
+            '--history-days',
+            type=int,
+            default=365,
+            help='Days of past attendance used for similarity (default: 365)'
+        )
+    
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = compute_recommendations(
+            top_k=options['top_k'],
+            history_days=options['history_days']
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {written} recommendations in {elapsed:.1f}s"
+        ))
@@ -0,0 +1,78 @@
+#unitribe_server/events/management/commands/import_events.py
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clubs.models import Club
+from events.importers import ImportFormatError, import_events, parse_file
+from users.models import User
+
+class Command(BaseCommand):
+    help = 'Bulk import events from a CSV or ICS semester calendar'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or ICS file to import')
+        parser.add_argument(
+            '--organizer',
+            required=True,
+            help='Email of the user the events are created for'
+        )
+        parser.add_argument(
+            '--club',
+            type=int,
+            help='Club ID to attach the events to'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ics'],
+            help='File format (default: taken from the file extension)'
+        )
+        parser.add_argument(
+            '--event-type',
+            default='seminar',
+            help='Event type for rows that do not set one (default: seminar)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the file without creating events'
+        )
+    
+    def handle(self, *args, **options):
+        try:
+            organizer = User.objects.get(email=options['organizer'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['organizer']}")
+        
+        club = None
+        if options['club']:
+            try:
+                club = Club.objects.get(id=options['club'])
+            except Club.DoesNotExist:
+                raise CommandError(f"No club with id {options['club']}")
+        
+        try:
+            with open(options['path'], 'rb') as f:
+                rows = parse_file(f, options['format'])
+            result = import_events(
+                rows,
+                organizer=organizer,
+                club=club,
+                dry_run=options['dry_run'],
+                default_event_type=options['event_type']
+            )
+        except (OSError, ImportFormatError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+        
+        self.stdout.write(f"Rows: {result['total_rows']}, valid: {result['valid_rows']}")
+        
+        if result['errors']:
+            for number, errors in result['errors'].items():
+                self.stdout.write(self.style.ERROR(f"Row {number}: {json.dumps(errors)}"))
+            raise CommandError('Import aborted, no events were created')
+        
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('Dry run - file is valid, no events created'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Created {result['created']} events"))
@@ -2,11 +2,12 @@
 
 from django.core.management.base import BaseCommand
 from django.utils import timezone
+from notifications.counters import adjust_unread_count
 from notifications.models import Notification
 from events.models import Event
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
-import json
+from collections import Counter
 
 class Command(BaseCommand):
     help = 'Send scheduled event reminders'
@@ -20,40 +21,46 @@ class Command(BaseCommand):
             created_at__lte=now,
             title__contains='Reminder',
             is_read=False
-        )
+        ).select_related('user')
         
-        for reminder in reminders:
-            try:
-                # Send email reminder
-                event = Event.objects.get(id=reminder.related_id)
-                
-                subject = f'UniTribe Event Reminder: {event.title}'
-                message = f"""
-                Event Reminder:
-                
-                Title: {event.title}
-                Time: {event.start_date.strftime("%Y-%m-%d %H:%M")}
-                Location: {event.location}
-                Description: {event.description[:200]}...
-                
-                View event details: {settings.FRONTEND_URL}/events/{event.id}/
-                """
-                
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [reminder.user.email],
-                    fail_silently=False,
-                )
-                
-                # Mark as read
-                reminder.is_read = True
-                reminder.save()
-                
-                self.stdout.write(self.style.SUCCESS(f'Sent reminder to {reminder.user.email}'))
-                
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'Error sending reminder: {str(e)}'))
-
-
+        events = Event.objects.in_bulk({reminder.target_id for reminder in reminders})
+        sent_ids = []
+        sent_per_user = Counter()
+        
+        # One SMTP connection for every reminder, not one per email
+        with get_connection() as connection:
+            for reminder in reminders:
+                try:
+                    # Send email reminder
+                    event = events[reminder.target_id]
+                    
+                    subject = f'UniTribe Event Reminder: {event.title}'
+                    message = f"""
+                    Event Reminder:
+                    
+                    Title: {event.title}
+                    Time: {event.start_date.strftime("%Y-%m-%d %H:%M")}
+                    Location: {event.location}
+                    Description: {event.description[:200]}...
+                    
+                    View event details: {settings.FRONTEND_URL}/events/{event.id}/
+                    """
+                    
+                    connection.send_messages([EmailMessage(
+                        subject,
+                        message,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [reminder.user.email],
+                    )])
+                    sent_ids.append(reminder.id)
+                    sent_per_user[reminder.user_id] += 1
+                    
+                    self.stdout.write(self.style.SUCCESS(f'Sent reminder to {reminder.user.email}'))
+                    
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'Error sending reminder: {str(e)}'))
+        
+        # Mark as read
+        Notification.objects.filter(id__in=sent_ids).update(is_read=True)
+        for user_id, count in sent_per_user.items():
+            adjust_unread_count(user_id, -count)
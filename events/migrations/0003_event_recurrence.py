@@ -0,0 +1,62 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='recurrence',
+            field=models.CharField(choices=[('none', 'Does not repeat'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], default='none', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_interval',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='EventOccurrenceException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurrence_start', models.DateTimeField()),
+                ('is_cancelled', models.BooleanField(default=False)),
+                ('start_date', models.DateTimeField(blank=True, null=True)),
+                ('end_date', models.DateTimeField(blank=True, null=True)),
+                ('location', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrence_exceptions', to='events.event')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event', 'start_date'], name='events_even_event_i_985ff7_idx')],
+                'unique_together': {('event', 'occurrence_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='EventOccurrenceRSVP',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurrence_start', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrence_rsvps', to='events.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrence_rsvps', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('event', 'occurrence_start', 'user')},
+            },
+        ),
+    ]
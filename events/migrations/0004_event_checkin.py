@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_event_recurrence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventCheckIn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurrence_start', models.DateTimeField()),
+                ('checked_in_at', models.DateTimeField()),
+                ('checked_in_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='checkins_scanned', to=settings.AUTH_USER_MODEL)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkins', to='events.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_checkins', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-checked_in_at'],
+                'unique_together': {('event', 'occurrence_start', 'user')},
+            },
+        ),
+    ]
@@ -14,6 +14,13 @@ class Event(models.Model):
         ('seminar', 'Seminar'),
     ]
     
+    RECURRENCE_CHOICES = [
+        ('none', 'Does not repeat'),
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+    
     title = models.CharField(max_length=200)
     description = models.TextField()
     event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
@@ -25,6 +32,13 @@ class Event(models.Model):
     attendees = models.ManyToManyField(User, related_name='events_attending', blank=True)
     max_participants = models.IntegerField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
+    
+    # Recurrence rule - a recurring series is stored as a single row and its
+    # occurrences are expanded on read (see events/recurrence.py)
+    recurrence = models.CharField(max_length=10, choices=RECURRENCE_CHOICES, default='none')
+    recurrence_interval = models.PositiveSmallIntegerField(default=1)
+    recurrence_until = models.DateTimeField(null=True, blank=True)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -41,4 +55,76 @@ class Event(models.Model):
             return self.attendee_count >= self.max_participants
         return False
     
+    @property
+    def is_recurring(self):
+        return self.recurrence != 'none'
+    
+    def occurrence_attendee_count(self, occurrence_start):
+        return self.attendee_count + self.occurrence_rsvps.filter(
+            occurrence_start=occurrence_start
+        ).count()
 
+class EventOccurrenceException(models.Model):
+    """Cancellation or override of a single occurrence of a recurring event"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='occurrence_exceptions')
+    occurrence_start = models.DateTimeField()  # Original start of the occurrence
+    is_cancelled = models.BooleanField(default=False)
+    start_date = models.DateTimeField(null=True, blank=True)
+    end_date = models.DateTimeField(null=True, blank=True)
+    location = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['event', 'occurrence_start']
+        indexes = [
+            models.Index(fields=['event', 'start_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event} @ {self.occurrence_start}"
+
+class EventOccurrenceRSVP(models.Model):
+    """RSVP to a single occurrence of a recurring event"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='occurrence_rsvps')
+    occurrence_start = models.DateTimeField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='occurrence_rsvps')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['event', 'occurrence_start', 'user']
+    
+    def __str__(self):
+        return f"{self.user} -> {self.event} @ {self.occurrence_start}"
+
+
+class EventCheckIn(models.Model):
+    """Door check-in of an attendee, written in batches by events/checkin.py"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='checkins')
+    occurrence_start = models.DateTimeField()  # Event start for single events
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='event_checkins')
+    checked_in_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='checkins_scanned')
+    checked_in_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['event', 'occurrence_start', 'user']
+        ordering = ['-checked_in_at']
+    
+    def __str__(self):
+        return f"{self.user} checked in to {self.event}"
+
+class EventRecommendation(models.Model):
+    """Precomputed "for you" score, written by compute_event_recommendations"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='event_recommendations')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='recommendations')
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['user', 'event']
+        indexes = [
+            models.Index(fields=['user', '-score']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event} for {self.user} ({self.score:.3f})"
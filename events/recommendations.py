@@ -0,0 +1,111 @@
+# unitribe_server/events/recommendations.py
+
+import heapq
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Event, EventRecommendation
+from clubs.models import Club
+
+# Weight of "event is run by one of my clubs" relative to a perfectly
+# similar co-attended event
+CLUB_WEIGHT = 0.5
+
+def candidate_events_q(now):
+    """Events that can still be recommended - upcoming, or recurring with occurrences left"""
+    return Q(is_active=True) & (
+        Q(start_date__gte=now) |
+        (~Q(recurrence='none') & (Q(recurrence_until__isnull=True) | Q(recurrence_until__gte=now)))
+    )
+
+def _item_similarities(event_users, candidate_ids):
+    """
+    Cosine similarity between every candidate event and every event sharing
+    at least one attendee with it, from the sparse event x user matrix.
+
+    Only non-zero cells are visited: for each candidate j we walk its
+    attendees and their other events, which is the column slice of A^T A.
+    """
+    user_events = defaultdict(set)
+    for event_id, users in event_users.items():
+        for user_id in users:
+            user_events[user_id].add(event_id)
+
+    similar = defaultdict(dict)  # attended event -> {candidate: similarity}
+    for candidate_id in candidate_ids:
+        candidate_users = event_users.get(candidate_id)
+        if not candidate_users:
+            continue
+        co_counts = defaultdict(int)
+        for user_id in candidate_users:
+            for event_id in user_events[user_id]:
+                if event_id != candidate_id:
+                    co_counts[event_id] += 1
+        norm = math.sqrt(len(candidate_users))
+        for event_id, count in co_counts.items():
+            similar[event_id][candidate_id] = count / (norm * math.sqrt(len(event_users[event_id])))
+    return similar, user_events
+
+def compute_recommendations(top_k=20, history_days=365, now=None):
+    """
+    Recompute top-K event recommendations for every user with attendance
+    history or club memberships. Returns the number of rows written.
+    """
+    now = now or timezone.now()
+    history_start = now - timedelta(days=history_days)
+
+    candidates = dict(
+        Event.objects.filter(candidate_events_q(now)).values_list('id', 'club_id')
+    )
+
+    event_users = defaultdict(set)
+    rsvps = Event.attendees.through.objects.filter(
+        Q(event__start_date__gte=history_start) | Q(event_id__in=candidates)
+    ).values_list('event_id', 'user_id')
+    for event_id, user_id in rsvps.iterator(chunk_size=5000):
+        event_users[event_id].add(user_id)
+
+    similar, user_events = _item_similarities(event_users, candidates.keys())
+
+    club_events = defaultdict(list)
+    for event_id, club_id in candidates.items():
+        if club_id:
+            club_events[club_id].append(event_id)
+
+    user_clubs = defaultdict(set)
+    memberships = Club.members.through.objects.filter(
+        club__status='active'
+    ).values_list('user_id', 'club_id')
+    for user_id, club_id in memberships.iterator(chunk_size=5000):
+        if club_id in club_events:
+            user_clubs[user_id].add(club_id)
+
+    rows = []
+    for user_id in set(user_events) | set(user_clubs):
+        attended = user_events.get(user_id, set())
+        scores = defaultdict(float)
+        for event_id in attended:
+            for candidate_id, similarity in similar.get(event_id, {}).items():
+                scores[candidate_id] += similarity
+        for club_id in user_clubs.get(user_id, ()):
+            for candidate_id in club_events[club_id]:
+                scores[candidate_id] += CLUB_WEIGHT
+
+        best = heapq.nlargest(
+            top_k,
+            ((score, event_id) for event_id, score in scores.items() if event_id not in attended)
+        )
+        rows.extend(
+            EventRecommendation(user_id=user_id, event_id=event_id, score=score, computed_at=now)
+            for score, event_id in best
+        )
+
+    with transaction.atomic():
+        EventRecommendation.objects.all().delete()
+        EventRecommendation.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,159 @@
+# unitribe_server/events/recurrence.py
+
+import copy
+import calendar
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EventOccurrenceException
+
+def _add_months(value, months):
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+def _nth_start(event, start, n):
+    """Start of the n-th occurrence (0-based), stepped in the time zone of `start`"""
+    interval = event.recurrence_interval or 1
+    if event.recurrence == 'daily':
+        return start + timedelta(days=interval * n)
+    if event.recurrence == 'weekly':
+        return start + timedelta(weeks=interval * n)
+    return _add_months(start, interval * n)
+
+def nth_occurrence_start(event, n):
+    """Original start of the event's n-th occurrence (0-based)"""
+    return _nth_start(event, timezone.localtime(event.start_date), n)
+
+def _first_index(event, start, duration, window_start):
+    """Index of the first occurrence that may overlap the window, without
+    walking the series from its beginning"""
+    interval = event.recurrence_interval or 1
+    earliest = window_start - duration
+    if earliest <= start:
+        return 0
+    if event.recurrence == 'daily':
+        step_days = interval
+    elif event.recurrence == 'weekly':
+        step_days = interval * 7
+    else:
+        months = (earliest.year - start.year) * 12 + earliest.month - start.month
+        return max(0, months // interval - 1)
+    return max(0, (earliest - start).days // step_days - 1)
+
+def iter_occurrence_starts(event, window_start, window_end):
+    """Yield original start datetimes of the event's occurrences that overlap
+    [window_start, window_end). Non-recurring events yield their own start."""
+    duration = event.end_date - event.start_date
+
+    if not event.is_recurring:
+        if event.start_date < window_end and event.end_date > window_start:
+            yield event.start_date
+        return
+
+    # Step in the server time zone (TIME_ZONE, UTC), so occurrences keep the
+    # first one's UTC time - a weekly 4 PM meeting in a zone with daylight
+    # saving time shows at 3 or 5 PM local time for part of the year
+    start = timezone.localtime(event.start_date)
+    n = _first_index(event, start, duration, window_start)
+    while True:
+        occurrence_start = _nth_start(event, start, n)
+        if occurrence_start >= window_end:
+            return
+        if event.recurrence_until and occurrence_start > event.recurrence_until:
+            return
+        if occurrence_start + duration > window_start:
+            yield occurrence_start
+        n += 1
+
+def is_occurrence(event, occurrence_start):
+    """Whether `occurrence_start` is the original start of one of the event's occurrences"""
+    for start in iter_occurrence_starts(event, occurrence_start, occurrence_start + timedelta(seconds=1)):
+        if start == occurrence_start:
+            return True
+    return False
+
+def recurring_window_q(window_start, window_end):
+    """Filter for recurring series that may have an occurrence in the window"""
+    # The one-day slack on `recurrence_until` lets an occurrence that starts
+    # just before the window and runs into it be picked up
+    return (
+        ~Q(recurrence='none') &
+        Q(start_date__lt=window_end) &
+        (Q(recurrence_until__isnull=True) | Q(recurrence_until__gte=window_start - timedelta(days=1)))
+    )
+
+def window_q(window_start, window_end):
+    """Filter for events that have at least one occurrence overlapping the window"""
+    return (
+        Q(recurrence='none', start_date__lt=window_end, end_date__gt=window_start) |
+        recurring_window_q(window_start, window_end)
+    )
+
+def _make_occurrence(event, original_start, exception=None):
+    occurrence = copy.copy(event)
+    duration = event.end_date - event.start_date
+    occurrence.occurrence_start = original_start
+    occurrence.start_date = original_start
+    occurrence.end_date = original_start + duration
+    if exception:
+        if exception.start_date:
+            occurrence.start_date = exception.start_date
+            occurrence.end_date = exception.end_date or exception.start_date + duration
+        if exception.location:
+            occurrence.location = exception.location
+    return occurrence
+
+def expand_events(events, window_start, window_end):
+    """
+    Expand a list of events into per-occurrence copies within the window.
+
+    Each returned object is a shallow copy of its series row with start_date,
+    end_date and location set for that occurrence and an extra
+    `occurrence_start` attribute holding the original start. Exceptions for
+    the whole batch are loaded in one query.
+    """
+    events = list(events)
+    recurring = [event for event in events if event.is_recurring]
+
+    candidates = {}
+    for event in recurring:
+        for start in iter_occurrence_starts(event, window_start, window_end):
+            candidates[(event.id, start)] = event
+
+    exceptions = {}
+    if recurring:
+        recurring_ids = [event.id for event in recurring]
+        candidate_starts = {start for (_, start) in candidates}
+        exception_qs = EventOccurrenceException.objects.filter(event_id__in=recurring_ids).filter(
+            Q(occurrence_start__in=candidate_starts) |
+            Q(start_date__lt=window_end, end_date__gt=window_start)
+        )
+        for exception in exception_qs:
+            exceptions[(exception.event_id, exception.occurrence_start)] = exception
+
+    by_id = {event.id: event for event in recurring}
+    occurrences = []
+    for event in events:
+        if not event.is_recurring:
+            event.occurrence_start = None
+            occurrences.append(event)
+
+    keys = set(candidates) | set(exceptions)
+    for key in keys:
+        event = by_id[key[0]]
+        exception = exceptions.get(key)
+        if exception and exception.is_cancelled:
+            continue
+        if key not in candidates and not is_occurrence(event, key[1]):
+            continue
+        occurrence = _make_occurrence(event, key[1], exception)
+        if occurrence.start_date < window_end and occurrence.end_date > window_start:
+            occurrences.append(occurrence)
+
+    occurrences.sort(key=lambda item: (item.start_date, item.id))
+    return occurrences
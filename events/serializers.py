@@ -1,7 +1,7 @@
 #unitribe_server/events/serializers.py
 
 from rest_framework import serializers
-from .models import Event
+from .models import Event, EventOccurrenceException
 from clubs.serializers import ClubSerializer
 from users.serializers import UserBasicSerializer
 from django.utils import timezone
@@ -12,6 +12,8 @@ class EventSerializer(serializers.ModelSerializer):
     attendee_count = serializers.IntegerField(read_only=True)
     is_attending = serializers.SerializerMethodField()
     is_past = serializers.SerializerMethodField()
+    is_recurring = serializers.BooleanField(read_only=True)
+    occurrence_start = serializers.SerializerMethodField()
     
     class Meta:
         model = Event
@@ -21,16 +23,64 @@ class EventSerializer(serializers.ModelSerializer):
     def get_is_attending(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            occurrence_start = getattr(obj, 'occurrence_start', None)
+            occurrence_rsvps = self.context.get('occurrence_rsvps')
+            if occurrence_start and occurrence_rsvps is not None:
+                if (obj.id, occurrence_start) in occurrence_rsvps:
+                    return True
             return obj.attendees.filter(id=request.user.id).exists()
         return False
     
+    def get_occurrence_start(self, obj):
+        occurrence_start = getattr(obj, 'occurrence_start', None)
+        if occurrence_start:
+            return serializers.DateTimeField().to_representation(occurrence_start)
+        return None
+    
     def get_is_past(self, obj):
         return obj.end_date < timezone.now()
 
+class RecommendedEventSerializer(EventSerializer):
+    recommendation_score = serializers.FloatField(read_only=True)
+
 class EventCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = ('title', 'description', 'event_type', 'club', 
-                 'start_date', 'end_date', 'location', 'max_participants')
+                 'start_date', 'end_date', 'location', 'max_participants',
+                 'recurrence', 'recurrence_interval', 'recurrence_until')
+    
+    def validate(self, attrs):
+        until = attrs.get('recurrence_until')
+        if until and until < attrs['start_date']:
+            raise serializers.ValidationError("Recurrence must end after the first occurrence")
         
+        if attrs.get('recurrence_interval') == 0:
+            raise serializers.ValidationError("Recurrence interval must be at least 1")
+        
+        return attrs
+
+class EventImportRowSerializer(EventCreateSerializer):
+    """One row of a bulk import - club and organizer are set for the whole file"""
+    class Meta(EventCreateSerializer.Meta):
+        fields = tuple(field for field in EventCreateSerializer.Meta.fields if field != 'club')
+        extra_kwargs = {
+            'description': {'required': False, 'allow_blank': True},
+            'location': {'required': False, 'allow_blank': True},
+        }
+
+class EventOccurrenceExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EventOccurrenceException
+        fields = ('id', 'event', 'occurrence_start', 'is_cancelled',
+                  'start_date', 'end_date', 'location', 'created_at', 'updated_at')
+        read_only_fields = ('event', 'created_at', 'updated_at')
+    
+    def validate(self, attrs):
+        start_date = attrs.get('start_date')
+        end_date = attrs.get('end_date')
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError("End date must be after start date")
+        return attrs
+
 
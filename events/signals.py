@@ -5,6 +5,8 @@ from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
 from .models import Event
+from notifications.counters import delete_notifications
+from notifications.services import notify, notify_users
 from notifications.models import Notification
 
 @receiver(post_save, sender=Event)
@@ -12,23 +14,22 @@ def create_event_notifications(sender, instance, created, **kwargs):
     if created:
         # Notify club members if event is for a club
         if instance.club:
-            for member in instance.club.members.all():
-                if member != instance.organizer:
-                    Notification.objects.create(
-                        user=member,
-                        notification_type='event',
-                        title='New Club Event',
-                        message=f'{instance.club.name} has a new event: {instance.title}',
-                        related_id=instance.id
-                    )
+            notify_users(
+                instance.club.members.all(),
+                'event',
+                title='New Club Event',
+                message=f'{instance.club.name} has a new event: {instance.title}',
+                target=instance,
+                exclude=[instance.organizer_id]
+            )
         
         # Notify organizer
-        Notification.objects.create(
-            user=instance.organizer,
-            notification_type='event',
+        notify(
+            instance.organizer_id,
+            'event',
             title='Event Created',
             message=f'Your event "{instance.title}" has been created successfully',
-            related_id=instance.id
+            target=instance
         )
         
         # Schedule reminders for new event
@@ -42,11 +43,9 @@ def update_event_reminders(sender, instance, **kwargs):
             # Check if start date changed
             if old_instance.start_date != instance.start_date:
                 # Delete existing reminders and create new ones
-                Notification.objects.filter(
-                    notification_type='event',
-                    related_id=instance.id,
-                    title__contains='Reminder'
-                ).delete()
+                delete_notifications(Notification.objects.for_target(instance).filter(
+                    title__startswith='Event Reminder'
+                ))
                 # Schedule new reminders
                 schedule_event_reminder(instance)
         except Event.DoesNotExist:
@@ -54,11 +53,8 @@ def update_event_reminders(sender, instance, **kwargs):
 
 @receiver(pre_delete, sender=Event)
 def delete_event_reminders(sender, instance, **kwargs):
-    # Delete all notifications related to this event
-    Notification.objects.filter(
-        related_id=instance.id,
-        notification_type='event'
-    ).delete()
+    # Delete all notifications related to this event - one index range
+    delete_notifications(Notification.objects.for_target(instance))
 
 def schedule_event_reminder(event):
     """Schedule event reminders at different intervals"""
@@ -71,23 +67,20 @@ def schedule_event_reminder(event):
     for reminder_time, time_text in reminder_times:
         if reminder_time > timezone.now():
             # Schedule reminder for organizer
-            Notification.objects.create(
-                user=event.organizer,
-                notification_type='event',
+            notify(
+                event.organizer_id,
+                'event',
                 title=f'Event Reminder: {time_text}',
                 message=f'Your event "{event.title}" starts in {time_text}',
-                related_id=event.id,
-                created_at=timezone.now()  # Current time for ordering
+                target=event
             )
             
             # Schedule reminders for attendees
-            for attendee in event.attendees.all():
-                if attendee != event.organizer:
-                    Notification.objects.create(
-                        user=attendee,
-                        notification_type='event',
-                        title=f'Event Reminder: {time_text}',
-                        message=f'Event "{event.title}" starts in {time_text}',
-                        related_id=event.id,
-                        created_at=timezone.now()
-                    )
\ No newline at end of file
+            notify_users(
+                event.attendees.all(),
+                'event',
+                title=f'Event Reminder: {time_text}',
+                message=f'Event "{event.title}" starts in {time_text}',
+                target=event,
+                exclude=[event.organizer_id]
+            )
\ No newline at end of file
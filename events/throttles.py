@@ -0,0 +1,5 @@
+# unitribe_server/events/throttles.py
+from rest_framework.throttling import ScopedRateThrottle
+
+class CheckInThrottle(ScopedRateThrottle):
+    scope = 'event_checkin'
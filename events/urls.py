@@ -2,14 +2,24 @@
 
 from django.urls import path
 from .views import (EventListCreateView, EventDetailView, RSVPEventView, 
-                   CancelRSVPEventView, UpcomingEventsView, UserEventsView)
+                   CancelRSVPEventView, UpcomingEventsView, UserEventsView,
+                   EventCalendarView, EventOccurrenceExceptionView,
+                   EventCheckInTokenView, EventCheckInView, EventAttendanceView,
+                   EventImportView, RecommendedEventsView)
 
 urlpatterns = [
     path('', EventListCreateView.as_view(), name='event-list-create'),
     path('upcoming/', UpcomingEventsView.as_view(), name='upcoming-events'),
     path('my-events/', UserEventsView.as_view(), name='user-events'),
+    path('for-you/', RecommendedEventsView.as_view(), name='recommended-events'),
+    path('calendar/', EventCalendarView.as_view(), name='event-calendar'),
+    path('checkin/', EventCheckInView.as_view(), name='event-checkin'),
+    path('import/', EventImportView.as_view(), name='event-import'),
     path('<int:pk>/', EventDetailView.as_view(), name='event-detail'),
     path('<int:event_id>/rsvp/', RSVPEventView.as_view(), name='rsvp-event'),
     path('<int:event_id>/cancel-rsvp/', CancelRSVPEventView.as_view(), name='cancel-rsvp-event'),
+    path('<int:event_id>/occurrences/', EventOccurrenceExceptionView.as_view(), name='event-occurrence-exceptions'),
+    path('<int:event_id>/checkin-token/', EventCheckInTokenView.as_view(), name='event-checkin-token'),
+    path('<int:event_id>/attendance/', EventAttendanceView.as_view(), name='event-attendance'),
 ]
 
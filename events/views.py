@@ -1,17 +1,68 @@
 # unitribe_server/events/views.py - COMPLETED VERSION
 
-from rest_framework import generics, permissions, status
+from rest_framework import generics, permissions, status, serializers
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, F
 from datetime import timedelta
-from .models import Event
-from .serializers import EventSerializer, EventCreateSerializer
-from notifications.models import Notification
+from .models import Event, EventOccurrenceException, EventOccurrenceRSVP
+from .checkin import (
+    InvalidCheckInToken, attendance_count, event_organizer_id,
+    make_token, record_checkin, verify_token
+)
+from .serializers import (
+    EventSerializer, EventCreateSerializer, EventOccurrenceExceptionSerializer,
+    RecommendedEventSerializer
+)
+from .throttles import CheckInThrottle
+from .importers import ImportFormatError, import_events, parse_file
+from .recommendations import candidate_events_q
+from clubs.models import Club
+from .recurrence import expand_events, is_occurrence, recurring_window_q, window_q
+from notifications.services import notify_activity, notify_users
 import json
 
+MAX_WINDOW_DAYS = 366
+
+def parse_window_bound(value, name):
+    try:
+        return serializers.DateTimeField().to_internal_value(value)
+    except serializers.ValidationError:
+        raise serializers.ValidationError({name: 'Invalid date'})
+
+def parse_window(date_from, date_to):
+    """(start, end) of a ?from=&to= window, at most MAX_WINDOW_DAYS long"""
+    window_start = parse_window_bound(date_from, 'from')
+    window_end = parse_window_bound(date_to, 'to')
+    if window_end <= window_start or window_end - window_start > timedelta(days=MAX_WINDOW_DAYS):
+        raise serializers.ValidationError({'error': f'Window must be between 0 and {MAX_WINDOW_DAYS} days'})
+    return window_start, window_end
+
+def occurrence_rsvps_for(user, events):
+    """(event_id, occurrence_start) pairs the user has RSVPed to among `events`"""
+    starts = [event.occurrence_start for event in events if getattr(event, 'occurrence_start', None)]
+    if not starts:
+        return set()
+    return set(
+        EventOccurrenceRSVP.objects.filter(
+            user=user,
+            event_id__in={event.id for event in events},
+            occurrence_start__in=starts
+        ).values_list('event_id', 'occurrence_start')
+    )
+
+def expanded_events_response(view, queryset, window_start, window_end, limit=None):
+    """Expand recurring series in `queryset` into occurrences within the window"""
+    events = expand_events(queryset, window_start, window_end)
+    if limit:
+        events = events[:limit]
+    context = view.get_serializer_context()
+    context['occurrence_rsvps'] = occurrence_rsvps_for(view.request.user, events)
+    serializer = view.get_serializer_class()(events, many=True, context=context)
+    return Response(serializer.data)
+
 class EventListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
@@ -38,13 +89,22 @@ class EventListCreateView(generics.ListCreateAPIView):
         if club_id:
             queryset = queryset.filter(club_id=club_id)
         
-        # Filter by date range
-        date_from = self.request.query_params.get('from')
-        date_to = self.request.query_params.get('to')
-        if date_from:
-            queryset = queryset.filter(start_date__gte=date_from)
-        if date_to:
-            queryset = queryset.filter(end_date__lte=date_to)
+        # Filter by date range. With both bounds given, recurring series are
+        # kept if any occurrence may fall in the window and are expanded in list()
+        window = self.get_window()
+        if window:
+            date_from, date_to = window
+            queryset = queryset.filter(
+                Q(recurrence='none', start_date__gte=date_from, end_date__lte=date_to) |
+                recurring_window_q(date_from, date_to)
+            )
+        else:
+            date_from = self.request.query_params.get('from')
+            date_to = self.request.query_params.get('to')
+            if date_from:
+                queryset = queryset.filter(start_date__gte=parse_window_bound(date_from, 'from'))
+            if date_to:
+                queryset = queryset.filter(end_date__lte=parse_window_bound(date_to, 'to'))
         
         # Filter by status
         status_filter = self.request.query_params.get('status')
@@ -62,7 +122,8 @@ class EventListCreateView(generics.ListCreateAPIView):
         if self.request.query_params.get('my_events') == 'true':
             queryset = queryset.filter(
                 Q(organizer=self.request.user) |
-                Q(attendees=self.request.user)
+                Q(attendees=self.request.user) |
+                Q(occurrence_rsvps__user=self.request.user)
             ).distinct()
         
         # Search
@@ -84,6 +145,25 @@ class EventListCreateView(generics.ListCreateAPIView):
         
         return queryset
     
+    def get_window(self):
+        date_from = self.request.query_params.get('from')
+        date_to = self.request.query_params.get('to')
+        if not (date_from and date_to):
+            return None
+        # Any length for one-off events; list() caps it when series are expanded
+        return parse_window_bound(date_from, 'from'), parse_window_bound(date_to, 'to')
+    
+    def list(self, request, *args, **kwargs):
+        window = self.get_window()
+        if not window:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        window_start, window_end = window
+        if window_end - window_start > timedelta(days=MAX_WINDOW_DAYS) and queryset.exclude(recurrence='none').exists():
+            raise serializers.ValidationError({'error': f'Window must be at most {MAX_WINDOW_DAYS} days when it includes recurring events'})
+        # Occurrences are always returned in chronological order
+        return expanded_events_response(self, queryset, window_start, window_end)
+    
     def perform_create(self, serializer):
         event = serializer.save(organizer=self.request.user)
         
@@ -92,15 +172,14 @@ class EventListCreateView(generics.ListCreateAPIView):
         
         # Create notification for club members if event belongs to a club
         if event.club:
-            for member in event.club.members.all():
-                if member != self.request.user:
-                    Notification.objects.create(
-                        user=member,
-                        notification_type='event',
-                        title='New Club Event',
-                        message=f'{event.club.name} has a new event: {event.title}',
-                        related_id=event.id
-                    )
+            notify_users(
+                event.club.members.all(),
+                'event',
+                title='New Club Event',
+                message=f'{event.club.name} has a new event: {event.title}',
+                target=event,
+                exclude=[self.request.user]
+            )
 
 class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Event.objects.all()
@@ -130,11 +209,31 @@ class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
             )
         return super().destroy(request, *args, **kwargs)
 
+def get_occurrence_start(request, event):
+    """Validated `occurrence_start` from the request body, or None for a series-wide RSVP"""
+    value = request.data.get('occurrence_start')
+    if not value:
+        return None
+    if not event.is_recurring:
+        raise serializers.ValidationError({'occurrence_start': 'Event does not repeat'})
+    occurrence_start = parse_window_bound(value, 'occurrence_start')
+    if not is_occurrence(event, occurrence_start):
+        raise serializers.ValidationError({'occurrence_start': 'No occurrence starts at this time'})
+    if EventOccurrenceException.objects.filter(
+        event=event, occurrence_start=occurrence_start, is_cancelled=True
+    ).exists():
+        raise serializers.ValidationError({'occurrence_start': 'This occurrence has been cancelled'})
+    return occurrence_start
+
 class RSVPEventView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, event_id):
         event = get_object_or_404(Event, id=event_id, is_active=True)
+        occurrence_start = get_occurrence_start(request, event)
+        
+        if occurrence_start:
+            return self.rsvp_occurrence(request, event, occurrence_start)
         
         if event.is_full:
             return Response(
@@ -142,7 +241,7 @@ class RSVPEventView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        if event.start_date < timezone.now():
+        if event.start_date < timezone.now() and not event.is_recurring:
             return Response(
                 {'error': 'Cannot RSVP to past events'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -156,17 +255,68 @@ class RSVPEventView(APIView):
         
         event.attendees.add(request.user)
         
-        # Create notification for organizer
-        Notification.objects.create(
-            user=event.organizer,
-            notification_type='event',
+        # Notify organizer, one row per event however many RSVP
+        notify_activity(
+            event.organizer_id,
+            'event',
+            'rsvp',
+            target=event,
+            actor=request.user,
             title='New RSVP',
             message=f'{request.user.get_full_name()} has RSVPed to your event: {event.title}',
-            related_id=event.id
+            summary=f'RSVPed to your event: {event.title}'
+        )
+        
+        return Response({
+            'status': 'rsvp_success',
+            'event': EventSerializer(event, context={'request': request}).data
+        })
+    
+    def rsvp_occurrence(self, request, event, occurrence_start):
+        if event.max_participants and event.occurrence_attendee_count(occurrence_start) >= event.max_participants:
+            return Response(
+                {'error': 'Event is full'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if occurrence_start < timezone.now():
+            return Response(
+                {'error': 'Cannot RSVP to past events'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if event.attendees.filter(id=request.user.id).exists():
+            return Response(
+                {'error': 'Already RSVPed to every occurrence'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        rsvp, created = EventOccurrenceRSVP.objects.get_or_create(
+            event=event,
+            occurrence_start=occurrence_start,
+            user=request.user
+        )
+        if not created:
+            return Response(
+                {'error': 'Already RSVPed'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        notify_activity(
+            event.organizer_id,
+            'event',
+            'rsvp',
+            target=event,
+            actor=request.user,
+            title='New RSVP',
+            message=f'{request.user.get_full_name()} has RSVPed to your event: {event.title} '
+                    f'({timezone.localtime(occurrence_start):%Y-%m-%d %H:%M})',
+            summary=f'RSVPed to your event: {event.title}'
         )
         
         return Response({
             'status': 'rsvp_success',
+            'occurrence_start': occurrence_start,
             'event': EventSerializer(event, context={'request': request}).data
         })
 
@@ -175,26 +325,238 @@ class CancelRSVPEventView(APIView):
     
     def post(self, request, event_id):
         event = get_object_or_404(Event, id=event_id)
+        occurrence_start = get_occurrence_start(request, event)
         
-        if not event.attendees.filter(id=request.user.id).exists():
-            return Response(
-                {'error': 'Not RSVPed to this event'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        event.attendees.remove(request.user)
+        if occurrence_start:
+            deleted, _ = EventOccurrenceRSVP.objects.filter(
+                event=event,
+                occurrence_start=occurrence_start,
+                user=request.user
+            ).delete()
+            if not deleted:
+                return Response(
+                    {'error': 'Not RSVPed to this occurrence'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            if not event.attendees.filter(id=request.user.id).exists():
+                return Response(
+                    {'error': 'Not RSVPed to this event'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            event.attendees.remove(request.user)
         
         # Notify organizer
-        Notification.objects.create(
-            user=event.organizer,
-            notification_type='event',
+        notify_activity(
+            event.organizer_id,
+            'event',
+            'rsvp_cancelled',
+            target=event,
+            actor=request.user,
             title='RSVP Cancelled',
             message=f'{request.user.get_full_name()} cancelled RSVP to your event: {event.title}',
-            related_id=event.id
+            summary=f'cancelled RSVPs to your event: {event.title}'
         )
         
         return Response({'status': 'rsvp_cancelled'})
 
+class EventOccurrenceExceptionView(generics.ListCreateAPIView):
+    """Cancel, reschedule or relocate a single occurrence of a recurring event"""
+    serializer_class = EventOccurrenceExceptionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_event(self):
+        return get_object_or_404(Event, id=self.kwargs['event_id'])
+    
+    def get_queryset(self):
+        return EventOccurrenceException.objects.filter(
+            event_id=self.kwargs['event_id']
+        ).order_by('occurrence_start')
+    
+    def create(self, request, *args, **kwargs):
+        event = self.get_event()
+        if event.organizer != request.user and request.user.role not in ['admin', 'faculty']:
+            return Response(
+                {'error': 'You can only edit your own events'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if not event.is_recurring:
+            return Response(
+                {'error': 'Event does not repeat'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        if not is_occurrence(event, data['occurrence_start']):
+            return Response(
+                {'error': 'No occurrence starts at this time'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        exception, created = EventOccurrenceException.objects.update_or_create(
+            event=event,
+            occurrence_start=data['occurrence_start'],
+            defaults={
+                'is_cancelled': data.get('is_cancelled', False),
+                'start_date': data.get('start_date'),
+                'end_date': data.get('end_date'),
+                'location': data.get('location', ''),
+            }
+        )
+        
+        return Response(
+            self.get_serializer(exception).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+class EventImportView(APIView):
+    """
+    Bulk import of a semester calendar from a CSV or ICS upload.
+    
+    All rows are validated before anything is written; pass dry_run=true to
+    only validate.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        uploaded = request.FILES.get('file')
+        if not uploaded:
+            return Response(
+                {'error': 'file required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        club = None
+        club_id = request.data.get('club')
+        if club_id:
+            club = get_object_or_404(Club, id=club_id)
+            if not club.can_manage(request.user):
+                return Response(
+                    {'error': 'You do not have permission to add events to this club'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+        elif request.user.role not in ['admin', 'faculty']:
+            return Response(
+                {'error': 'Only faculty and admins can import events'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            rows = parse_file(uploaded, request.data.get('format'))
+            result = import_events(
+                rows,
+                organizer=request.user,
+                club=club,
+                dry_run=str(request.data.get('dry_run', '')).lower() == 'true',
+                default_event_type=request.data.get('event_type', 'seminar')
+            )
+        except (ImportFormatError, UnicodeDecodeError) as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if result['errors']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK)
+
+class EventCheckInTokenView(APIView):
+    """Signed check-in token for the requesting attendee, shown as a QR code"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, event_id):
+        event = get_object_or_404(Event, id=event_id, is_active=True)
+        occurrence_start = event.start_date
+        
+        if request.query_params.get('occurrence_start'):
+            occurrence_start = parse_window_bound(request.query_params['occurrence_start'], 'occurrence_start')
+            if not is_occurrence(event, occurrence_start):
+                return Response(
+                    {'error': 'No occurrence starts at this time'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        is_attending = event.attendees.filter(id=request.user.id).exists() or (
+            event.is_recurring and event.occurrence_rsvps.filter(
+                occurrence_start=occurrence_start,
+                user=request.user
+            ).exists()
+        )
+        if not is_attending:
+            return Response(
+                {'error': 'RSVP to the event first'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        return Response({
+            'event': event.id,
+            'occurrence_start': occurrence_start,
+            'token': make_token(event, request.user.id, occurrence_start),
+        })
+
+class EventCheckInView(APIView):
+    """
+    Door check-in from a scanned token. The token is verified without a
+    database read and the write is queued for the next bulk insert.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [CheckInThrottle]
+    
+    def post(self, request):
+        try:
+            event_id, user_id, occurrence_start = verify_token(request.data.get('token', ''))
+        except InvalidCheckInToken as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if request.user.role not in ['admin', 'faculty'] and event_organizer_id(event_id) != request.user.id:
+            return Response(
+                {'error': 'Only the organizer can check in attendees'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        created, count = record_checkin(
+            event_id, user_id, occurrence_start,
+            scanned_by_id=request.user.id,
+            checked_in_at=timezone.now()
+        )
+        
+        return Response({
+            'status': 'checked_in' if created else 'already_checked_in',
+            'event': event_id,
+            'user': user_id,
+            'occurrence_start': occurrence_start,
+            'attendance_count': count,
+        })
+
+class EventAttendanceView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, event_id):
+        event = get_object_or_404(Event, id=event_id)
+        if event.organizer != request.user and request.user.role not in ['admin', 'faculty']:
+            return Response(
+                {'error': 'Only the organizer can view attendance'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        occurrence_start = event.start_date
+        if request.query_params.get('occurrence_start'):
+            occurrence_start = parse_window_bound(request.query_params['occurrence_start'], 'occurrence_start')
+        
+        return Response({
+            'event': event.id,
+            'occurrence_start': occurrence_start,
+            'attendance_count': attendance_count(event.id, occurrence_start),
+        })
+
 class UpcomingEventsView(generics.ListAPIView):
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -204,11 +566,90 @@ class UpcomingEventsView(generics.ListAPIView):
         context['request'] = self.request
         return context
     
+    def get_window(self):
+        try:
+            days = min(int(self.request.query_params.get('days', 30)), MAX_WINDOW_DAYS)
+        except ValueError:
+            days = 30
+        now = timezone.now()
+        return now, now + timedelta(days=days)
+    
     def get_queryset(self):
         return Event.objects.filter(
             is_active=True,
+            recurrence='none',
             start_date__gte=timezone.now()
         ).order_by('start_date')[:50]
+    
+    def list(self, request, *args, **kwargs):
+        window_start, window_end = self.get_window()
+        # Single events are not bounded by the window, recurring series are
+        # expanded only within it
+        single = list(self.get_queryset())
+        recurring = Event.objects.filter(recurring_window_q(window_start, window_end), is_active=True)
+        occurrences = [
+            event for event in expand_events(recurring, window_start, window_end)
+            if event.start_date >= window_start
+        ]
+        events = sorted(single + occurrences, key=lambda item: (item.start_date, item.id))[:50]
+        context = self.get_serializer_context()
+        context['occurrence_rsvps'] = occurrence_rsvps_for(request.user, events)
+        return Response(self.get_serializer(events, many=True, context=context).data)
+
+class RecommendedEventsView(generics.ListAPIView):
+    """
+    "For you" events. Scores are precomputed by the
+    compute_event_recommendations job, so this is a single indexed read.
+    """
+    serializer_class = RecommendedEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['request'] = self.request
+        return context
+    
+    def get_queryset(self):
+        return Event.objects.filter(
+            candidate_events_q(timezone.now()),
+            recommendations__user=self.request.user
+        ).annotate(
+            recommendation_score=F('recommendations__score')
+        ).select_related('club', 'organizer').order_by('-recommendation_score')[:50]
+
+class EventCalendarView(generics.ListAPIView):
+    """Events and expanded occurrences overlapping a bounded date window"""
+    serializer_class = EventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['request'] = self.request
+        return context
+    
+    def get_window(self):
+        date_from = self.request.query_params.get('from')
+        date_to = self.request.query_params.get('to')
+        if not (date_from and date_to):
+            raise serializers.ValidationError({'error': 'from and to are required'})
+        return parse_window(date_from, date_to)
+    
+    def get_queryset(self):
+        window_start, window_end = self.get_window()
+        queryset = Event.objects.filter(window_q(window_start, window_end), is_active=True)
+        
+        event_type = self.request.query_params.get('type')
+        if event_type:
+            queryset = queryset.filter(event_type=event_type)
+        
+        club_id = self.request.query_params.get('club')
+        if club_id:
+            queryset = queryset.filter(club_id=club_id)
+        
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        return expanded_events_response(self, self.get_queryset(), *self.get_window())
 
 class UserEventsView(generics.ListAPIView):
     serializer_class = EventSerializer
@@ -223,6 +664,6 @@ class UserEventsView(generics.ListAPIView):
         user = self.request.user
         # Events user is attending or organizing
         return Event.objects.filter(
-            Q(organizer=user) | Q(attendees=user),
+            Q(organizer=user) | Q(attendees=user) | Q(occurrence_rsvps__user=user),
             is_active=True
         ).distinct().order_by('start_date')
\ No newline at end of file
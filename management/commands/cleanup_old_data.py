@@ -6,7 +6,9 @@ import os
 from users.models import User
 from events.models import Event
 from posts.models import Post
+from notifications.counters import delete_notifications
 from notifications.models import Notification
+from unitribe_server.partitioning import drop_partition, expired_partitions, is_partitioned
 
 class Command(BaseCommand):
     help = 'Clean up old data from the database'
@@ -31,21 +33,23 @@ class Command(BaseCommand):
         
         self.stdout.write(f"Cleaning up data older than {days} days (before {cutoff_date})")
         
-        # Clean old notifications
-        old_notifications = Notification.objects.filter(created_at__lt=cutoff_date)
-        self.stdout.write(f"Found {old_notifications.count()} old notifications")
-        
-        if not dry_run:
-            deleted_count, _ = old_notifications.delete()
-            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted_count} old notifications"))
-        
-        # Clean old read notifications
-        read_notifications = Notification.objects.filter(is_read=True, created_at__lt=cutoff_date - timedelta(days=30))
-        self.stdout.write(f"Found {read_notifications.count()} old read notifications")
-        
-        if not dry_run:
-            deleted_count, _ = read_notifications.delete()
-            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted_count} old read notifications"))
+        # Clean old notifications - whole months at a time when partitioned
+        if is_partitioned(Notification):
+            retention_months = max(1, days // 30)
+            expired = expired_partitions(Notification, retention_months)
+            self.stdout.write(f"Found {len(expired)} notification partitions older than {retention_months} months")
+            
+            if not dry_run:
+                for name, month in expired:
+                    drop_partition(Notification, name, month)
+                self.stdout.write(self.style.SUCCESS(f"Dropped {len(expired)} notification partitions"))
+        else:
+            old_notifications = Notification.objects.filter(created_at__lt=cutoff_date)
+            self.stdout.write(f"Found {old_notifications.count()} old notifications")
+            
+            if not dry_run:
+                deleted_count = delete_notifications(old_notifications)
+                self.stdout.write(self.style.SUCCESS(f"Deleted {deleted_count} old notifications"))
         
         # Deactivate inactive users (no login for 180 days)
         inactive_cutoff = timezone.now() - timedelta(days=180)
@@ -1,15 +1,21 @@
 from django.contrib import admin
-from .models import Conversation, Message, UserMessageSettings
+from .models import Conversation, ConversationParticipant, Message, UserMessageSettings
+
+class ConversationParticipantInline(admin.TabularInline):
+    model = ConversationParticipant
+    extra = 0
+    raw_id_fields = ('user', 'last_message')
+    readonly_fields = ('last_activity', 'unread_count')
 
 @admin.register(Conversation)
 class ConversationAdmin(admin.ModelAdmin):
     list_display = ('id', 'is_group', 'group_name', 'group_admin', 'created_at', 'updated_at')
-    filter_horizontal = ('participants',)
+    inlines = [ConversationParticipantInline]
     search_fields = ('group_name', 'participants__email')
 
 @admin.register(Message)
 class MessageAdmin(admin.ModelAdmin):
-    list_display = ('conversation', 'sender', 'content', 'is_read', 'created_at')
+    list_display = ('conversation', 'sender', 'content', 'created_at')
     search_fields = ('sender__email', 'content')
 
 @admin.register(UserMessageSettings)
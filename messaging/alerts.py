@@ -0,0 +1,103 @@
+# unitribe_server/messaging/alerts.py
+
+from django.db import transaction
+from django.utils import timezone
+
+from notifications.counters import adjust_unread_count
+from notifications.models import TYPE_BITS, Notification
+from notifications.serializers import NotificationSerializer
+from realtime import presence
+from realtime.pubsub import publish
+
+def member_rows(conversation):
+    """
+    (user_id, unread_count, is_muted, message_notifications, muted_types)
+    for every participant in one query. message_notifications and
+    muted_types are None for users without saved settings, which means
+    enabled.
+    """
+    return list(conversation.memberships.values_list(
+        'user_id', 'unread_count', 'is_muted', 'user__message_settings__message_notifications',
+        'user__notification_settings__muted_types'
+    ))
+
+def notification_text(conversation, sender, count):
+    if count == 1:
+        return 'New Message', f'New message from {sender.get_full_name()}'
+    where = conversation.group_name if conversation.is_group else sender.get_full_name()
+    return 'New Messages', f'{count} new messages from {where}'
+
+def notify_new_message(conversation, message, members):
+    """
+    Message notifications for a newly sent message, given `member_rows`
+    read after the message was recorded.
+
+    Muted participants, users with message notifications off or the
+    message type muted and anyone currently viewing the conversation are
+    skipped. Everyone else keeps a single unread notification per
+    conversation, rewritten to "N new messages" as their unread count
+    grows.
+    """
+    candidates = {
+        user_id: unread_count
+        for user_id, unread_count, is_muted, enabled, muted_types in members
+        if user_id != message.sender_id and not is_muted and enabled is not False
+        and not (muted_types or 0) & TYPE_BITS['message']
+    }
+    for user_id in presence.viewer_ids(conversation.id, candidates):
+        del candidates[user_id]
+    if not candidates:
+        return
+
+    existing = {
+        notification.user_id: notification
+        for notification in Notification.objects.for_target(conversation).filter(
+            user_id__in=candidates,
+            notification_type='message',
+            is_read=False
+        )
+    }
+
+    now = timezone.now()
+    updated = []
+    created = []
+    for user_id, unread_count in candidates.items():
+        title, text = notification_text(conversation, message.sender, max(unread_count, 1))
+        notification = existing.get(user_id)
+        if notification:
+            notification.title = title
+            notification.message = text
+            # Resurface the collapsed row at the top of the list
+            notification.created_at = now
+            updated.append(notification)
+        else:
+            created.append(Notification(
+                user_id=user_id,
+                notification_type='message',
+                title=title,
+                message=text,
+                target_type='conversation',
+                target_id=conversation.id
+            ))
+
+    if updated:
+        Notification.objects.bulk_update(updated, ['title', 'message', 'created_at'])
+    if created:
+        Notification.objects.bulk_create(created)
+
+    def push():
+        # Bulk writes send no post_save, so push what the signal would
+        for notification in created:
+            publish([notification.user_id], {
+                'type': 'notification.created',
+                'notification': NotificationSerializer(notification).data,
+                # Collapsed rows were already unread; only new ones raise the badge
+                'unread_count': adjust_unread_count(notification.user_id, 1),
+            })
+        for notification in updated:
+            publish([notification.user_id], {
+                'type': 'notification.updated',
+                'notification': NotificationSerializer(notification).data,
+            })
+
+    transaction.on_commit(push)
@@ -0,0 +1,87 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_inbox(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    ConversationParticipant = apps.get_model('messaging', 'ConversationParticipant')
+    Message = apps.get_model('messaging', 'Message')
+
+    for conversation in Conversation.objects.iterator():
+        last_message = Message.objects.filter(conversation=conversation).order_by('-created_at', '-id').first()
+        memberships = ConversationParticipant.objects.filter(conversation=conversation)
+        memberships.update(
+            last_message=last_message,
+            last_activity=last_message.created_at if last_message else conversation.updated_at
+        )
+        for membership in memberships:
+            unread = Message.objects.filter(
+                conversation=conversation,
+                is_read=False
+            ).exclude(sender_id=membership.user_id).count()
+            if unread:
+                memberships.filter(pk=membership.pk).update(unread_count=unread)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # The auto-created M2M table becomes an explicit through model; the
+        # table, its columns and unique constraint already exist
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ConversationParticipant',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='messaging.conversation')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_memberships', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'messaging_conversation_participants',
+                        'unique_together': {('conversation', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='conversation',
+                    name='participants',
+                    field=models.ManyToManyField(related_name='conversations', through='messaging.ConversationParticipant', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+            database_operations=[],
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='is_muted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_activity',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='conversationparticipant',
+            index=models.Index(fields=['user', '-last_activity'], name='msg_inbox_user_activity_idx'),
+        ),
+        migrations.RunPython(backfill_inbox, migrations.RunPython.noop),
+    ]
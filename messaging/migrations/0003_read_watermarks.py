@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_watermarks(apps, schema_editor):
+    ConversationParticipant = apps.get_model('messaging', 'ConversationParticipant')
+    Message = apps.get_model('messaging', 'Message')
+
+    # Watermark = newest message from someone else that the participant had read,
+    # or their own newest message, whichever is later
+    for membership in ConversationParticipant.objects.iterator():
+        messages = Message.objects.filter(conversation_id=membership.conversation_id)
+        read = messages.filter(is_read=True).exclude(sender_id=membership.user_id).order_by('-id').first()
+        sent = messages.filter(sender_id=membership.user_id).order_by('-id').first()
+        candidates = [message for message in (read, sent) if message]
+        if candidates:
+            watermark = max(candidates, key=lambda message: message.id)
+            ConversationParticipant.objects.filter(pk=membership.pk).update(
+                last_read_message=watermark,
+                last_read_at=watermark.read_at or watermark.created_at
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_conversationparticipant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_read_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.RunPython(backfill_watermarks, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+        migrations.RemoveField(
+            model_name='message',
+            name='read_at',
+        ),
+    ]
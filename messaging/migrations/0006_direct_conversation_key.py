@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_direct_keys(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    ConversationParticipant = apps.get_model('messaging', 'ConversationParticipant')
+
+    members = {}
+    for conversation_id, user_id in ConversationParticipant.objects.filter(
+        conversation__is_group=False
+    ).values_list('conversation_id', 'user_id').iterator():
+        members.setdefault(conversation_id, set()).add(user_id)
+
+    # Oldest conversation of a pair keeps the key; later duplicates stay
+    # unkeyed so the unique constraint can be added
+    claimed = set()
+    for conversation_id in sorted(members):
+        if len(members[conversation_id]) != 2:
+            continue
+        pair = tuple(sorted(members[conversation_id]))
+        if pair in claimed:
+            continue
+        claimed.add(pair)
+        Conversation.objects.filter(pk=conversation_id).update(dm_low_user_id=pair[0], dm_high_user_id=pair[1])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_message_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='dm_high_user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='dm_low_user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_direct_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_group', False)), fields=('dm_low_user', 'dm_high_user'), name='unique_direct_conversation'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.CheckConstraint(condition=models.Q(('dm_low_user__isnull', True), ('dm_low_user__lt', models.F('dm_high_user')), _connector='OR'), name='direct_conversation_pair_ordered'),
+        ),
+    ]
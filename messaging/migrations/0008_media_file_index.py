@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0007_alter_message_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('file__gt', '')), fields=['file'], name='msg_file_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from unitribe_server.partitioning import partition_table, unpartition_table
+
+def partition_messages(apps, schema_editor):
+    partition_table(schema_editor, 'messaging_message')
+
+def unpartition_messages(apps, schema_editor):
+    unpartition_table(schema_editor, 'messaging_message')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0008_media_file_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='conversationparticipant',
+            name='last_message',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.AlterField(
+            model_name='conversationparticipant',
+            name='last_read_message',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.RunPython(partition_messages, unpartition_messages),
+    ]
@@ -1,19 +1,41 @@
 #unitribe_server/messaging/models.py
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from users.models import User
 from django.utils import timezone
+from uploads.storage import get_blob_storage
+
+# Text search configuration for message content
+SEARCH_CONFIG = 'english'
 
 class Conversation(models.Model):
-    participants = models.ManyToManyField(User, related_name='conversations')
+    participants = models.ManyToManyField(User, through='ConversationParticipant', related_name='conversations')
     is_group = models.BooleanField(default=False)
     group_name = models.CharField(max_length=200, blank=True)
     group_admin = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='managed_groups')
+    # Canonical (lower id, higher id) pair of a one-to-one conversation
+    dm_low_user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    dm_high_user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-updated_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dm_low_user', 'dm_high_user'],
+                condition=Q(is_group=False),
+                name='unique_direct_conversation'
+            ),
+            models.CheckConstraint(
+                condition=Q(dm_low_user__isnull=True) | Q(dm_low_user__lt=F('dm_high_user')),
+                name='direct_conversation_pair_ordered'
+            ),
+        ]
     
     def __str__(self):
         if self.is_group:
@@ -23,31 +45,150 @@ class Conversation(models.Model):
             return f"{participants[0]} - {participants[1]}"
         return f"Group: {self.group_name}"
     
+    @classmethod
+    def get_or_create_direct(cls, user, other):
+        """
+        The one-to-one conversation between two users, created if needed.
+        Returns (conversation, created). A concurrent create for the same
+        pair loses on the unique constraint and returns the winner's row.
+        """
+        low_id, high_id = sorted([user.id, other.id])
+        lookup = {'is_group': False, 'dm_low_user_id': low_id, 'dm_high_user_id': high_id}
+        try:
+            return cls.objects.get(**lookup), False
+        except cls.DoesNotExist:
+            pass
+        
+        try:
+            with transaction.atomic():
+                conversation = cls.objects.create(**lookup)
+                ConversationParticipant.objects.bulk_create([
+                    ConversationParticipant(conversation=conversation, user_id=low_id),
+                    ConversationParticipant(conversation=conversation, user_id=high_id),
+                ])
+        except IntegrityError:
+            return cls.objects.get(**lookup), False
+        return conversation, True
+    
     def get_other_participant(self, user):
         if not self.is_group:
             return self.participants.exclude(id=user.id).first()
         return None
+    
+    def has_participant(self, user):
+        # Single-row lookup on the (conversation, user) unique index
+        return self.memberships.filter(user=user).exists()
+    
+    def record_message(self, message):
+        """Update every participant's inbox row for a newly sent message in one UPDATE"""
+        self.memberships.update(
+            last_message=message,
+            last_activity=message.created_at,
+            # The sender has read their own message, and so everything before it
+            unread_count=Case(
+                When(user_id=message.sender_id, then=Value(0)),
+                default=F('unread_count') + 1
+            ),
+            last_read_message_id=Case(
+                When(user_id=message.sender_id, then=Value(message.id)),
+                default=F('last_read_message_id'),
+                output_field=models.BigIntegerField()
+            ),
+            last_read_at=Case(
+                When(user_id=message.sender_id, then=Value(message.created_at)),
+                default=F('last_read_at')
+            )
+        )
+    
+    def mark_read(self, user, message=None):
+        """
+        Advance the user's read watermark. This is a single-row UPDATE no
+        matter how many messages it covers; without `message` everything up
+        to the latest message is marked read.
+        """
+        now = timezone.now()
+        memberships = self.memberships.filter(user=user)
+        if message is None:
+            return memberships.update(
+                last_read_message=F('last_message'),
+                last_read_at=now,
+                unread_count=0
+            )
+        
+        unread_after = Message.objects.filter(
+            conversation=OuterRef('conversation'),
+            id__gt=message.id
+        ).exclude(sender=user).order_by().values('conversation').annotate(
+            count=Count('id')
+        ).values('count')
+        return memberships.filter(
+            Q(last_read_message__isnull=True) | Q(last_read_message_id__lt=message.id)
+        ).update(
+            last_read_message=message,
+            last_read_at=now,
+            unread_count=Coalesce(Subquery(unread_after), Value(0))
+        )
+    
+    def read_watermarks(self):
+        """{user_id: last read message id} for every participant"""
+        return dict(self.memberships.values_list('user_id', 'last_read_message_id'))
 
 class Message(models.Model):
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     content = models.TextField()
-    file = models.FileField(upload_to='message_files/', blank=True, null=True)
-    is_read = models.BooleanField(default=False)
-    read_at = models.DateTimeField(null=True, blank=True)
+    file = models.FileField(upload_to='message_files/', storage=get_blob_storage, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by Postgres on every write
+    search_vector = models.GeneratedField(
+        expression=SearchVector('content', config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True
+    )
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination of a conversation's history
+            models.Index(fields=['conversation', 'created_at', 'id'], name='msg_conv_created_id_idx'),
+            GinIndex(fields=['search_vector'], name='msg_search_vector_idx'),
+            # Media access checks look attachments up by name
+            models.Index(fields=['file'], name='msg_file_idx', condition=models.Q(file__gt='')),
+        ]
     
     def __str__(self):
         return f"{self.sender}: {self.content[:50]}"
     
-    def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.save()
+    def mark_as_read(self, user):
+        # Read state lives in the participant's watermark, not on the message
+        self.conversation.mark_read(user, self)
+
+class ConversationParticipant(models.Model):
+    """
+    Membership of a user in a conversation, doubling as that user's inbox
+    entry. Kept up to date on message send so the inbox list is a single
+    indexed query.
+    """
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversation_memberships')
+    # No database constraints: messages are partitioned by month, so their
+    # primary key is (id, created_at) and cannot be referenced
+    last_message = models.ForeignKey(Message, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', db_constraint=False)
+    last_activity = models.DateTimeField(default=timezone.now)
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_message = models.ForeignKey(Message, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', db_constraint=False)
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    is_muted = models.BooleanField(default=False)
+    
+    class Meta:
+        db_table = 'messaging_conversation_participants'
+        unique_together = ['conversation', 'user']
+        indexes = [
+            models.Index(fields=['user', '-last_activity'], name='msg_inbox_user_activity_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user} in {self.conversation_id}"
 
 class UserMessageSettings(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='message_settings')
@@ -0,0 +1,120 @@
+# unitribe_server/messaging/pagination.py
+
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+
+from unitribe_server.partitioning import newest_first
+
+def encode_cursor(message):
+    value = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """(created_at, id) from an opaque cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, message_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(message_id)
+    except (ValueError, UnicodeDecodeError):
+        raise NotFound('Invalid cursor')
+
+def _older_q(created_at, message_id, inclusive=False):
+    same_time = Q(created_at=created_at, id__lte=message_id) if inclusive else Q(created_at=created_at, id__lt=message_id)
+    return Q(created_at__lt=created_at) | same_time
+
+def _newer_q(created_at, message_id):
+    return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=message_id)
+
+class MessageCursorPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, id), served by the
+    (conversation, created_at, id) index.
+
+    ?before=<cursor>  older messages, for scrolling back
+    ?after=<cursor>   newer messages, for polling since the last one seen
+    ?around=<cursor>  a page centred on a message, including it
+
+    Results are always in chronological order. Without a cursor the newest
+    page is returned.
+    """
+    page_size = 50
+    max_page_size = 100
+    page_size_query_param = 'limit'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _older(self, queryset, q, limit, latest=None):
+        rows = newest_first(queryset.filter(q), limit + 1, latest=latest)
+        return list(reversed(rows[:limit])), len(rows) > limit
+
+    def _newer(self, queryset, q, limit):
+        rows = list(queryset.filter(q).order_by('created_at', 'id')[:limit + 1])
+        return rows[:limit], len(rows) > limit
+
+    def paginate_queryset(self, queryset, request, view=None):
+        limit = self.get_page_size(request)
+        params = request.query_params
+        self.request = request
+        self.cursor = None
+
+        if params.get('after'):
+            self.cursor = params['after']
+            created_at, message_id = decode_cursor(self.cursor)
+            self.page, self.has_newer = self._newer(queryset, _newer_q(created_at, message_id), limit)
+            self.has_older = True
+        elif params.get('around'):
+            created_at, message_id = decode_cursor(params['around'])
+            older_limit = (limit + 1) // 2
+            older, self.has_older = self._older(
+                queryset, _older_q(created_at, message_id, inclusive=True), older_limit, created_at
+            )
+            newer, self.has_newer = self._newer(
+                queryset, _newer_q(created_at, message_id), limit - older_limit
+            )
+            self.page = older + newer
+        else:
+            q = Q()
+            # The conversation's newest message, when the view knows it
+            latest = getattr(view, 'latest_activity', None)
+            if params.get('before'):
+                self.cursor = params['before']
+                latest, message_id = decode_cursor(self.cursor)
+                q = _older_q(latest, message_id)
+            self.page, self.has_older = self._older(queryset, q, limit, latest)
+            self.has_newer = bool(self.cursor)
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        # An empty poll keeps the client's cursor so it can simply ask again
+        older_cursor = encode_cursor(self.page[0]) if self.page else self.cursor
+        newer_cursor = encode_cursor(self.page[-1]) if self.page else self.cursor
+        return Response({
+            'results': data,
+            'older_cursor': older_cursor,
+            'newer_cursor': newer_cursor,
+            'has_older': self.has_older,
+            'has_newer': self.has_newer,
+        })
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': name, 'required': False, 'in': 'query', 'schema': {'type': 'string'}}
+            for name in ('before', 'after', 'around', self.page_size_query_param)
+        ]
+
+class MessageSearchPagination(PageNumberPagination):
+    """Search results, best match first"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
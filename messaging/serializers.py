@@ -1,46 +1,171 @@
 #unitribe_server/messaging/serializers.py
 
+from django.utils.html import escape
 from rest_framework import serializers
-from .models import Conversation, Message, UserMessageSettings
+from .models import Conversation, ConversationParticipant, Message, UserMessageSettings
+from .pagination import encode_cursor
+from realtime import presence
+from uploads.serializers import DirectUploadMixin
 from users.serializers import UserBasicSerializer
 
-class MessageSerializer(serializers.ModelSerializer):
+# Marks the search headline puts around matches; the snippet is escaped
+# before they become <mark> tags, so message text is never rendered as HTML
+HIGHLIGHT_START = '\ue000'
+HIGHLIGHT_STOP = '\ue001'
+
+class ParticipantSerializer(UserBasicSerializer):
+    """User details plus presence, read from context['presence'] ({user_id: last seen})"""
+    is_online = serializers.SerializerMethodField()
+    last_seen = serializers.SerializerMethodField()
+    
+    class Meta(UserBasicSerializer.Meta):
+        fields = UserBasicSerializer.Meta.fields + ['is_online', 'last_seen']
+        read_only_fields = fields
+    
+    def get_is_online(self, obj):
+        return obj.id in self.context.get('presence', {})
+    
+    def get_last_seen(self, obj):
+        return self.context.get('presence', {}).get(obj.id)
+
+class MessageSerializer(DirectUploadMixin, serializers.ModelSerializer):
     sender_details = UserBasicSerializer(source='sender', read_only=True)
+    is_read = serializers.SerializerMethodField()
+    seen_by = serializers.SerializerMethodField()
     
     class Meta:
         model = Message
-        fields = '__all__'
-        read_only_fields = ('created_at', 'read_at', 'is_read')
+        exclude = ('search_vector',)
+        read_only_fields = ('created_at',)
+    
+    def get_watermarks(self, obj):
+        """{user_id: last read message id}, passed in context by list views or loaded once per conversation"""
+        watermarks = self.context.get('read_watermarks')
+        if watermarks is None:
+            watermarks = obj.conversation.read_watermarks()
+            self.context['read_watermarks'] = watermarks
+        return watermarks
+    
+    def get_seen_by(self, obj):
+        return [
+            user_id for user_id, last_read_id in self.get_watermarks(obj).items()
+            if user_id != obj.sender_id and last_read_id is not None and last_read_id >= obj.id
+        ]
+    
+    def get_is_read(self, obj):
+        request = self.context.get('request')
+        if request and request.user.is_authenticated and request.user.id != obj.sender_id:
+            last_read_id = self.get_watermarks(obj).get(request.user.id)
+            return last_read_id is not None and last_read_id >= obj.id
+        # For the sender a message is read once anyone else has seen it
+        return bool(self.get_seen_by(obj))
+
+class MessageSearchResultSerializer(serializers.ModelSerializer):
+    sender_details = UserBasicSerializer(source='sender', read_only=True)
+    snippet = serializers.SerializerMethodField()
+    rank = serializers.FloatField(read_only=True)
+    conversation_details = serializers.SerializerMethodField()
+    cursor = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Message
+        fields = ('id', 'conversation', 'conversation_details', 'sender', 'sender_details',
+                  'snippet', 'rank', 'created_at', 'cursor')
+    
+    def get_snippet(self, obj):
+        return escape(obj.snippet).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+    
+    def get_conversation_details(self, obj):
+        return {
+            'id': obj.conversation_id,
+            'is_group': obj.conversation.is_group,
+            'group_name': obj.conversation.group_name,
+        }
+    
+    def get_cursor(self, obj):
+        # Open the conversation at this message with ?around=<cursor>
+        return encode_cursor(obj)
 
 class ConversationSerializer(serializers.ModelSerializer):
-    participants_details = UserBasicSerializer(source='participants', many=True, read_only=True)
+    participants_details = serializers.SerializerMethodField()
     last_message = serializers.SerializerMethodField()
     unread_count = serializers.SerializerMethodField()
     other_participant = serializers.SerializerMethodField()
+    is_muted = serializers.SerializerMethodField()
+    last_activity = serializers.SerializerMethodField()
+    read_receipts = serializers.SerializerMethodField()
     
     class Meta:
         model = Conversation
         fields = '__all__'
-        read_only_fields = ('created_at', 'updated_at')
+        # The direct-conversation pair key is derived from the participants
+        read_only_fields = ('created_at', 'updated_at', 'dm_low_user', 'dm_high_user')
+    
+    def get_membership(self, obj):
+        """The requesting user's inbox row - attached by ConversationListView or looked up once"""
+        if not hasattr(obj, 'membership'):
+            request = self.context.get('request')
+            obj.membership = None
+            if request and request.user.is_authenticated:
+                obj.membership = ConversationParticipant.objects.filter(
+                    conversation=obj,
+                    user=request.user
+                ).select_related('last_message__sender').first()
+        return obj.membership
     
     def get_last_message(self, obj):
-        last_msg = obj.messages.last()
+        membership = self.get_membership(obj)
+        last_msg = membership.last_message if membership else obj.messages.last()
         if last_msg:
-            return MessageSerializer(last_msg).data
+            context = {'request': self.context.get('request'), 'read_watermarks': self.get_watermarks(obj)}
+            return MessageSerializer(last_msg, context=context).data
         return None
     
+    def get_watermarks(self, obj):
+        # memberships are prefetched for inbox lists
+        return {member.user_id: member.last_read_message_id for member in obj.memberships.all()}
+    
+    def get_read_receipts(self, obj):
+        return [
+            {
+                'user': member.user_id,
+                'last_read_message': member.last_read_message_id,
+                'last_read_at': serializers.DateTimeField().to_representation(member.last_read_at) if member.last_read_at else None
+            }
+            for member in obj.memberships.all()
+        ]
+    
     def get_unread_count(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.messages.filter(is_read=False).exclude(sender=request.user).count()
-        return 0
+        membership = self.get_membership(obj)
+        return membership.unread_count if membership else 0
+    
+    def get_is_muted(self, obj):
+        membership = self.get_membership(obj)
+        return membership.is_muted if membership else False
+    
+    def get_last_activity(self, obj):
+        membership = self.get_membership(obj)
+        if membership:
+            return serializers.DateTimeField().to_representation(membership.last_activity)
+        return None
+    
+    def get_presence(self, obj):
+        # Inbox lists pass presence for all conversations; otherwise one lookup per conversation
+        if 'presence' not in self.context:
+            return presence.last_seen(participant.id for participant in obj.participants.all())
+        return self.context['presence']
+    
+    def get_participants_details(self, obj):
+        context = {'presence': self.get_presence(obj)}
+        return ParticipantSerializer(obj.participants.all(), many=True, context=context).data
     
     def get_other_participant(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated and not obj.is_group:
-            other = obj.get_other_participant(request.user)
-            if other:
-                return UserBasicSerializer(other).data
+            # participants are prefetched for inbox lists
+            for participant in obj.participants.all():
+                if participant.id != request.user.id:
+                    return ParticipantSerializer(participant, context={'presence': self.get_presence(obj)}).data
         return None
 
 class ConversationCreateSerializer(serializers.ModelSerializer):
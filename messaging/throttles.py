@@ -0,0 +1,191 @@
+# unitribe_server/messaging/throttles.py
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+from .models import ConversationParticipant
+
+class LocalWindowStore:
+    """
+    Sliding-window counters in process memory. Each key holds two buckets
+    (current and previous window), so memory stays constant per key no
+    matter how many requests it sees.
+    """
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def buckets(self, key, index):
+        """(current, previous) counts for window `index`"""
+        entry = self._counters.get(key)
+        if entry is None or entry[0] < index - 1:
+            return 0, 0
+        if entry[0] == index - 1:
+            return 0, entry[1]
+        return entry[1], entry[2]
+
+    def hit(self, key, index, window, limit, elapsed, cost):
+        with self._lock:
+            current, previous = self.buckets(key, index)
+            estimate = previous * (1 - elapsed) + current
+            if estimate + cost > limit:
+                return False, current, previous
+            self._counters[key] = (index, current + cost, previous, window)
+            self._hits += 1
+            if self._hits % self.SWEEP_EVERY == 0:
+                self._sweep()
+            return True, current + cost, previous
+
+    def refund(self, key, index, cost):
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is not None and entry[0] == index:
+                self._counters[key] = (index, max(entry[1] - cost, 0), entry[2], entry[3])
+
+    def _sweep(self):
+        now = time.time()
+        stale = [
+            key for key, (index, _, _, window) in self._counters.items()
+            if index < int(now // window) - 1
+        ]
+        for key in stale:
+            del self._counters[key]
+
+class CacheWindowStore:
+    """Sliding-window counters in a shared cache - one key per bucket, expiring after two windows"""
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'MESSAGE_FLOOD_CACHE', 'default')]
+
+    def hit(self, key, index, window, limit, elapsed, cost):
+        current_key = f'flood:{key}:{index}'
+        previous_key = f'flood:{key}:{index - 1}'
+        counts = self.cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        if previous * (1 - elapsed) + current + cost > limit:
+            return False, current, previous
+
+        self.cache.add(current_key, 0, timeout=window * 2)
+        try:
+            current = self.cache.incr(current_key, cost)
+        except ValueError:
+            # Evicted between add and incr
+            self.cache.set(current_key, cost, timeout=window * 2)
+            current = cost
+        return True, current, previous
+
+    def refund(self, key, index, cost):
+        try:
+            self.cache.decr(f'flood:{key}:{index}', cost)
+        except ValueError:
+            pass
+
+BACKENDS = {
+    'local': LocalWindowStore,
+    'cache': CacheWindowStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BACKENDS[getattr(settings, 'MESSAGE_FLOOD_BACKEND', 'local')]()
+    return _store
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Rate limit with an approximated sliding window: the previous window's
+    count, weighted by how much of it still overlaps, plus the current
+    window's count. Rates come from DEFAULT_THROTTLE_RATES[scope].
+    """
+
+    def get_cost(self, request, view):
+        return 1
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        cost = self.get_cost(request, view)
+        if not cost:
+            return True
+
+        now = self.timer()
+        window = self.duration
+        index = int(now // window)
+        elapsed = (now % window) / window
+        allowed, current, previous = get_store().hit(
+            self.key, index, window, self.num_requests, elapsed, cost
+        )
+        if allowed:
+            self.charged = (index, cost)
+        else:
+            self.retry_after = self._retry_after(current, previous, elapsed, cost)
+        return allowed
+
+    def refund(self):
+        """Take back an allowed request that another throttle then rejected"""
+        charged = getattr(self, 'charged', None)
+        if charged:
+            get_store().refund(self.key, *charged)
+            self.charged = None
+
+    def _retry_after(self, current, previous, elapsed, cost):
+        window = self.duration
+        headroom = self.num_requests - current - cost
+        if headroom < 0 or not previous:
+            # Only the next window can make room
+            return window * (1 - elapsed)
+        # Wait until enough of the previous window has slid out
+        needed = 1 - headroom / previous
+        return max(0, (needed - elapsed) * window)
+
+    def wait(self):
+        return getattr(self, 'retry_after', None)
+
+class SenderMessageThrottle(SlidingWindowThrottle):
+    """Messages a single user may send, across all conversations"""
+    scope = 'message_sender'
+
+    def get_cache_key(self, request, view):
+        return f'{self.scope}:{request.user.pk}'
+
+class ConversationFanoutThrottle(SlidingWindowThrottle):
+    """
+    Deliveries per conversation: each message costs one per recipient, so
+    a large group reaches the limit after far fewer messages than a DM.
+    The cost is capped so that even the largest group can send
+    MIN_MESSAGES_PER_WINDOW messages per window.
+    """
+    scope = 'message_fanout'
+    MIN_MESSAGES_PER_WINDOW = 20
+
+    def get_cache_key(self, request, view):
+        return f"{self.scope}:{view.kwargs['conversation_id']}"
+
+    def get_cost(self, request, view):
+        member_ids = ConversationParticipant.objects.filter(
+            conversation_id=view.kwargs['conversation_id']
+        ).values_list('user_id', flat=True)
+        member_ids = set(member_ids)
+        # Outsiders are rejected by the view and must not eat the group's budget
+        if request.user.pk not in member_ids:
+            return 0
+        max_cost = max(self.num_requests // self.MIN_MESSAGES_PER_WINDOW, 1)
+        return min(max(len(member_ids) - 1, 1), max_cost)
@@ -6,21 +6,28 @@ from .views import (
     MessageListView, MessageDetailView,
     MarkAllAsReadView, UserMessageSettingsView,
     SearchConversationsView, AddParticipantView,
-    RemoveParticipantView
+    RemoveParticipantView, MuteConversationView,
+    MessageSeenByView, MessageSearchView, DirectConversationView,
+    TypingView
 )
 
 urlpatterns = [
     # Conversations
     path('conversations/', ConversationListView.as_view(), name='conversation-list'),
+    path('conversations/direct/', DirectConversationView.as_view(), name='direct-conversation'),
     path('conversations/search/', SearchConversationsView.as_view(), name='search-conversations'),
     path('conversations/<int:pk>/', ConversationDetailView.as_view(), name='conversation-detail'),
     path('conversations/<int:conversation_id>/mark-all-read/', MarkAllAsReadView.as_view(), name='mark-all-read'),
     path('conversations/<int:conversation_id>/add-participant/', AddParticipantView.as_view(), name='add-participant'),
     path('conversations/<int:conversation_id>/remove-participant/', RemoveParticipantView.as_view(), name='remove-participant'),
+    path('conversations/<int:conversation_id>/mute/', MuteConversationView.as_view(), name='mute-conversation'),
+    path('conversations/<int:conversation_id>/typing/', TypingView.as_view(), name='conversation-typing'),
     
     # Messages
     path('conversations/<int:conversation_id>/messages/', MessageListView.as_view(), name='message-list'),
+    path('messages/search/', MessageSearchView.as_view(), name='message-search'),
     path('messages/<int:pk>/', MessageDetailView.as_view(), name='message-detail'),
+    path('messages/<int:pk>/seen-by/', MessageSeenByView.as_view(), name='message-seen-by'),
     
     # Settings
     path('settings/', UserMessageSettingsView.as_view(), name='message-settings'),
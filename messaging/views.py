@@ -1,20 +1,50 @@
 #unitribe_server/messaging/views.py
 
-from rest_framework import generics, permissions, status, viewsets
+from rest_framework import generics, permissions, serializers, status, viewsets
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 from rest_framework.decorators import action
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db.models import F, Q, prefetch_related_objects
 from django.utils import timezone
 
-from .models import Conversation, Message, UserMessageSettings
+from .models import SEARCH_CONFIG, Conversation, ConversationParticipant, Message, UserMessageSettings
+from .pagination import MessageCursorPagination, MessageSearchPagination
 from .serializers import (
     ConversationSerializer, ConversationCreateSerializer,
-    MessageSerializer, UserMessageSettingsSerializer
+    MessageSerializer, MessageSearchResultSerializer,
+    UserMessageSettingsSerializer, HIGHLIGHT_START, HIGHLIGHT_STOP
 )
+from .throttles import ConversationFanoutThrottle, SenderMessageThrottle, SlidingWindowThrottle
+from .alerts import member_rows, notify_new_message
 from users.models import User
-from notifications.models import Notification
+from users.serializers import UserBasicSerializer
+from notifications.services import notify
+from realtime import presence
+from realtime.pubsub import publish
+
+def search_query(text):
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+def user_conversation_ids(user):
+    # Subquery on the participant table's user index - never scans other users' conversations
+    return ConversationParticipant.objects.filter(user=user).values('conversation_id')
+
+def publish_read_watermark(conversation, user):
+    """Push `user`'s new read position to every participant's sockets"""
+    memberships = list(conversation.memberships.values_list('user_id', 'last_read_message_id', 'last_read_at'))
+    watermark = next((member for member in memberships if member[0] == user.id), None)
+    if watermark is None:
+        return
+    publish([member[0] for member in memberships], {
+        'type': 'conversation.read',
+        'conversation': conversation.id,
+        'user': user.id,
+        'last_read_message': watermark[1],
+        'last_read_at': watermark[2],
+    })
 
 class ConversationListView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -30,8 +60,41 @@ class ConversationListView(generics.ListCreateAPIView):
         return context
     
     def get_queryset(self):
-        user = self.request.user
-        return Conversation.objects.filter(participants=user).order_by('-updated_at')
+        # The user's inbox rows, newest activity first, via the (user, last_activity) index
+        return ConversationParticipant.objects.filter(
+            user=self.request.user
+        ).select_related('conversation').order_by('-last_activity')
+    
+    def list(self, request, *args, **kwargs):
+        memberships = list(self.get_queryset())
+        # A join on the message id alone opens every monthly partition; each
+        # last message was created at its row's last_activity, so the exact
+        # timestamps let Postgres read only the months that hold them
+        with_message = [membership for membership in memberships if membership.last_message_id]
+        last_messages = Message.objects.filter(
+            id__in=[membership.last_message_id for membership in with_message],
+            created_at__in={membership.last_activity for membership in with_message}
+        ).select_related('sender').in_bulk() if with_message else {}
+        
+        conversations = []
+        for membership in memberships:
+            membership.last_message = last_messages.get(membership.last_message_id)
+            conversation = membership.conversation
+            conversation.membership = membership
+            conversations.append(conversation)
+        prefetch_related_objects(conversations, 'participants', 'memberships')
+        
+        # One presence lookup for every participant in the inbox
+        participant_ids = {
+            participant.id
+            for conversation in conversations
+            for participant in conversation.participants.all()
+        }
+        context = self.get_serializer_context()
+        context['presence'] = presence.last_seen(participant_ids)
+        
+        serializer = self.get_serializer(conversations, many=True, context=context)
+        return Response(serializer.data)
     
     def perform_create(self, serializer):
         participant_ids = serializer.validated_data.pop('participant_ids')
@@ -40,15 +103,17 @@ class ConversationListView(generics.ListCreateAPIView):
         # Add current user to participants
         participants = list(participants) + [self.request.user]
         
-        # Check if conversation already exists (for 1-1)
+        # One-to-one conversations are found by their canonical user pair
         if not serializer.validated_data.get('is_group'):
-            existing_conv = Conversation.objects.filter(
-                is_group=False,
-                participants__in=participants
-            ).annotate(num_participants=Count('participants')).filter(num_participants=len(participants))
+            others = {participant for participant in participants if participant.id != self.request.user.id}
+            if len(others) != 1:
+                raise serializers.ValidationError("A direct conversation needs exactly one other participant")
             
-            if existing_conv.exists():
+            conversation, created = Conversation.get_or_create_direct(self.request.user, others.pop())
+            if not created:
                 raise serializers.ValidationError("Conversation already exists")
+            serializer.instance = conversation
+            return
         
         conversation = serializer.save()
         conversation.participants.set(participants)
@@ -57,6 +122,39 @@ class ConversationListView(generics.ListCreateAPIView):
             conversation.group_admin = self.request.user
             conversation.save()
 
+class DirectConversationView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        """Get or create the one-to-one conversation with `user_id`"""
+        user_id = request.data.get('user_id')
+        if not user_id:
+            return Response(
+                {'error': 'user_id required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            other = User.objects.get(id=user_id)
+        except (User.DoesNotExist, ValueError, TypeError):
+            return Response(
+                {'error': 'User not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        if other.id == request.user.id:
+            return Response(
+                {'error': 'Cannot start a conversation with yourself'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        conversation, created = Conversation.get_or_create_direct(request.user, other)
+        serializer = ConversationSerializer(conversation, context={'request': request})
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
 class ConversationDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Conversation.objects.all()
     serializer_class = ConversationSerializer
@@ -71,17 +169,16 @@ class ConversationDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance = self.get_object()
         
         # Check if user is participant
-        if request.user not in instance.participants.all():
+        if not instance.has_participant(request.user):
             return Response(
                 {'error': 'Not a participant'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Mark all messages as read
-        instance.messages.filter(is_read=False).exclude(sender=request.user).update(
-            is_read=True,
-            read_at=timezone.now()
-        )
+        # Opening the conversation moves the read watermark - one row, however many messages
+        instance.mark_read(request.user)
+        presence.start_viewing(request.user.id, instance.id)
+        publish_read_watermark(instance, request.user)
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
@@ -112,40 +209,75 @@ class ConversationDetailView(generics.RetrieveUpdateDestroyAPIView):
 class MessageListView(generics.ListCreateAPIView):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MessageCursorPagination
+    
+    def get_throttles(self):
+        # Flood control runs before any write; reading history is not limited
+        throttles = super().get_throttles()
+        if self.request.method == 'POST':
+            throttles += [SenderMessageThrottle(), ConversationFanoutThrottle()]
+        return throttles
+    
+    def check_throttles(self, request):
+        # A rejected message must not use up the windows it already passed
+        granted = []
+        for throttle in self.get_throttles():
+            if not throttle.allow_request(request, self):
+                for passed in granted:
+                    if isinstance(passed, SlidingWindowThrottle):
+                        passed.refund()
+                self.throttled(request, throttle.wait())
+            granted.append(throttle)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == 'GET':
+            # One query for every participant's watermark; is_read/seen_by compare against it
+            context['read_watermarks'] = dict(ConversationParticipant.objects.filter(
+                conversation_id=self.kwargs['conversation_id']
+            ).values_list('user_id', 'last_read_message_id'))
+        return context
     
     def get_queryset(self):
         conversation_id = self.kwargs['conversation_id']
         conversation = get_object_or_404(Conversation, id=conversation_id)
         
-        # Check if user is participant
-        if self.request.user not in conversation.participants.all():
+        # Check if user is participant; their inbox row also dates the newest message
+        self.latest_activity = conversation.memberships.filter(
+            user=self.request.user
+        ).values_list('last_activity', flat=True).first()
+        if self.latest_activity is None:
             return Message.objects.none()
         
-        return Message.objects.filter(conversation=conversation).order_by('-created_at')[:100]
+        # Fetching history means the conversation is on screen
+        presence.start_viewing(self.request.user.id, conversation.id)
+        
+        # Ordering and slicing are applied by the cursor pagination
+        return Message.objects.filter(conversation=conversation).select_related('sender')
     
     def perform_create(self, serializer):
         conversation_id = self.kwargs['conversation_id']
         conversation = get_object_or_404(Conversation, id=conversation_id)
         
         # Check if user is participant
-        if self.request.user not in conversation.participants.all():
+        if not conversation.has_participant(self.request.user):
             self.permission_denied(self.request)
         
         message = serializer.save(
             conversation=conversation,
             sender=self.request.user
         )
+        conversation.record_message(message)
+        members = member_rows(conversation)
+        
+        # New messages are not read by anyone yet, so no watermarks are needed
+        publish([member[0] for member in members], {
+            'type': 'message.created',
+            'conversation': conversation.id,
+            'message': MessageSerializer(message, context={'read_watermarks': {}}).data,
+        })
         
-        # Create notifications for other participants
-        for participant in conversation.participants.all():
-            if participant != self.request.user:
-                Notification.objects.create(
-                    user=participant,
-                    notification_type='message',
-                    title='New Message',
-                    message=f'New message from {self.request.user.get_full_name()}',
-                    related_id=conversation.id
-                )
+        notify_new_message(conversation, message, members)
 
 class MessageDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = MessageSerializer
@@ -158,7 +290,7 @@ class MessageDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance = self.get_object()
         
         # Check if user is in conversation
-        if request.user not in instance.conversation.participants.all():
+        if not instance.conversation.has_participant(request.user):
             return Response(
                 {'error': 'Not authorized'},
                 status=status.HTTP_403_FORBIDDEN
@@ -166,7 +298,8 @@ class MessageDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         # Mark as read if not sender
         if instance.sender != request.user:
-            instance.mark_as_read()
+            instance.mark_as_read(request.user)
+            publish_read_watermark(instance.conversation, request.user)
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
@@ -177,24 +310,112 @@ class MarkAllAsReadView(APIView):
     def post(self, request, conversation_id):
         conversation = get_object_or_404(Conversation, id=conversation_id)
         
-        if request.user not in conversation.participants.all():
+        if not conversation.has_participant(request.user):
             return Response(
                 {'error': 'Not a participant'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        updated = conversation.messages.filter(
-            is_read=False
-        ).exclude(sender=request.user).update(
-            is_read=True,
-            read_at=timezone.now()
-        )
+        updated = conversation.memberships.filter(user=request.user).values_list('unread_count', flat=True).first() or 0
+        conversation.mark_read(request.user)
+        publish_read_watermark(conversation, request.user)
         
         return Response({
             'status': 'marked_as_read',
             'updated_count': updated
         })
 
+class MessageSeenByView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, pk):
+        message = get_object_or_404(Message, id=pk)
+        
+        if not message.conversation.has_participant(request.user):
+            return Response(
+                {'error': 'Not authorized'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        # Everyone whose watermark is at or past this message has seen it
+        readers = ConversationParticipant.objects.filter(
+            conversation_id=message.conversation_id,
+            last_read_message_id__gte=message.id
+        ).exclude(user_id=message.sender_id).select_related('user').order_by('last_read_at')
+        
+        return Response([
+            {
+                'user': UserBasicSerializer(reader.user).data,
+                'last_read_at': reader.last_read_at
+            }
+            for reader in readers
+        ])
+
+class TypingView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'typing'
+    
+    def get(self, request, conversation_id):
+        conversation = get_object_or_404(Conversation, id=conversation_id)
+        member_ids = list(conversation.memberships.values_list('user_id', flat=True))
+        if request.user.id not in member_ids:
+            return Response(
+                {'error': 'Not a participant'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        typing = presence.typing_user_ids(conversation.id, member_ids)
+        return Response({'typing': [user_id for user_id in typing if user_id != request.user.id]})
+    
+    def post(self, request, conversation_id):
+        """Typing state lives in the presence store only; it expires on its own"""
+        conversation = get_object_or_404(Conversation, id=conversation_id)
+        member_ids = list(conversation.memberships.values_list('user_id', flat=True))
+        if request.user.id not in member_ids:
+            return Response(
+                {'error': 'Not a participant'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        typing = str(request.data.get('typing', True)).lower() not in ('false', '0')
+        if typing:
+            changed = presence.start_typing(conversation.id, request.user.id)
+        else:
+            presence.stop_typing(conversation.id, request.user.id)
+            changed = True
+        presence.heartbeat(request.user.id)
+        
+        # Only state changes are pushed; clients expire typing after TYPING_TTL
+        if changed:
+            publish([user_id for user_id in member_ids if user_id != request.user.id], {
+                'type': 'typing',
+                'conversation': conversation.id,
+                'user': request.user.id,
+                'typing': typing,
+                'ttl': presence.TYPING_TTL,
+            })
+        
+        return Response({'status': 'typing' if typing else 'stopped'})
+
+class MuteConversationView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, conversation_id):
+        muted = str(request.data.get('muted', True)).lower() not in ('false', '0')
+        updated = ConversationParticipant.objects.filter(
+            conversation_id=conversation_id,
+            user=request.user
+        ).update(is_muted=muted)
+        
+        if not updated:
+            return Response(
+                {'error': 'Not a participant'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        return Response({'status': 'muted' if muted else 'unmuted'})
+
 class UserMessageSettingsView(generics.RetrieveUpdateAPIView):
     serializer_class = UserMessageSettingsSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -214,16 +435,54 @@ class SearchConversationsView(generics.ListAPIView):
         if not search:
             return Conversation.objects.none()
         
-        # Search in conversation participants
+        # Matching messages come from the search index, limited to this user's conversations
+        matching = Message.objects.filter(
+            conversation_id__in=user_conversation_ids(user),
+            search_vector=search_query(search)
+        ).values('conversation_id')
+        
         conversations = Conversation.objects.filter(
-            participants=user
+            id__in=user_conversation_ids(user)
         ).filter(
             Q(group_name__icontains=search) |
-            Q(messages__content__icontains=search)
-        ).distinct().order_by('-updated_at')
+            Q(id__in=matching)
+        ).order_by('-updated_at')
         
         return conversations
 
+class MessageSearchView(generics.ListAPIView):
+    serializer_class = MessageSearchResultSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MessageSearchPagination
+    
+    def get_queryset(self):
+        search = self.request.query_params.get('q', '').strip()
+        if not search:
+            return Message.objects.none()
+        
+        query = search_query(search)
+        messages = Message.objects.filter(
+            conversation_id__in=user_conversation_ids(self.request.user),
+            search_vector=query
+        )
+        
+        conversation_id = self.request.query_params.get('conversation')
+        if conversation_id:
+            if not conversation_id.isdigit():
+                raise serializers.ValidationError({'conversation': 'conversation must be an id'})
+            messages = messages.filter(conversation_id=int(conversation_id))
+        
+        return messages.annotate(
+            rank=SearchRank(F('search_vector'), query),
+            snippet=SearchHeadline(
+                'content', query,
+                config=SEARCH_CONFIG,
+                start_sel=HIGHLIGHT_START,
+                stop_sel=HIGHLIGHT_STOP,
+                max_fragments=2
+            )
+        ).select_related('conversation', 'sender').order_by('-rank', '-created_at', '-id')
+
 class AddParticipantView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
@@ -252,7 +511,7 @@ class AddParticipantView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        if participant in conversation.participants.all():
+        if conversation.has_participant(participant):
             return Response(
                 {'error': 'User already in conversation'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -261,12 +520,12 @@ class AddParticipantView(APIView):
         conversation.participants.add(participant)
         
         # Notify new participant
-        Notification.objects.create(
-            user=participant,
-            notification_type='message',
+        notify(
+            participant,
+            'message',
             title='Added to Group',
             message=f'You have been added to group: {conversation.group_name}',
-            related_id=conversation.id
+            target=conversation
         )
         
         return Response({
@@ -308,7 +567,7 @@ class RemoveParticipantView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        if participant not in conversation.participants.all():
+        if not conversation.has_participant(participant):
             return Response(
                 {'error': 'User not in conversation'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -317,12 +576,12 @@ class RemoveParticipantView(APIView):
         conversation.participants.remove(participant)
         
         # Notify removed participant
-        Notification.objects.create(
-            user=participant,
-            notification_type='message',
+        notify(
+            participant,
+            'message',
             title='Removed from Group',
             message=f'You have been removed from group: {conversation.group_name}',
-            related_id=conversation.id
+            target=conversation
         )
         
         return Response({
@@ -1,8 +1,13 @@
 from django.contrib import admin
-from .models import Notification
+from .models import ClubNotificationMute, Notification
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('title', 'user', 'notification_type', 'is_read', 'created_at')
     list_filter = ('notification_type', 'is_read')
     search_fields = ('title', 'message', 'user__email')
+
+@admin.register(ClubNotificationMute)
+class ClubNotificationMuteAdmin(admin.ModelAdmin):
+    list_display = ('user', 'club', 'created_at')
+    search_fields = ('user__email', 'club__name')
@@ -0,0 +1,72 @@
+# unitribe_server/notifications/counters.py
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Notification
+
+# Counts drift only if a write path skips these helpers; expiry and
+# reconcile_notification_counts bound how long a wrong count can live
+COUNTER_TIMEOUT = 24 * 60 * 60
+
+def counter_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+def count_unread(user_id):
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+def get_unread_count(user_id):
+    """The user's unread notification count - a cache hit, counted once on a miss"""
+    count = cache.get(counter_key(user_id))
+    if count is None:
+        count = count_unread(user_id)
+        # add, not set: a concurrent increment may already have stored a newer value
+        if not cache.add(counter_key(user_id), count, COUNTER_TIMEOUT):
+            count = cache.get(counter_key(user_id), count)
+    return max(count, 0)
+
+def adjust_unread_count(user_id, delta):
+    """Shift a cached count, returning the new value; a missing counter is left to be counted"""
+    try:
+        count = cache.incr(counter_key(user_id), delta)
+    except ValueError:
+        return get_unread_count(user_id)
+    if count < 0:
+        # Drifted - count again
+        cache.delete(counter_key(user_id))
+        return get_unread_count(user_id)
+    return count
+
+def increment_unread_counts(user_counts):
+    """{user_id: new unread notifications} after a bulk insert"""
+    for user_id, delta in user_counts.items():
+        if delta:
+            adjust_unread_count(user_id, delta)
+
+def reset_unread_count(user_id):
+    cache.set(counter_key(user_id), 0, COUNTER_TIMEOUT)
+
+def invalidate_unread_counts(user_ids):
+    """Forget cached counts after a change of unknown size, e.g. a bulk delete"""
+    cache.delete_many([counter_key(user_id) for user_id in user_ids])
+
+def delete_notifications(queryset):
+    """Delete notifications, dropping the cached counts of users who lose unread ones"""
+    user_ids = list(queryset.filter(is_read=False).values_list('user_id', flat=True).distinct().order_by())
+    deleted, _ = queryset.delete()
+    if user_ids:
+        transaction.on_commit(lambda: invalidate_unread_counts(user_ids))
+    return deleted
+
+def reconcile_unread_counts(user_ids=None):
+    """Store the counted unread total for each user; all users with unread notifications by default"""
+    unread = Notification.objects.filter(is_read=False)
+    if user_ids is not None:
+        unread = unread.filter(user_id__in=user_ids)
+    counts = dict(unread.values_list('user_id').annotate(count=Count('id')).order_by())
+    if user_ids is not None:
+        for user_id in user_ids:
+            counts.setdefault(user_id, 0)
+    cache.set_many({counter_key(user_id): count for user_id, count in counts.items()}, COUNTER_TIMEOUT)
+    return counts
@@ -0,0 +1,133 @@
+# unitribe_server/notifications/digests.py
+
+import logging
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Notification, NotificationSettings
+
+logger = logging.getLogger(__name__)
+
+DIGEST_PERIODS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(days=7),
+}
+# A user is due a little early rather than skipped for a whole period when
+# the scheduler runs late
+DUE_SLACK = timedelta(hours=1)
+MAX_ITEMS = 20
+STREAM_PAGE_SIZE = 2000
+
+def due_notifications(now):
+    """
+    Unread notifications for every user due a digest, created since their
+    last one, ordered by (user_id, id). Read in keyset pages so no page
+    holds more than STREAM_PAGE_SIZE rows or a long-lived cursor.
+    """
+    due = Q()
+    for frequency, period in DIGEST_PERIODS.items():
+        due |= Q(frequency=frequency) & (
+            Q(last_digest_at__isnull=True, created_at__gt=now - period)
+            | Q(last_digest_at__lte=now - period + DUE_SLACK, created_at__gt=F('last_digest_at'))
+        )
+    
+    queryset = Notification.objects.annotate(
+        # Users who never chose get the model default
+        frequency=Coalesce(F('user__notification_settings__digest_frequency'), Value('daily')),
+        last_digest_at=F('user__notification_settings__last_digest_at'),
+    ).filter(
+        due, is_read=False, user__is_active=True
+    ).exclude(user__email='').values(
+        'id', 'user_id', 'user__email', 'user__first_name', 'title', 'message'
+    )
+    
+    last_user_id, last_id = 0, 0
+    while True:
+        page = list(queryset.filter(
+            Q(user_id__gt=last_user_id) | Q(user_id=last_user_id, id__gt=last_id)
+        ).order_by('user_id', 'id')[:STREAM_PAGE_SIZE])
+        if not page:
+            return
+        yield from page
+        last_user_id, last_id = page[-1]['user_id'], page[-1]['id']
+
+def render_digest(rows):
+    """One email for one user's unread notifications, oldest first"""
+    first = rows[0]
+    count = len(rows)
+    lines = [f"- {row['title']}: {row['message']}" for row in rows[-MAX_ITEMS:]]
+    if count > MAX_ITEMS:
+        lines.insert(0, f'...and {count - MAX_ITEMS} earlier')
+    items = '\n'.join(lines)
+    
+    subject = f"UniTribe: {count} unread notification{'s' if count != 1 else ''}"
+    body = f"""Hi {first['user__first_name'] or 'there'},
+
+You have {count} unread notification{'s' if count != 1 else ''} on UniTribe:
+
+{items}
+
+View them: {settings.FRONTEND_URL}/notifications
+
+Change how often you get this email: {settings.FRONTEND_URL}/settings/notifications
+"""
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [first['user__email']])
+
+def mark_digest_sent(user_ids, now):
+    NotificationSettings.objects.bulk_create(
+        [NotificationSettings(user_id=user_id, last_digest_at=now) for user_id in user_ids],
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['last_digest_at', 'updated_at']
+    )
+
+def send_digests(batch_size=100, dry_run=False, now=None):
+    """
+    Email every due user one digest over a single SMTP connection, in
+    batches of send_messages. Returns (sent, failed); a failed batch is
+    retried on the next run.
+    """
+    now = now or timezone.now()
+    sent = failed = 0
+    batch = []
+    connection = None if dry_run else get_connection()
+    
+    def flush():
+        nonlocal sent, failed
+        if not batch:
+            return
+        user_ids = [user_id for user_id, _ in batch]
+        if dry_run:
+            sent += len(batch)
+        else:
+            try:
+                connection.send_messages([message for _, message in batch])
+            except Exception:
+                logger.exception('Sending %d digests failed', len(batch))
+                failed += len(batch)
+                # Start the next batch on a fresh connection
+                connection.close()
+                connection.open()
+            else:
+                mark_digest_sent(user_ids, now)
+                sent += len(batch)
+        batch.clear()
+    
+    if connection is not None:
+        connection.open()
+    try:
+        for user_id, rows in groupby(due_notifications(now), key=lambda row: row['user_id']):
+            batch.append((user_id, render_digest(list(rows))))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        if connection is not None:
+            connection.close()
+    return sent, failed
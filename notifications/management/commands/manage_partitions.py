@@ -0,0 +1,49 @@
+#unitribe_server/notifications/management/commands/manage_partitions.py
+
+from django.core.management.base import BaseCommand
+
+from unitribe_server.partitioning import (
+    DEFAULT_MONTHS_AHEAD, create_future_partitions, drop_partition,
+    expired_partitions, is_partitioned, partitioned_models
+)
+
+class Command(BaseCommand):
+    help = ('Create upcoming monthly partitions for messages and notifications and drop '
+            'months past MESSAGE_RETENTION_MONTHS / NOTIFICATION_RETENTION_MONTHS - run daily')
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=DEFAULT_MONTHS_AHEAD,
+            help=f'Months of partitions to keep ready (default: {DEFAULT_MONTHS_AHEAD})'
+        )
+        parser.add_argument(
+            '--detach',
+            action='store_true',
+            help='Detach expired partitions as standalone tables instead of dropping them'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be dropped without changing anything'
+        )
+    
+    def handle(self, *args, **options):
+        for model, retention_months in partitioned_models():
+            table = model._meta.db_table
+            if not is_partitioned(model):
+                self.stdout.write(f'{table} is not partitioned - skipping')
+                continue
+            
+            expired = expired_partitions(model, retention_months)
+            if options['dry_run']:
+                for name, _ in expired:
+                    self.stdout.write(f'Would {"detach" if options["detach"] else "drop"} {name}')
+                continue
+            
+            for name in create_future_partitions(model, options['months_ahead']):
+                self.stdout.write(self.style.SUCCESS(f'Created {name}'))
+            for name, month in expired:
+                drop_partition(model, name, month, detach_only=options['detach'])
+                self.stdout.write(self.style.SUCCESS(f'{"Detached" if options["detach"] else "Dropped"} {name}'))
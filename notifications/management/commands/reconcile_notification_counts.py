@@ -0,0 +1,39 @@
+#unitribe_server/notifications/management/commands/reconcile_notification_counts.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notifications.counters import reconcile_unread_counts
+from notifications.models import Notification
+
+class Command(BaseCommand):
+    help = 'Recount cached unread notification badges - run periodically (e.g. hourly from cron)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Also reset users whose notifications changed in this window and now have none unread (default: 24)'
+        )
+    
+    def handle(self, *args, **options):
+        # Every user with unread notifications, in one grouped query
+        counts = reconcile_unread_counts()
+        
+        # Users whose last unread notification went away keep a stale
+        # non-zero counter unless they are reset too
+        since = timezone.now() - timedelta(hours=options['hours'])
+        recent = set(
+            Notification.objects.filter(created_at__gte=since)
+            .values_list('user_id', flat=True).distinct().order_by()
+        )
+        reset = recent - set(counts)
+        if reset:
+            reconcile_unread_counts(list(reset))
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled {len(counts)} users with unread notifications, reset {len(reset)}'
+        ))
@@ -0,0 +1,31 @@
+#unitribe_server/notifications/management/commands/send_notification_digests.py
+
+from django.core.management.base import BaseCommand
+
+from notifications.digests import send_digests
+
+class Command(BaseCommand):
+    help = 'Email unread notification digests to users who are due one - run hourly'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Emails per send_messages call on the shared connection (default: 100)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the digests that would be sent without sending them'
+        )
+    
+    def handle(self, *args, **options):
+        sent, failed = send_digests(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        
+        if options['dry_run']:
+            self.stdout.write(f'Would send {sent} digests')
+            return
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} digests'))
+        if failed:
+            self.stdout.write(self.style.ERROR(f'{failed} digests failed and will be retried on the next run'))
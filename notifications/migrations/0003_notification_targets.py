@@ -0,0 +1,61 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+# related_id meant different things per notification type
+TARGET_TYPE_BY_NOTIFICATION_TYPE = {
+    'event': 'event',
+    'post': 'post',
+    'club': 'club',
+    'message': 'conversation',
+}
+
+def set_target_types(apps, schema_editor):
+    Notification = apps.get_model('notifications', 'Notification')
+    for notification_type, target_type in TARGET_TYPE_BY_NOTIFICATION_TYPE.items():
+        Notification.objects.filter(
+            notification_type=notification_type,
+            target_id__isnull=False
+        ).update(target_type=target_type)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='notification',
+            old_name='related_id',
+            new_name='target_id',
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='target_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='target_type',
+            field=models.CharField(blank=True, choices=[('event', 'Event'), ('post', 'Post'), ('club', 'Club'), ('conversation', 'Conversation'), ('user', 'User')], max_length=20, null=True),
+        ),
+        migrations.RunPython(set_target_types, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='notification',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notif_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['target_type', 'target_id'], name='notif_target_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:20
+
+from django.db import migrations
+
+from unitribe_server.partitioning import partition_table, unpartition_table
+
+def partition_notifications(apps, schema_editor):
+    partition_table(schema_editor, 'notifications_notification')
+
+def unpartition_notifications(apps, schema_editor):
+    unpartition_table(schema_editor, 'notifications_notification')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notification_settings'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_notifications, unpartition_notifications),
+    ]
@@ -3,6 +3,25 @@
 from django.db import models
 from users.models import User
 
+# What a notification points at, by model
+TARGET_TYPES = {
+    'events.Event': 'event',
+    'posts.Post': 'post',
+    'clubs.Club': 'club',
+    'messaging.Conversation': 'conversation',
+    'users.User': 'user',
+}
+
+def target_reference(obj):
+    """(target_type, target_id) for a model instance"""
+    return TARGET_TYPES[obj._meta.label], obj.pk
+
+class NotificationQuerySet(models.QuerySet):
+    def for_target(self, obj):
+        """Notifications about obj - served by the (target_type, target_id) index"""
+        target_type, target_id = target_reference(obj)
+        return self.filter(target_type=target_type, target_id=target_id)
+
 class Notification(models.Model):
     NOTIFICATION_TYPES = [
         ('event', 'Event'),
@@ -11,19 +30,98 @@ class Notification(models.Model):
         ('message', 'Message'),
         ('system', 'System'),
     ]
+    TARGET_TYPE_CHOICES = [
+        ('event', 'Event'),
+        ('post', 'Post'),
+        ('club', 'Club'),
+        ('conversation', 'Conversation'),
+        ('user', 'User'),
+    ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES)
     title = models.CharField(max_length=200)
     message = models.TextField()
-    related_id = models.IntegerField(null=True, blank=True)
+    target_type = models.CharField(max_length=20, choices=TARGET_TYPE_CHOICES, null=True, blank=True)
+    target_id = models.BigIntegerField(null=True, blank=True)
     is_read = models.BooleanField(default=False)
+    # Activity by many actors on one target shares an unread row, see
+    # notifications.services.notify_activity
+    collapse_key = models.CharField(max_length=100, null=True, blank=True)
+    actor_count = models.PositiveIntegerField(default=1)
+    actor_ids = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = NotificationQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.title} - {self.user}"
     
+    @property
+    def related_id(self):
+        # Former name of target_id, still sent by the API
+        return self.target_id
+    
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Keyset listing of a user's notifications
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_user_created_idx'),
+            # Unread filtering and counting
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_unread_idx'),
+            models.Index(fields=['target_type', 'target_id'], name='notif_target_idx'),
+            # The open group a new actor is folded into
+            models.Index(
+                fields=['user', 'collapse_key'],
+                name='notif_collapse_idx',
+                condition=models.Q(is_read=False, collapse_key__isnull=False)
+            ),
+        ]
+
+# Bit of each type in NotificationSettings.muted_types - append new types, never reorder
+TYPE_BITS = {
+    notification_type: 1 << index
+    for index, (notification_type, _) in enumerate(Notification.NOTIFICATION_TYPES)
+}
+# Account and moderation notices are always delivered
+UNMUTABLE_TYPES = {'system'}
+
+def type_mask(notification_types):
+    mask = 0
+    for notification_type in notification_types:
+        mask |= TYPE_BITS[notification_type]
+    return mask
 
+class NotificationSettings(models.Model):
+    DIGEST_FREQUENCIES = [
+        ('never', 'Never'),
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+    ]
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_settings')
+    digest_frequency = models.CharField(max_length=10, choices=DIGEST_FREQUENCIES, default='daily')
+    last_digest_at = models.DateTimeField(null=True, blank=True)
+    # Notification types the user does not want, as a TYPE_BITS mask
+    muted_types = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Notification settings for {self.user}"
+    
+    @property
+    def muted_type_names(self):
+        return [notification_type for notification_type, bit in TYPE_BITS.items() if self.muted_types & bit]
 
+class ClubNotificationMute(models.Model):
+    """No notifications about a club, its posts or its events for this user"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='club_notification_mutes')
+    club = models.ForeignKey('clubs.Club', on_delete=models.CASCADE, related_name='notification_mutes')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['user', 'club']
+    
+    def __str__(self):
+        return f"{self.user} muted {self.club}"
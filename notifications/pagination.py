@@ -0,0 +1,51 @@
+# unitribe_server/notifications/pagination.py
+
+from django.db.models import Q
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+from messaging.pagination import decode_cursor, encode_cursor
+from unitribe_server.partitioning import newest_first
+
+class NotificationCursorPagination(BasePagination):
+    """
+    Newest first, keyset over (created_at, id) on the user's index.
+    ?before=<next_cursor> fetches the following page.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'limit'
+    
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        limit = self.get_page_size(request)
+        cursor = request.query_params.get('before')
+        created_at = None
+        if cursor:
+            created_at, notification_id = decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=notification_id)
+            )
+        rows = newest_first(queryset, limit + 1, latest=created_at)
+        self.page = rows[:limit]
+        self.has_more = len(rows) > limit
+        return self.page
+    
+    def get_paginated_response(self, data):
+        return Response({
+            'results': data,
+            'next_cursor': encode_cursor(self.page[-1]) if self.has_more else None,
+            'has_more': self.has_more,
+        })
+    
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': name, 'required': False, 'in': 'query', 'schema': {'type': 'string'}}
+            for name in ('before', self.page_size_query_param)
+        ]
@@ -1,13 +1,38 @@
 # unitribe_server/notifications/serializers.py
 
 from rest_framework import serializers
-from .models import Notification
+from .models import TYPE_BITS, UNMUTABLE_TYPES, Notification, NotificationSettings, type_mask
 
 class NotificationSerializer(serializers.ModelSerializer):
+    # Former name of target_id, kept for existing clients
+    related_id = serializers.IntegerField(source='target_id', read_only=True)
+    
     class Meta:
         model = Notification
         fields = '__all__'
         read_only_fields = ('created_at',)
 
+class TypeMaskField(serializers.MultipleChoiceField):
+    """A TYPE_BITS mask, read and written as a list of notification types"""
+    
+    def __init__(self, **kwargs):
+        choices = [notification_type for notification_type in TYPE_BITS if notification_type not in UNMUTABLE_TYPES]
+        super().__init__(choices=choices, **kwargs)
+    
+    def to_representation(self, value):
+        return [notification_type for notification_type, bit in TYPE_BITS.items() if value & bit]
+    
+    def to_internal_value(self, data):
+        return type_mask(super().to_internal_value(data))
 
-
+class NotificationSettingsSerializer(serializers.ModelSerializer):
+    muted_types = TypeMaskField(required=False)
+    muted_clubs = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = NotificationSettings
+        fields = ('digest_frequency', 'muted_types', 'muted_clubs', 'last_digest_at', 'updated_at')
+        read_only_fields = ('last_digest_at', 'updated_at')
+    
+    def get_muted_clubs(self, obj):
+        return list(obj.user.club_notification_mutes.values_list('club_id', flat=True))
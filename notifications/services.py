@@ -0,0 +1,176 @@
+# unitribe_server/notifications/services.py
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from .counters import invalidate_unread_counts
+from .models import (TYPE_BITS, UNMUTABLE_TYPES, ClubNotificationMute, Notification,
+                     NotificationSettings, target_reference)
+from .serializers import NotificationSerializer
+from realtime.pubsub import publish
+from users.models import User
+
+CHUNK_SIZE = 1000
+# Actor ids kept on a collapsed notification
+RECENT_ACTORS = 10
+
+def target_fields(target):
+    if target is None:
+        return {'target_type': None, 'target_id': None}
+    target_type, target_id = target_reference(target)
+    return {'target_type': target_type, 'target_id': target_id}
+
+def target_club_id(target):
+    """The club a notification is about - the target itself or the club of a post or event"""
+    if target is None:
+        return None
+    if target._meta.label == 'clubs.Club':
+        return target.pk
+    return getattr(target, 'club_id', None)
+
+def exclude_muted(users, notification_type, club_id=None):
+    """
+    A User queryset without the users who muted this type or the club -
+    anti-joins in the same query, so muted rows are never written
+    """
+    if notification_type in UNMUTABLE_TYPES:
+        return users
+    bit = TYPE_BITS[notification_type]
+    users = users.exclude(Exists(
+        NotificationSettings.objects.alias(muted=F('muted_types').bitand(bit)).filter(user=OuterRef('pk'), muted=bit)
+    ))
+    if notification_type == 'message':
+        users = users.exclude(message_settings__message_notifications=False)
+    if club_id:
+        users = users.exclude(Exists(ClubNotificationMute.objects.filter(user=OuterRef('pk'), club_id=club_id)))
+    return users
+
+def notify(user, notification_type, title, message, target=None):
+    """
+    One notification about target (a model instance), pushed to the user's
+    sockets with its id. Returns None when the user muted it.
+    """
+    user_id = getattr(user, 'pk', user)
+    if notification_type not in UNMUTABLE_TYPES:
+        if not exclude_muted(User.objects.filter(pk=user_id), notification_type, target_club_id(target)).exists():
+            return None
+    return Notification.objects.create(
+        user_id=user_id,
+        notification_type=notification_type,
+        title=title,
+        message=message,
+        **target_fields(target)
+    )
+
+def notify_activity(user, notification_type, verb, target, actor, title, message, summary):
+    """
+    A notification about actor doing verb to target, e.g. an RSVP, folded
+    into the user's unread one for the same verb and target when there is
+    one. The group counts its actors, keeps the RECENT_ACTORS latest ids
+    and reads "<actor> and N others <summary>". Returns None when muted.
+    """
+    user_id = getattr(user, 'pk', user)
+    if notification_type not in UNMUTABLE_TYPES:
+        if not exclude_muted(User.objects.filter(pk=user_id), notification_type, target_club_id(target)).exists():
+            return None
+    target_type, target_id = target_reference(target)
+    collapse_key = f'{verb}:{target_type}:{target_id}'
+
+    with transaction.atomic():
+        notification = Notification.objects.select_for_update().filter(
+            user_id=user_id,
+            collapse_key=collapse_key,
+            is_read=False
+        ).order_by('-created_at', '-id').first()
+        if notification is None:
+            return Notification.objects.create(
+                user_id=user_id,
+                notification_type=notification_type,
+                title=title,
+                message=message,
+                target_type=target_type,
+                target_id=target_id,
+                collapse_key=collapse_key,
+                actor_ids=[actor.pk]
+            )
+
+        if actor.pk not in notification.actor_ids:
+            notification.actor_count += 1
+        recent = [actor_id for actor_id in notification.actor_ids if actor_id != actor.pk]
+        notification.actor_ids = [actor.pk] + recent[:RECENT_ACTORS - 1]
+        others = notification.actor_count - 1
+        notification.title = title
+        notification.message = message
+        if others:
+            notification.message = f'{actor.get_full_name()} and {others} other{"s" if others > 1 else ""} {summary}'
+        # Resurface the group at the top of the list; already unread, so the badge stays
+        notification.created_at = timezone.now()
+        notification.save(update_fields=['title', 'message', 'actor_count', 'actor_ids', 'created_at'])
+
+    publish([user_id], {
+        'type': 'notification.updated',
+        'notification': NotificationSerializer(notification).data,
+    })
+    return notification
+
+def notify_users(audience, notification_type, title, message, target=None, exclude=None):
+    """
+    The same notification for many users: a User queryset (e.g.
+    club.members.all()) or users / user ids. Users who muted the type or
+    the target's club are left out by the audience query itself. Rows are
+    inserted in chunks of CHUNK_SIZE; audiences above
+    NOTIFICATION_BACKGROUND_THRESHOLD are written in the background after
+    commit. Returns the number of rows written, or None when deferred.
+    """
+    if not isinstance(audience, models.QuerySet):
+        audience = User.objects.filter(pk__in=[getattr(user, 'pk', user) for user in audience if user is not None])
+    exclude = [getattr(user, 'pk', user) for user in (exclude or []) if user is not None]
+    user_ids = exclude_muted(audience, notification_type, target_club_id(target)).order_by().values_list('pk', flat=True)
+    if exclude:
+        user_ids = user_ids.exclude(pk__in=exclude)
+    size = user_ids.count()
+    if not size:
+        return 0
+    
+    fields = {
+        'notification_type': notification_type,
+        'title': title,
+        'message': message,
+        **target_fields(target),
+    }
+    if size > settings.NOTIFICATION_BACKGROUND_THRESHOLD:
+        from unitribe_server.background import run_in_background
+        run_in_background(create_notifications, user_ids, fields)
+        return None
+    return create_notifications(user_ids, fields)
+
+def _chunks(user_ids):
+    if isinstance(user_ids, models.QuerySet):
+        user_ids = user_ids.iterator(chunk_size=CHUNK_SIZE)
+    chunk = []
+    for user_id in user_ids:
+        chunk.append(user_id)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def create_notifications(user_ids, fields):
+    created = 0
+    for chunk in _chunks(user_ids):
+        now = timezone.now()
+        Notification.objects.bulk_create(
+            [Notification(user_id=user_id, **fields) for user_id in chunk]
+        )
+        created += len(chunk)
+        
+        # One cache delete and one fan-out per chunk; badges recount on next read
+        transaction.on_commit(lambda chunk=chunk: invalidate_unread_counts(chunk))
+        publish(chunk, {
+            'type': 'notification.created',
+            'notification': dict(fields, related_id=fields['target_id'], is_read=False, created_at=now.isoformat()),
+        })
+    return created
@@ -0,0 +1,29 @@
+# unitribe_server/notifications/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .counters import adjust_unread_count, get_unread_count
+from .models import Notification
+from .serializers import NotificationSerializer
+from realtime.pubsub import publish
+
+def publish_unread_count(user_id):
+    """Push the user's unread notification count to their sockets"""
+    publish([user_id], {'type': 'notifications.count', 'unread_count': get_unread_count(user_id)})
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, **kwargs):
+    if not created or instance.is_read:
+        return
+    
+    def push():
+        # Counted once the row is committed, so a rollback cannot inflate it
+        publish([instance.user_id], {
+            'type': 'notification.created',
+            'notification': NotificationSerializer(instance).data,
+            'unread_count': adjust_unread_count(instance.user_id, 1),
+        })
+    
+    transaction.on_commit(push)
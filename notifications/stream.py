@@ -0,0 +1,161 @@
+# unitribe_server/notifications/stream.py
+
+import asyncio
+import json
+import time
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .counters import get_unread_count
+from .models import Notification
+from .serializers import NotificationSerializer
+from realtime.consumers import read_access_token
+from realtime.pubsub import get_pubsub
+
+HEARTBEAT_INTERVAL = 15
+RETRY_MILLISECONDS = 5000
+REPLAY_LIMIT = 100
+# Ids already sent, so a row both replayed and pushed goes out once
+SENT_IDS_KEPT = 500
+
+def request_token(request):
+    """Bearer header, or ?token= for EventSource, which cannot set headers"""
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):].strip()
+    return request.GET.get('token')
+
+def last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+def format_event(event, data, event_id=None):
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {json.dumps(data, cls=DjangoJSONEncoder)}')
+    return '\n'.join(lines) + '\n\n'
+
+@sync_to_async
+def latest_notification_id(user_id):
+    return Notification.objects.filter(user_id=user_id).order_by('-created_at', '-id').values_list('id', flat=True).first() or 0
+
+@sync_to_async
+def notifications_after(user_id, last_id):
+    """
+    Notifications newer than last_id, oldest first - or None when more
+    than REPLAY_LIMIT were missed and the client should refetch the list
+    """
+    rows = list(Notification.objects.filter(user_id=user_id, id__gt=last_id).order_by('id')[:REPLAY_LIMIT + 1])
+    if len(rows) > REPLAY_LIMIT:
+        return None
+    return list(NotificationSerializer(rows, many=True).data)
+
+unread_count = sync_to_async(get_unread_count)
+
+async def event_stream(user_id, last_id, expires_at):
+    # Subscribed before anything is read, so nothing created meanwhile is lost
+    subscription = get_pubsub().subscribe(user_id)
+    sent = deque(maxlen=SENT_IDS_KEPT)
+
+    async def catch_up():
+        nonlocal last_id
+        notifications = await notifications_after(user_id, last_id)
+        if notifications is None:
+            last_id = await latest_notification_id(user_id)
+            return [format_event('resync', {}, last_id)]
+        events = []
+        for notification in notifications:
+            last_id = max(last_id, notification['id'])
+            if notification['id'] not in sent:
+                sent.append(notification['id'])
+                events.append(format_event('notification', notification, notification['id']))
+        return events
+
+    async def event_count(event):
+        # Events are shared between subscribers - read, never written to
+        if 'unread_count' in event:
+            return event['unread_count']
+        return await unread_count(user_id)
+
+    try:
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        if last_id is None:
+            last_id = await latest_notification_id(user_id)
+        else:
+            for chunk in await catch_up():
+                yield chunk
+        yield format_event('count', {'unread_count': await unread_count(user_id)})
+
+        while True:
+            # The stream ends with the access token; the client reconnects with a fresh one
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=min(HEARTBEAT_INTERVAL, remaining))
+            except asyncio.TimeoutError:
+                yield ': heartbeat\n\n'
+                continue
+
+            event_type = event.get('type')
+            if event_type == 'notification.created':
+                notification = event.get('notification') or {}
+                if notification.get('id'):
+                    if notification['id'] not in sent:
+                        sent.append(notification['id'])
+                        last_id = max(last_id, notification['id'])
+                        yield format_event('notification', notification, notification['id'])
+                else:
+                    # Bulk fan-outs publish one payload per chunk of users, without row ids
+                    for chunk in await catch_up():
+                        yield chunk
+                yield format_event('count', {'unread_count': await event_count(event)})
+            elif event_type == 'notification.updated':
+                if event.get('resync') or 'notification' not in event:
+                    # Too large for the pub/sub payload
+                    for chunk in await catch_up():
+                        yield chunk
+                    yield format_event('count', {'unread_count': await unread_count(user_id)})
+                    continue
+                # A collapsed group with a new actor; no event id, it is not newer than the last one
+                yield format_event('notification', event['notification'])
+            elif event_type == 'notifications.count':
+                yield format_event('count', {'unread_count': await event_count(event)})
+            elif event_type == 'resync':
+                # Fell behind the pub/sub queue
+                for chunk in await catch_up():
+                    yield chunk
+                yield format_event('count', {'unread_count': await unread_count(user_id)})
+    finally:
+        subscription.close()
+
+@require_GET
+async def notification_stream(request):
+    """
+    Server-Sent Events with the user's new and regrouped notifications
+    (`notification`, new ones with their id as event id) and badge counts
+    (`count`).
+    Reconnecting with Last-Event-ID replays what was missed. Needs the ASGI
+    server: each client holds a coroutine, not a worker.
+    """
+    claims = read_access_token(request_token(request))
+    if claims is None:
+        return JsonResponse({'error': 'A valid access token is required'}, status=401)
+    user_id, expires_at = claims
+
+    response = StreamingHttpResponse(
+        event_stream(user_id, last_event_id(request), expires_at),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Keeps nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -2,13 +2,18 @@
 
 from django.urls import path
 from .views import (NotificationListView, UnreadNotificationCountView, 
-                   MarkNotificationAsReadView, MarkAllNotificationsAsReadView)
+                   MarkNotificationAsReadView, MarkAllNotificationsAsReadView,
+                   NotificationSettingsView, ClubNotificationMuteView)
+from .stream import notification_stream
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notification-list'),
     path('unread-count/', UnreadNotificationCountView.as_view(), name='unread-notification-count'),
     path('<int:notification_id>/mark-as-read/', MarkNotificationAsReadView.as_view(), name='mark-notification-read'),
     path('mark-all-as-read/', MarkAllNotificationsAsReadView.as_view(), name='mark-all-notifications-read'),
+    path('settings/', NotificationSettingsView.as_view(), name='notification-settings'),
+    path('clubs/<int:club_id>/mute/', ClubNotificationMuteView.as_view(), name='club-notification-mute'),
+    path('stream/', notification_stream, name='notification-stream'),
 ]
 
 
@@ -3,39 +3,45 @@
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 from django.db.models import Q
-from .models import Notification
-from .serializers import NotificationSerializer
+from django.shortcuts import get_object_or_404
+from clubs.models import Club
+from .counters import adjust_unread_count, get_unread_count, reset_unread_count
+from .models import ClubNotificationMute, Notification, NotificationSettings
+from .pagination import NotificationCursorPagination
+from .serializers import NotificationSerializer, NotificationSettingsSerializer
+from .signals import publish_unread_count
 
 class NotificationListView(generics.ListAPIView):
+    """The user's notifications, newest first; ?unread=true for unread only"""
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationCursorPagination
     
     def get_queryset(self):
-        return Notification.objects.filter(
-            user=self.request.user
-        ).order_by('-created_at')
+        queryset = Notification.objects.filter(user=self.request.user)
+        if str(self.request.query_params.get('unread', '')).lower() in ('true', '1'):
+            queryset = queryset.filter(is_read=False)
+        return queryset
 
 class UnreadNotificationCountView(APIView):
+    """Badge count, polled by every client - served from the cache without loading the user"""
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        count = Notification.objects.filter(
-            user=request.user, 
-            is_read=False
-        ).count()
-        return Response({'unread_count': count})
+        return Response({'unread_count': get_unread_count(request.user.id)})
 
 class MarkNotificationAsReadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, notification_id):
-        notification = Notification.objects.get(
-            id=notification_id, 
-            user=request.user
-        )
-        notification.is_read = True
-        notification.save()
+        notification = get_object_or_404(Notification, id=notification_id, user=request.user)
+        # Only the request that flips the flag lowers the count
+        if Notification.objects.filter(id=notification.id, is_read=False).update(is_read=True):
+            adjust_unread_count(request.user.id, -1)
+            publish_unread_count(request.user.id)
         return Response({'status': 'marked as read'})
 
 class MarkAllNotificationsAsReadView(APIView):
@@ -46,7 +52,28 @@ class MarkAllNotificationsAsReadView(APIView):
             user=request.user, 
             is_read=False
         ).update(is_read=True)
+        reset_unread_count(request.user.id)
+        publish_unread_count(request.user.id)
         return Response({'status': 'all marked as read'})
-    
 
+class NotificationSettingsView(generics.RetrieveUpdateAPIView):
+    """Digest frequency and muted notification types"""
+    serializer_class = NotificationSettingsSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_object(self):
+        obj, created = NotificationSettings.objects.get_or_create(user=self.request.user)
+        return obj
 
+class ClubNotificationMuteView(APIView):
+    """POST mutes notifications about a club, its posts and events; DELETE unmutes"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, club_id):
+        club = get_object_or_404(Club, id=club_id)
+        ClubNotificationMute.objects.get_or_create(user=request.user, club=club)
+        return Response({'status': 'muted'})
+    
+    def delete(self, request, club_id):
+        ClubNotificationMute.objects.filter(user=request.user, club_id=club_id).delete()
+        return Response({'status': 'unmuted'})
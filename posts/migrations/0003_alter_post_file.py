@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:40
+
+import uploads.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=uploads.storage.get_blob_storage, upload_to='post_files/'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0003_alter_club_banner_alter_club_logo'),
+        ('posts', '0003_alter_post_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('file__gt', '')), fields=['file'], name='post_file_idx'),
+        ),
+    ]
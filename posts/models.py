@@ -1,6 +1,7 @@
 # unitribe_server/posts/models.py
 
 from django.db import models
+from uploads.storage import get_blob_storage
 from users.models import User
 from clubs.models import Club
 
@@ -18,11 +19,17 @@ class Post(models.Model):
     post_type = models.CharField(max_length=20, choices=POST_TYPES, default='general')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='posts', null=True, blank=True)
-    file = models.FileField(upload_to='post_files/', blank=True, null=True)
+    file = models.FileField(upload_to='post_files/', storage=get_blob_storage, blank=True, null=True)
     likes = models.ManyToManyField(User, related_name='liked_posts', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Media access checks look files up by name
+            models.Index(fields=['file'], name='post_file_idx', condition=models.Q(file__gt='')),
+        ]
+    
     def __str__(self):
         return self.title
     
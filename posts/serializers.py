@@ -4,6 +4,7 @@ from rest_framework import serializers
 from .models import Post, Comment
 from users.serializers import UserBasicSerializer
 from clubs.serializers import ClubSerializer
+from uploads.serializers import DirectUploadMixin
 
 class CommentSerializer(serializers.ModelSerializer):
     author_details = UserBasicSerializer(source='author', read_only=True)
@@ -48,10 +49,10 @@ class PostSerializer(serializers.ModelSerializer):
             return obj.likes.filter(id=request.user.id).exists()
         return False
 
-class PostCreateSerializer(serializers.ModelSerializer):
+class PostCreateSerializer(DirectUploadMixin, serializers.ModelSerializer):
     class Meta:
         model = Post
-        fields = ('title', 'content', 'post_type', 'club', 'file')
+        fields = ('title', 'content', 'post_type', 'club', 'file', 'upload_key')
 
 
 
@@ -7,7 +7,7 @@ from django.db.models import Q
 from .models import Post, Comment
 from .serializers import PostSerializer, PostCreateSerializer, CommentSerializer
 from users.models import User  # Add this import
-from notifications.models import Notification  # Add notifications for likes/comments
+from notifications.services import notify_users
 from users.models import User  # Add this line
 
 class PostListCreateView(generics.ListCreateAPIView):
@@ -59,15 +59,14 @@ class PostListCreateView(generics.ListCreateAPIView):
         
         # Create notification for club members if post belongs to a club
         if post.club:
-            for member in post.club.members.all():
-                if member != self.request.user:
-                    Notification.objects.create(
-                        user=member,
-                        notification_type='post',
-                        title=f'New Post in {post.club.name}',
-                        message=f'{self.request.user.get_full_name()} posted: {post.title}',
-                        related_id=post.id
-                    )
+            notify_users(
+                post.club.members.all(),
+                'post',
+                title=f'New Post in {post.club.name}',
+                message=f'{self.request.user.get_full_name()} posted: {post.title}',
+                target=post,
+                exclude=[self.request.user]
+            )
 
 class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Post.objects.all()
@@ -0,0 +1,112 @@
+# unitribe_server/realtime/consumers.py
+
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import presence
+from .pubsub import get_pubsub
+
+WEBSOCKET_PATH = '/ws/'
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+CLOSE_POLICY_VIOLATION = 1008
+
+def read_access_token(token):
+    """(user id, expiry timestamp) of a valid access token, without a database hit"""
+    if not token:
+        return None
+    try:
+        access_token = AccessToken(token)
+        return access_token[api_settings.USER_ID_CLAIM], access_token['exp']
+    except (TokenError, KeyError):
+        return None
+
+def authenticate(scope):
+    """(user id, expiry timestamp) from the ?token=<access token> query parameter"""
+    query = parse_qs(scope.get('query_string', b'').decode())
+    return read_access_token((query.get('token') or [None])[0])
+
+@sync_to_async
+def initial_state(user_id):
+    from notifications.counters import get_unread_count
+
+    return {
+        'type': 'hello',
+        'user': user_id,
+        'unread_notifications': get_unread_count(user_id),
+    }
+
+async def forward_events(subscription, send, expires_at):
+    # The only task that writes to the socket once it is open. While idle it
+    # keeps the user's presence alive.
+    while True:
+        # The socket ends with the access token; the client reconnects with a fresh one
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            await send({'type': 'websocket.close', 'code': CLOSE_POLICY_VIOLATION})
+            return
+        try:
+            event = await asyncio.wait_for(subscription.get(), timeout=min(presence.HEARTBEAT_COALESCE, remaining))
+        except asyncio.TimeoutError:
+            presence.heartbeat(subscription.user_id)
+            continue
+        await send({'type': 'websocket.send', 'text': json.dumps(event, cls=DjangoJSONEncoder)})
+
+async def websocket_application(scope, receive, send):
+    """
+    Push channel for the signed-in user: new messages, read watermarks and
+    notification counts. Connect to /ws/?token=<access token>; clients may
+    send {"type": "ping"} and {"type": "viewing", "conversation": <id>}.
+    The socket is closed with 1008 when the access token expires.
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    if scope['path'] != WEBSOCKET_PATH:
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+
+    claims = authenticate(scope)
+    if claims is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+        return
+    user_id, expires_at = claims
+
+    await send({'type': 'websocket.accept'})
+    pubsub = get_pubsub()
+    subscription = pubsub.subscribe(user_id)
+    presence.heartbeat(user_id)
+    forwarder = asyncio.create_task(forward_events(subscription, send, expires_at))
+    try:
+        subscription.put(await initial_state(user_id))
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            presence.heartbeat(user_id)
+            try:
+                data = json.loads(message.get('text') or '{}')
+            except ValueError:
+                continue
+            if not isinstance(data, dict):
+                continue
+            if data.get('type') == 'ping':
+                subscription.put({'type': 'pong'})
+            elif data.get('type') == 'viewing' and isinstance(data.get('conversation'), int):
+                # Sent while a conversation is on screen; suppresses its notifications
+                presence.start_viewing(user_id, data['conversation'])
+    finally:
+        forwarder.cancel()
+        subscription.close()
+        # Other sockets of the user on this process keep them online
+        if not pubsub.is_connected(user_id):
+            presence.go_offline(user_id)
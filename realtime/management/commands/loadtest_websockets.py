@@ -0,0 +1,145 @@
+#unitribe_server/realtime/management/commands/loadtest_websockets.py
+
+import asyncio
+import json
+import resource
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+def rss_mb(pid):
+    """Resident memory of a local process in MB, or None if it cannot be read"""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+class Command(BaseCommand):
+    help = 'Open many idle WebSocket connections against a running server and check they stay responsive'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            default='ws://127.0.0.1:8000/ws/',
+            help='WebSocket endpoint (default: ws://127.0.0.1:8000/ws/)'
+        )
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Email of the user the sockets authenticate as'
+        )
+        parser.add_argument(
+            '--connections',
+            type=int,
+            default=5000,
+            help='Number of concurrent sockets (default: 5000)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=200,
+            help='Handshakes in flight at once (default: 200)'
+        )
+        parser.add_argument(
+            '--hold',
+            type=int,
+            default=30,
+            help='Seconds to keep the sockets open and idle (default: 30)'
+        )
+        parser.add_argument(
+            '--server-pid',
+            type=int,
+            help='PID of a local server process to report memory for'
+        )
+    
+    def handle(self, *args, **options):
+        try:
+            import websockets  # noqa: F401
+        except ImportError:
+            raise CommandError('The websockets package is required: pip install websockets')
+        
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} not found")
+        
+        # Each socket needs a file descriptor
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = options['connections'] + 100
+        if soft < wanted:
+            if hard != resource.RLIM_INFINITY and hard < wanted:
+                raise CommandError(f'Open file limit {hard} is too low for {options["connections"]} sockets')
+            resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+        
+        url = f"{options['url']}?token={AccessToken.for_user(user)}"
+        asyncio.run(self.run(url, options))
+    
+    async def run(self, url, options):
+        import websockets
+        
+        count = options['connections']
+        pid = options['server_pid']
+        rss_before = rss_mb(pid) if pid else None
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        
+        async def open_socket():
+            async with semaphore:
+                # Server-side pings keep the connection alive; the client stays silent
+                socket = await websockets.connect(url, ping_interval=None, open_timeout=30, max_queue=None)
+                hello = json.loads(await asyncio.wait_for(socket.recv(), timeout=30))
+                if hello.get('type') != 'hello':
+                    raise RuntimeError(f'Unexpected first event: {hello}')
+                return socket
+        
+        self.stdout.write(f'Opening {count} sockets to {options["url"]}...')
+        started = time.perf_counter()
+        results = await asyncio.gather(*(open_socket() for _ in range(count)), return_exceptions=True)
+        open_elapsed = time.perf_counter() - started
+        
+        sockets = [result for result in results if not isinstance(result, BaseException)]
+        failures = [result for result in results if isinstance(result, BaseException)]
+        self.stdout.write(f'Opened: {len(sockets)}/{count} in {open_elapsed:.1f}s ({len(sockets) / open_elapsed:.0f}/s)')
+        if failures:
+            self.stdout.write(self.style.WARNING(f'Failed: {len(failures)} (first error: {failures[0]!r})'))
+        
+        self.stdout.write(f'Holding for {options["hold"]}s...')
+        await asyncio.sleep(options['hold'])
+        alive = [socket for socket in sockets if socket.close_code is None]
+        
+        # Round trip on every socket at once: the server loop must still be responsive
+        started = time.perf_counter()
+        
+        async def ping(socket):
+            await socket.send(json.dumps({'type': 'ping'}))
+            while True:
+                event = json.loads(await asyncio.wait_for(socket.recv(), timeout=30))
+                if event.get('type') == 'pong':
+                    return
+        
+        pings = await asyncio.gather(*(ping(socket) for socket in alive), return_exceptions=True)
+        ping_elapsed = time.perf_counter() - started
+        answered = sum(1 for result in pings if not isinstance(result, BaseException))
+        rss_after = rss_mb(pid) if pid else None
+        
+        await asyncio.gather(*(socket.close() for socket in sockets), return_exceptions=True)
+        
+        self.stdout.write('')
+        self.stdout.write(f'Still open after hold: {len(alive)}/{len(sockets)}')
+        self.stdout.write(f'Ping round trip on all sockets: {answered}/{len(alive)} answered in {ping_elapsed:.2f}s')
+        if rss_before is not None and rss_after is not None:
+            per_socket_kb = (rss_after - rss_before) * 1024 / max(len(alive), 1)
+            self.stdout.write(
+                f'Server RSS: {rss_before:.0f} MB -> {rss_after:.0f} MB (~{per_socket_kb:.1f} KB per socket)'
+            )
+        
+        if len(alive) == count and answered == count:
+            self.stdout.write(self.style.SUCCESS(f'OK: {count} concurrent idle sockets held'))
+        else:
+            self.stdout.write(self.style.ERROR(f'FAILED: {answered}/{count} sockets responsive'))
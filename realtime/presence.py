@@ -0,0 +1,194 @@
+# unitribe_server/realtime/presence.py
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+# A user is online while their presence key is alive
+ONLINE_TTL = 60
+# Heartbeats closer together than this are not written again
+HEARTBEAT_COALESCE = 20
+TYPING_TTL = 6
+# An open conversation screen refreshes this while it is visible
+VIEWING_TTL = 30
+VIEWING_COALESCE = 10
+
+class LocalPresenceStore:
+    """Expiring keys in this process's memory. Single node only."""
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def set_many(self, values, ttl):
+        expires = time.monotonic() + ttl
+        with self._lock:
+            for key, value in values.items():
+                self._data[key] = (value, expires)
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                self._sweep()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                item = self._data.get(key)
+                if item and item[1] > now:
+                    found[key] = item[0]
+        return found
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _sweep(self):
+        now = time.monotonic()
+        for key in [key for key, (_, expires) in self._data.items() if expires <= now]:
+            del self._data[key]
+
+class CachePresenceStore:
+    """
+    Presence in a Django cache, shared between nodes when the cache is
+    (e.g. Redis or Memcached). The alias comes from REALTIME_PRESENCE_CACHE.
+    """
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'REALTIME_PRESENCE_CACHE', 'default')]
+
+    def set_many(self, values, ttl):
+        self.cache.set_many(values, timeout=ttl)
+
+    def get_many(self, keys):
+        return self.cache.get_many(keys)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+class RecentWrites:
+    """
+    When this process last wrote each key, so writes closer together than
+    `interval` can be skipped. Entries older than the interval no longer
+    matter and are swept out, so memory follows the recently active users.
+    """
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._last = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def should_write(self, key, now):
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self.interval:
+                return False
+            self._last[key] = now
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                for stale in [key for key, last in self._last.items() if now - last >= self.interval]:
+                    del self._last[stale]
+            return True
+
+    def forget(self, key):
+        with self._lock:
+            self._last.pop(key, None)
+
+    def __len__(self):
+        return len(self._last)
+
+BACKENDS = {
+    'local': LocalPresenceStore,
+    'cache': CachePresenceStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+# user id / (user id, conversation id) -> when this process last wrote it
+_last_heartbeat = RecentWrites(HEARTBEAT_COALESCE)
+_last_viewing = RecentWrites(VIEWING_COALESCE)
+
+def get_store():
+    """The process-wide store named by REALTIME_PRESENCE_BACKEND (a short name or dotted path)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = getattr(settings, 'REALTIME_PRESENCE_BACKEND', 'local')
+            backend_class = BACKENDS.get(backend) or import_string(backend)
+            _store = backend_class()
+    return _store
+
+def _presence_key(user_id):
+    return f'presence:{user_id}'
+
+def _typing_key(conversation_id, user_id):
+    return f'typing:{conversation_id}:{user_id}'
+
+def _viewing_key(conversation_id, user_id):
+    return f'viewing:{conversation_id}:{user_id}'
+
+# ============ PRESENCE ============
+def heartbeat(user_id):
+    """Mark a user online. Repeated heartbeats within HEARTBEAT_COALESCE are dropped."""
+    now = time.time()
+    if not _last_heartbeat.should_write(user_id, now):
+        return False
+    get_store().set_many({_presence_key(user_id): now}, ONLINE_TTL)
+    return True
+
+def go_offline(user_id):
+    _last_heartbeat.forget(user_id)
+    get_store().delete(_presence_key(user_id))
+
+def last_seen(user_ids):
+    """{user_id: last heartbeat timestamp} for the users that are online, in one lookup"""
+    user_ids = list(user_ids)
+    found = get_store().get_many([_presence_key(user_id) for user_id in user_ids])
+    return {
+        user_id: found[_presence_key(user_id)]
+        for user_id in user_ids
+        if _presence_key(user_id) in found
+    }
+
+def online_user_ids(user_ids):
+    return set(last_seen(user_ids))
+
+# ============ TYPING ============
+def start_typing(conversation_id, user_id):
+    """Record that a user is typing. Returns True when they were not typing already."""
+    key = _typing_key(conversation_id, user_id)
+    store = get_store()
+    was_typing = key in store.get_many([key])
+    store.set_many({key: time.time()}, TYPING_TTL)
+    return not was_typing
+
+def stop_typing(conversation_id, user_id):
+    get_store().delete(_typing_key(conversation_id, user_id))
+
+def typing_user_ids(conversation_id, user_ids):
+    user_ids = list(user_ids)
+    found = get_store().get_many([_typing_key(conversation_id, user_id) for user_id in user_ids])
+    return [user_id for user_id in user_ids if _typing_key(conversation_id, user_id) in found]
+
+# ============ VIEWING ============
+def start_viewing(user_id, conversation_id):
+    """Mark a user as looking at a conversation right now (coalesced like heartbeats)"""
+    now = time.time()
+    if not _last_viewing.should_write((user_id, conversation_id), now):
+        return
+    get_store().set_many({_viewing_key(conversation_id, user_id): now}, VIEWING_TTL)
+
+def viewer_ids(conversation_id, user_ids):
+    """Those of `user_ids` currently viewing the conversation, in one lookup"""
+    user_ids = list(user_ids)
+    found = get_store().get_many([_viewing_key(conversation_id, user_id) for user_id in user_ids])
+    return [user_id for user_id in user_ids if _viewing_key(conversation_id, user_id) in found]
@@ -0,0 +1,182 @@
+# unitribe_server/realtime/pubsub.py
+
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'unitribe_realtime'
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7900
+NOTIFY_USER_CHUNK = 500
+RECONNECT_DELAY = 2
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+class Subscription:
+    """
+    Event inbox of one socket. Events may be delivered from any thread
+    (sync views publish from worker threads); they are queued on the
+    socket's own event loop.
+    """
+
+    def __init__(self, hub, user_id):
+        self.hub = hub
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self.put, event)
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client this far behind has to refetch over HTTP anyway
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'resync'})
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+class InMemoryPubSub:
+    """
+    Fan-out within a single process. Only sockets held by this process
+    receive events, so use it with one worker.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_ids, event):
+        self.dispatch(user_ids, event)
+
+    def dispatch(self, user_ids, event):
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in user_ids
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+        for subscription in targets:
+            subscription.deliver(event)
+
+    def is_connected(self, user_id):
+        with self._lock:
+            return bool(self._subscriptions.get(user_id))
+    
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+class PostgresPubSub(InMemoryPubSub):
+    """
+    Fan-out across processes and nodes with LISTEN/NOTIFY on one channel.
+
+    Publishing is a NOTIFY on the regular database connection. Each process
+    runs one listener thread on a dedicated connection and hands received
+    events to its local sockets.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        self._ensure_listener()
+        return super().subscribe(user_id)
+
+    def publish(self, user_ids, event):
+        user_ids = list(user_ids)
+        payloads = []
+        for start in range(0, len(user_ids), NOTIFY_USER_CHUNK):
+            chunk = user_ids[start:start + NOTIFY_USER_CHUNK]
+            payload = json.dumps({'users': chunk, 'event': event}, cls=DjangoJSONEncoder)
+            if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+                # Too large for NOTIFY - tell clients to fetch it themselves
+                payload = json.dumps({'users': chunk, 'event': {'type': event['type'], 'resync': True}})
+            payloads.append(payload)
+
+        with connection.cursor() as cursor:
+            for payload in payloads:
+                cursor.execute('SELECT pg_notify(%s, %s)', [NOTIFY_CHANNEL, payload])
+
+    def _ensure_listener(self):
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='realtime-listener', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        import psycopg
+
+        # Connection parameters as Django builds them, on a connection of our own
+        params = connections['default'].get_connection_params()
+        while True:
+            try:
+                with psycopg.connect(**params, autocommit=True) as listen_connection:
+                    listen_connection.execute(f'LISTEN {NOTIFY_CHANNEL}')
+                    for notify in listen_connection.notifies():
+                        self._receive(notify.payload)
+            except psycopg.Error:
+                logger.exception('Realtime listener lost its database connection, reconnecting')
+                time.sleep(RECONNECT_DELAY)
+
+    def _receive(self, payload):
+        try:
+            message = json.loads(payload)
+            self.dispatch(message['users'], message['event'])
+        except (ValueError, KeyError):
+            logger.warning('Ignoring malformed realtime payload')
+
+BACKENDS = {
+    'memory': InMemoryPubSub,
+    'postgres': PostgresPubSub,
+}
+
+_pubsub = None
+_pubsub_lock = threading.Lock()
+
+def get_pubsub():
+    """The process-wide backend named by REALTIME_PUBSUB_BACKEND (a short name or dotted path)"""
+    global _pubsub
+    with _pubsub_lock:
+        if _pubsub is None:
+            backend = getattr(settings, 'REALTIME_PUBSUB_BACKEND', 'memory')
+            backend_class = BACKENDS.get(backend) or import_string(backend)
+            _pubsub = backend_class()
+    return _pubsub
+
+def publish(user_ids, event):
+    """Push an event to every socket of the given users once the current transaction commits"""
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: get_pubsub().publish(user_ids, event))
@@ -0,0 +1,9 @@
+# unitribe_server/realtime/urls.py
+
+from django.urls import path
+from .views import HeartbeatView, PresenceView
+
+urlpatterns = [
+    path('heartbeat/', HeartbeatView.as_view(), name='presence-heartbeat'),
+    path('presence/', PresenceView.as_view(), name='presence'),
+]
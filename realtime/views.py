@@ -0,0 +1,60 @@
+# unitribe_server/realtime/views.py
+
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+
+from . import presence
+
+MAX_PRESENCE_LOOKUP = 200
+
+class HeartbeatView(APIView):
+    """
+    Keeps a client without a WebSocket online - call at least once a
+    minute. Pass `conversation` while a conversation is on screen so its
+    messages do not raise notifications.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    # Frequent by design - kept off the daily user quota
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'presence'
+    
+    def post(self, request):
+        presence.heartbeat(request.user.id)
+        conversation_id = request.data.get('conversation')
+        if conversation_id:
+            try:
+                presence.start_viewing(request.user.id, int(conversation_id))
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'conversation must be an id'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        return Response({'status': 'online', 'ttl': presence.ONLINE_TTL})
+
+class PresenceView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'presence'
+    
+    def get(self, request):
+        try:
+            user_ids = [int(user_id) for user_id in request.query_params.get('user_ids', '').split(',') if user_id]
+        except ValueError:
+            return Response(
+                {'error': 'user_ids must be a comma-separated list of ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if len(user_ids) > MAX_PRESENCE_LOOKUP:
+            return Response(
+                {'error': f'At most {MAX_PRESENCE_LOOKUP} users per lookup'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        seen = presence.last_seen(user_ids)
+        return Response({
+            str(user_id): {'is_online': user_id in seen, 'last_seen': seen.get(user_id)}
+            for user_id in user_ids
+        })
@@ -0,0 +1,40 @@
+# unitribe_server/background.py
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'BACKGROUND_WORKERS', 2),
+            thread_name_prefix='background'
+        )
+    return _executor
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Background task %s failed', getattr(func, '__name__', func))
+    finally:
+        close_old_connections()
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Run func in the process's worker threads once the current transaction
+    commits, so it sees the saved rows. Work is lost if the process exits
+    first - only use it for tasks a backfill command can redo.
+    """
+    if not getattr(settings, 'BACKGROUND_TASKS_ENABLED', True):
+        func(*args, **kwargs)
+        return
+    transaction.on_commit(lambda: get_executor().submit(_run, func, args, kwargs))
@@ -0,0 +1,290 @@
+# unitribe_server/partitioning.py
+
+"""
+Monthly range partitions on created_at for the tables that grow without
+bound (Postgres only). Retention then detaches and drops whole months - one
+DDL statement per month instead of row-by-row DELETEs.
+
+Partitioned tables have (id, created_at) as their primary key, so no
+foreign key constraint can point at them; relations to them use
+db_constraint=False and are cleared here before a month is dropped.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+PARTITION_KEY = 'created_at'
+DEFAULT_MONTHS_AHEAD = 3
+# How far back newest_first looks before reading older months
+RECENT_WINDOW = timedelta(days=31)
+
+# model label -> setting with its retention in months (0 keeps everything)
+PARTITIONED_MODELS = {
+    'messaging.Message': 'MESSAGE_RETENTION_MONTHS',
+    'notifications.Notification': 'NOTIFICATION_RETENTION_MONTHS',
+}
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+def _columns(cursor, table):
+    """Quoted column list without generated columns, for copying rows"""
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s AND is_generated = 'NEVER' "
+        "ORDER BY ordinal_position",
+        [table]
+    )
+    return ', '.join(f'"{row[0]}"' for row in cursor.fetchall())
+
+def _create_partition(cursor, table, month):
+    """
+    Add a month's partition. Rows already written to the default partition
+    for that month would make Postgres refuse it, so they are moved over
+    while the default partition is detached.
+    """
+    name = partition_name(table, month)
+    default = f'{table}_default'
+    bounds = [month, add_months(month, 1)]
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL, to_regclass(%s) IS NOT NULL", [name, default])
+    exists, has_default = cursor.fetchone()
+    if exists:
+        return
+    
+    stranded = False
+    if has_default:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE "{PARTITION_KEY}" >= %s AND "{PARTITION_KEY}" < %s)',
+            bounds
+        )
+        stranded = cursor.fetchone()[0]
+    if not stranded:
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+            bounds
+        )
+        return
+    
+    columns = _columns(cursor, table)
+    with transaction.atomic(using=cursor.db.alias):
+        cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"')
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+            bounds
+        )
+        cursor.execute(
+            f'INSERT INTO "{table}" ({columns}) OVERRIDING SYSTEM VALUE SELECT {columns} FROM "{default}" '
+            f'WHERE "{PARTITION_KEY}" >= %s AND "{PARTITION_KEY}" < %s',
+            bounds
+        )
+        cursor.execute(
+            f'DELETE FROM "{default}" WHERE "{PARTITION_KEY}" >= %s AND "{PARTITION_KEY}" < %s',
+            bounds
+        )
+        cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT')
+
+def _definitions(cursor, table):
+    """Index definitions (primary key aside) and foreign keys of a table"""
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() "
+        "AND tablename = %s AND indexname != %s",
+        [table, f'{table}_pkey']
+    )
+    # Indexes of a partitioned table are defined ON ONLY the parent
+    index_definitions = [row[0].replace(' ON ONLY ', ' ON ') for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table]
+    )
+    return index_definitions, cursor.fetchall()
+
+def _restore(cursor, table, old_table, columns, primary_key, index_definitions, foreign_keys):
+    cursor.execute(
+        f'INSERT INTO "{table}" ({columns}) OVERRIDING SYSTEM VALUE '
+        f'SELECT {columns} FROM "{old_table}"'
+    )
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+        f'FROM "{table}"',
+        [table]
+    )
+    cursor.execute(f'DROP TABLE "{old_table}"')
+    
+    cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ({primary_key})')
+    for definition in index_definitions:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+def partition_table(schema_editor, table, months_ahead=DEFAULT_MONTHS_AHEAD):
+    """
+    Rebuild an existing table as a monthly partitioned one, keeping its
+    rows, columns, identity, indexes and outgoing foreign keys. For
+    migrations; foreign keys pointing at the table must be dropped first.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    
+    old_table = f'{table}_unpartitioned'
+    with schema_editor.connection.cursor() as cursor:
+        index_definitions, foreign_keys = _definitions(cursor, table)
+        columns = _columns(cursor, table)
+        cursor.execute(f'SELECT MIN("{PARTITION_KEY}") FROM "{table}"')
+        oldest = cursor.fetchone()[0]
+        
+        cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old_table}"')
+        cursor.execute(
+            f'CREATE TABLE "{table}" (LIKE "{old_table}" INCLUDING DEFAULTS INCLUDING GENERATED '
+            f'INCLUDING IDENTITY INCLUDING CONSTRAINTS) PARTITION BY RANGE ("{PARTITION_KEY}")'
+        )
+        
+        now = datetime.now(dt_timezone.utc)
+        month = month_start(oldest or now)
+        last = add_months(month_start(now), months_ahead)
+        while month <= last:
+            _create_partition(cursor, table, month)
+            month = add_months(month, 1)
+        # Catches rows outside every month until manage_partitions adds it
+        cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+        
+        _restore(cursor, table, old_table, columns, f'id, "{PARTITION_KEY}"', index_definitions, foreign_keys)
+
+def unpartition_table(schema_editor, table):
+    """Reverse of partition_table: one plain table with id as its primary key"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    
+    old_table = f'{table}_partitioned'
+    with schema_editor.connection.cursor() as cursor:
+        index_definitions, foreign_keys = _definitions(cursor, table)
+        columns = _columns(cursor, table)
+        
+        cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old_table}"')
+        cursor.execute(
+            f'CREATE TABLE "{table}" (LIKE "{old_table}" INCLUDING DEFAULTS INCLUDING GENERATED '
+            f'INCLUDING IDENTITY INCLUDING CONSTRAINTS)'
+        )
+        _restore(cursor, table, old_table, columns, 'id', index_definitions, foreign_keys)
+
+def newest_first(queryset, limit, latest=None):
+    """
+    Up to `limit` rows, newest (created_at, id) first. Without a created_at
+    lower bound Postgres plans and opens every monthly partition, so the
+    RECENT_WINDOW before `latest` (default now) is read first and older
+    months only when it does not fill the page.
+    """
+    since = (latest or timezone.now()) - RECENT_WINDOW
+    rows = list(queryset.filter(created_at__gte=since).order_by('-created_at', '-id')[:limit])
+    if len(rows) < limit:
+        rows += list(queryset.filter(created_at__lt=since).order_by('-created_at', '-id')[:limit - len(rows)])
+    return rows
+
+def is_partitioned(model):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [model._meta.db_table]
+        )
+        return cursor.fetchone() is not None
+
+def list_partitions(model):
+    """[(name, month)] of a model's monthly partitions, oldest first"""
+    table = model._meta.db_table
+    pattern = re.compile(rf'^{re.escape(table)}_p(\d{{4}})(\d{{2}})$')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass",
+            [table]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            partitions.append((name, datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def create_future_partitions(model, months_ahead=DEFAULT_MONTHS_AHEAD, now=None):
+    """Make sure the current month and the next months_ahead have partitions"""
+    table = model._meta.db_table
+    existing = {name for name, _ in list_partitions(model)}
+    month = month_start(now or datetime.now(dt_timezone.utc))
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            name = partition_name(table, add_months(month, offset))
+            if name not in existing:
+                _create_partition(cursor, table, add_months(month, offset))
+                created.append(name)
+    return created
+
+def expired_partitions(model, retention_months, now=None):
+    """Partitions whose whole month is older than the retention period"""
+    if not retention_months:
+        return []
+    cutoff = add_months(month_start(now or datetime.now(dt_timezone.utc)), -retention_months)
+    return [(name, month) for name, month in list_partitions(model) if add_months(month, 1) <= cutoff]
+
+def release_rows(model, start, end):
+    """
+    What deleting the month's rows through the ORM would have done:
+    SET_NULL / CASCADE relations pointing at them and blob references of
+    their files.
+    """
+    rows = model._base_manager.filter(**{f'{PARTITION_KEY}__gte': start, f'{PARTITION_KEY}__lt': end})
+    ids = rows.values('pk')
+    
+    relations = [
+        field for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete and (field.one_to_many or field.one_to_one)
+    ]
+    for relation in relations:
+        related = relation.related_model._base_manager.filter(**{f'{relation.field.name}__in': ids})
+        if relation.on_delete is models.SET_NULL:
+            related.update(**{relation.field.name: None})
+        elif relation.on_delete is models.CASCADE:
+            related.delete()
+        else:
+            raise ValueError(f'Cannot drop partitions of {model._meta.label}: {relation} is {relation.on_delete.__name__}')
+    
+    blob_fields = getattr(model, '_blob_fields', [])
+    if blob_fields:
+        from uploads.storage import release_reference
+        for names in rows.exclude(**{f'{blob_fields[0]}': ''}).values_list(*blob_fields).iterator():
+            for name in names:
+                release_reference(name)
+    
+    if model._meta.label == 'notifications.Notification':
+        from notifications.counters import invalidate_unread_counts
+        user_ids = list(rows.filter(is_read=False).values_list('user_id', flat=True).distinct().order_by())
+        transaction.on_commit(lambda: invalidate_unread_counts(user_ids))
+
+def drop_partition(model, name, month, detach_only=False):
+    """Detach a month's partition and drop it, or keep it as a plain table for archiving"""
+    table = model._meta.db_table
+    with transaction.atomic():
+        release_rows(model, month, add_months(month, 1))
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+            if not detach_only:
+                cursor.execute(f'DROP TABLE "{name}"')
+
+def partitioned_models():
+    return [(apps.get_model(label), getattr(settings, setting, 0)) for label, setting in PARTITIONED_MODELS.items()]
@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third party apps
     'rest_framework',
     'corsheaders',
@@ -43,6 +44,8 @@ INSTALLED_APPS = [
     'notifications',
     'messaging',
     'analytics',
+    'realtime',
+    'uploads',
 ]
 
 MIDDLEWARE = [
@@ -135,6 +138,11 @@ CSRF_TRUSTED_ORIGINS = [
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Let the front proxy send media after the access check: 'nginx'
+# (X-Accel-Redirect to MEDIA_SENDFILE_PREFIX, an internal location aliased to
+# MEDIA_ROOT) or 'sendfile' (X-Sendfile, Apache/lighttpd). Empty streams from Django.
+MEDIA_SENDFILE = config('MEDIA_SENDFILE', default='')
+MEDIA_SENDFILE_PREFIX = config('MEDIA_SENDFILE_PREFIX', default='/protected-media/')
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -174,6 +182,11 @@ REST_FRAMEWORK = {
         'register': '10/hour',
         'password_reset': '5/hour',
         'verify_email': '3/hour',
+        'event_checkin': '3000/minute',
+        'presence': '30/minute',
+        'typing': '60/minute',
+        'message_sender': '30/minute',
+        'message_fanout': '3000/minute',
     },
 }
 
@@ -205,12 +218,67 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Cache - local memory by default, point CACHE_BACKEND/CACHE_LOCATION at a
+# shared cache (e.g. Redis) when running more than one process
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default='unitribe-default'),
+    }
+}
+if CACHE_BACKEND.endswith('LocMemCache'):
+    # The default of 300 entries is too small for counters and check-in keys
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 100000}
+
+# Event check-in - scans are buffered and written in bulk
+EVENT_CHECKIN_BATCH_SIZE = config('EVENT_CHECKIN_BATCH_SIZE', default=200, cast=int)
+EVENT_CHECKIN_FLUSH_INTERVAL = config('EVENT_CHECKIN_FLUSH_INTERVAL', default=2.0, cast=float)  # seconds
+
+# Realtime push - 'memory' only reaches sockets in the same process; use
+# 'postgres' (LISTEN/NOTIFY) when running more than one worker or node
+REALTIME_PUBSUB_BACKEND = config('REALTIME_PUBSUB_BACKEND', default='memory')
+# Presence and typing state - 'local' is per process, 'cache' uses the cache
+# alias below (shared once CACHE_BACKEND is)
+REALTIME_PRESENCE_BACKEND = config('REALTIME_PRESENCE_BACKEND', default='local')
+REALTIME_PRESENCE_CACHE = 'default'
+
+# Message flood control counters - 'local' per process, 'cache' shared
+# through the cache alias below
+MESSAGE_FLOOD_BACKEND = config('MESSAGE_FLOOD_BACKEND', default='local')
+MESSAGE_FLOOD_CACHE = 'default'
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
+# Hash uploads while they stream in, for content-addressed storage
+FILE_UPLOAD_HANDLERS = [
+    'uploads.handlers.HashingMemoryFileUploadHandler',
+    'uploads.handlers.HashingTemporaryFileUploadHandler',
+]
+
+# Direct uploads - clients PUT files straight to storage ('filesystem' or 's3')
+UPLOADS_DIRECT_BACKEND = config('UPLOADS_DIRECT_BACKEND', default='filesystem')
+UPLOADS_DIRECT_MAX_SIZE = config('UPLOADS_DIRECT_MAX_SIZE', default=104857600, cast=int)  # 100MB
+UPLOAD_INTENT_TTL = config('UPLOAD_INTENT_TTL', default=900, cast=int)  # seconds
+UPLOADS_S3_ENDPOINT_URL = config('UPLOADS_S3_ENDPOINT_URL', default='https://s3.amazonaws.com')
+UPLOADS_S3_BUCKET = config('UPLOADS_S3_BUCKET', default='')
+UPLOADS_S3_REGION = config('UPLOADS_S3_REGION', default='us-east-1')
+UPLOADS_S3_ACCESS_KEY = config('UPLOADS_S3_ACCESS_KEY', default='')
+UPLOADS_S3_SECRET_KEY = config('UPLOADS_S3_SECRET_KEY', default='')
+
+# In-process background work (unitribe_server.background), e.g. image resizing
+BACKGROUND_WORKERS = config('BACKGROUND_WORKERS', default=2, cast=int)
+BACKGROUND_TASKS_ENABLED = config('BACKGROUND_TASKS_ENABLED', default=True, cast=bool)
+# Months kept before manage_partitions drops a monthly partition (0 keeps all)
+MESSAGE_RETENTION_MONTHS = config('MESSAGE_RETENTION_MONTHS', default=0, cast=int)
+NOTIFICATION_RETENTION_MONTHS = config('NOTIFICATION_RETENTION_MONTHS', default=3, cast=int)
+
+# Fan-outs to more users than this are written in the background
+NOTIFICATION_BACKGROUND_THRESHOLD = config('NOTIFICATION_BACKGROUND_THRESHOLD', default=5000, cast=int)
 
 # Email Configuration
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
@@ -8,6 +8,7 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 from django.views.generic import TemplateView
+from uploads.views import MediaView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -62,12 +63,16 @@ urlpatterns = [
     path('api/notifications/', include('notifications.urls')),
     path('api/messaging/', include('messaging.urls')),
     path('api/analytics/', include('analytics.urls')),
+    path('api/realtime/', include('realtime.urls')),
+    path('api/uploads/', include('uploads.urls')),
+    
+    # Uploaded files, access-checked
+    re_path(rf'^{settings.MEDIA_URL.strip("/")}/(?P<name>.+)$', MediaView.as_view(), name='media'),
     
     # Health Check
     path('health/', TemplateView.as_view(template_name='health.html'), name='health'),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+class UploadsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'uploads'
+    
+    def ready(self):
+        from .signals import connect_image_derivatives, connect_reference_tracking
+        connect_reference_tracking()
+        connect_image_derivatives()
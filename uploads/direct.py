@@ -0,0 +1,292 @@
+# unitribe_server/uploads/direct.py
+
+import base64
+import hashlib
+import hmac
+import tempfile
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import quote, urlsplit
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .storage import DIRECT_PREFIX, add_reference, content_addressed_storage, release_reference
+
+TOKEN_SALT = 'uploads.direct'
+
+class DirectUploadError(Exception):
+    pass
+
+# ============ AWS SIGNATURE V4 ============
+def _hmac(key, message):
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+def _quote(value, safe='-_.~'):
+    return quote(value, safe=safe)
+
+def presign_url(method, url, access_key, secret_key, region, expires, headers=None, now=None, service='s3'):
+    """
+    Query-string signed URL (AWS Signature Version 4) for S3-compatible
+    stores such as AWS S3 and MinIO. Every header in `headers` is signed and
+    must be sent unchanged with the request.
+    """
+    now = now or datetime.now(dt_timezone.utc)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    datestamp = now.strftime('%Y%m%d')
+    scope = f'{datestamp}/{region}/{service}/aws4_request'
+
+    parts = urlsplit(url)
+    signed = {'host': parts.netloc}
+    signed.update({name.lower(): str(value).strip() for name, value in (headers or {}).items()})
+    signed_names = ';'.join(sorted(signed))
+
+    query = {
+        'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
+        'X-Amz-Credential': f'{access_key}/{scope}',
+        'X-Amz-Date': amz_date,
+        'X-Amz-Expires': str(int(expires)),
+        'X-Amz-SignedHeaders': signed_names,
+    }
+    canonical_query = '&'.join(f'{_quote(name)}={_quote(value)}' for name, value in sorted(query.items()))
+    canonical_uri = _quote(parts.path or '/', safe='/-_.~')
+    canonical_request = '\n'.join([
+        method,
+        canonical_uri,
+        canonical_query,
+        ''.join(f'{name}:{signed[name]}\n' for name in sorted(signed)),
+        signed_names,
+        'UNSIGNED-PAYLOAD',
+    ])
+    string_to_sign = '\n'.join([
+        'AWS4-HMAC-SHA256',
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest(),
+    ])
+
+    signing_key = _hmac(f'AWS4{secret_key}'.encode(), datestamp)
+    for part in (region, service, 'aws4_request'):
+        signing_key = _hmac(signing_key, part)
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    return f'{parts.scheme}://{parts.netloc}{canonical_uri}?{canonical_query}&X-Amz-Signature={signature}'
+
+# ============ BACKENDS ============
+class FilesystemDirectBackend:
+    """
+    Local stand-in for an object store: the signed URL points at
+    uploads/direct/<token>/ on this server, which streams the body into
+    content-addressed storage. For development and tests.
+    """
+
+    def upload_instructions(self, intent, request):
+        token = signing.dumps(intent.id, salt=TOKEN_SALT)
+        url = request.build_absolute_uri(reverse('direct-upload', kwargs={'token': token}))
+        return {'method': 'PUT', 'url': url, 'headers': {'Content-Type': intent.content_type}}
+
+    def find_existing(self, digest, filename):
+        from .models import Blob
+
+        return Blob.objects.filter(digest=digest).values_list('name', flat=True).first()
+
+    def add_reference(self, name, intent):
+        add_reference(intent.sha256, name, intent.size)
+
+    def release_reference(self, name):
+        release_reference(name)
+
+    def receive(self, intent, stream, chunk_size=64 * 1024):
+        """Store an uploaded body, checking it against the intent's size and digest"""
+        hasher = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(suffix='.upload', dir=settings.FILE_UPLOAD_TEMP_DIR) as temp:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > intent.size:
+                    raise DirectUploadError('Upload is larger than declared')
+                hasher.update(chunk)
+                temp.write(chunk)
+
+            if size != intent.size or hasher.hexdigest() != intent.sha256:
+                raise DirectUploadError('Upload does not match the declared size and sha256')
+
+            temp.seek(0)
+            upload = File(temp, name=intent.filename)
+            upload.content_digest = intent.sha256
+            return content_addressed_storage.save(intent.filename, upload)
+
+    def verify(self, intent):
+        # The PUT view completes the intent itself
+        return False
+
+class S3DirectBackend:
+    """
+    Presigned PUTs to an S3-compatible bucket (UPLOADS_S3_*). Objects are
+    keyed by content, so a file already in the bucket is never uploaded
+    again. The signed Content-Length and x-amz-checksum-sha256 headers make
+    the store reject bodies that differ from what the intent declared.
+    """
+
+    def __init__(self):
+        self.endpoint = settings.UPLOADS_S3_ENDPOINT_URL.rstrip('/')
+        self.bucket = settings.UPLOADS_S3_BUCKET
+        self.region = settings.UPLOADS_S3_REGION
+        self.access_key = settings.UPLOADS_S3_ACCESS_KEY
+        self.secret_key = settings.UPLOADS_S3_SECRET_KEY
+
+    def object_url(self, key):
+        return f'{self.endpoint}/{self.bucket}/{key}'
+
+    def signed_url(self, method, key, expires, headers=None):
+        return presign_url(
+            method, self.object_url(key), self.access_key, self.secret_key,
+            self.region, expires, headers
+        )
+
+    def upload_instructions(self, intent, request):
+        headers = {
+            'Content-Type': intent.content_type,
+            'Content-Length': str(intent.size),
+            'x-amz-checksum-sha256': base64.b64encode(bytes.fromhex(intent.sha256)).decode(),
+        }
+        expires = settings.UPLOAD_INTENT_TTL
+        url = self.signed_url('PUT', content_addressed_storage.blob_name(intent.sha256, intent.filename), expires, headers)
+        return {'method': 'PUT', 'url': url, 'headers': headers}
+
+    def find_existing(self, digest, filename):
+        from .models import UploadIntent
+
+        name = f'{DIRECT_PREFIX}/{content_addressed_storage.blob_name(digest, filename)}'
+        if UploadIntent.objects.filter(stored_name=name).exclude(status='pending').exists():
+            return name
+        return None
+
+    def add_reference(self, name, intent):
+        # Bucket objects are shared by key; lifecycle rules handle cleanup
+        pass
+
+    def release_reference(self, name):
+        pass
+
+    def verify(self, intent):
+        """Name of the uploaded object once it is in the bucket with the declared size"""
+        key = content_addressed_storage.blob_name(intent.sha256, intent.filename)
+        request = urllib.request.Request(self.signed_url('HEAD', key, 60), method='HEAD')
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                size = int(response.headers.get('Content-Length', -1))
+        except urllib.error.HTTPError as error:
+            if error.code == 404:
+                return None
+            raise DirectUploadError(f'Object store returned {error.code}')
+        except urllib.error.URLError as error:
+            raise DirectUploadError(f'Object store unreachable: {error.reason}')
+        if size != intent.size:
+            raise DirectUploadError('Stored object does not match the declared size')
+        return f'{DIRECT_PREFIX}/{key}'
+
+    def url(self, name, expires=3600):
+        return self.signed_url('GET', name[len(DIRECT_PREFIX) + 1:], expires)
+
+BACKENDS = {
+    'filesystem': FilesystemDirectBackend,
+    's3': S3DirectBackend,
+}
+
+_backend = None
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        backend = getattr(settings, 'UPLOADS_DIRECT_BACKEND', 'filesystem')
+        _backend = (BACKENDS.get(backend) or import_string(backend))()
+    return _backend
+
+# ============ INTENTS ============
+def complete_intent(intent, stored_name):
+    """
+    Mark a pending intent completed. The intent owns one reference to the
+    stored file until it is attached or expires; returns False if another
+    request completed it first.
+    """
+    from .models import UploadIntent
+
+    completed = UploadIntent.objects.filter(id=intent.id, status='pending').update(
+        status='completed',
+        stored_name=stored_name
+    )
+    if completed:
+        intent.status = 'completed'
+        intent.stored_name = stored_name
+    else:
+        get_backend().release_reference(stored_name)
+    return bool(completed)
+
+def try_complete(intent):
+    """Complete a pending intent whose bytes have reached storage"""
+    if intent.status != 'pending':
+        return intent.status == 'completed'
+    backend = get_backend()
+    stored_name = backend.verify(intent)
+    if not stored_name:
+        return False
+    backend.add_reference(stored_name, intent)
+    if not complete_intent(intent, stored_name):
+        intent.refresh_from_db()
+    return intent.status == 'completed'
+
+def claim_upload(user, key):
+    """
+    Stored file name of the user's completed upload, marking it attached so
+    it cannot be attached twice. Call inside the transaction that saves the
+    object taking the file; the intent's storage reference moves to it.
+    """
+    from .models import UploadIntent
+
+    intent = UploadIntent.objects.filter(key=key, user=user).first()
+    if intent is None:
+        raise DirectUploadError('Upload not found')
+    if intent.status == 'attached':
+        raise DirectUploadError('Upload is already attached')
+    if intent.status == 'pending' and intent.is_expired:
+        raise DirectUploadError('Upload has expired')
+    if not try_complete(intent):
+        raise DirectUploadError('Upload has not finished')
+
+    claimed = UploadIntent.objects.filter(id=intent.id, status='completed').update(status='attached')
+    if not claimed:
+        raise DirectUploadError('Upload is already attached')
+    return intent.stored_name
+
+def expire_intents(now=None):
+    """Delete expired intents, releasing files that were uploaded but never attached"""
+    from .models import UploadIntent
+
+    now = now or timezone.now()
+    backend = get_backend()
+    expired = UploadIntent.objects.filter(
+        status__in=['pending', 'completed'], expires_at__lt=now
+    )
+    released = 0
+    for intent_id in expired.values_list('id', flat=True).iterator():
+        with transaction.atomic():
+            intent = UploadIntent.objects.select_for_update().filter(
+                id=intent_id, status__in=['pending', 'completed']
+            ).first()
+            if intent is None:
+                continue
+            if intent.status == 'completed':
+                backend.release_reference(intent.stored_name)
+                released += 1
+            intent.delete()
+    return released
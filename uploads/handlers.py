@@ -0,0 +1,31 @@
+# unitribe_server/uploads/handlers.py
+
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+class HashingMixin:
+    """
+    Hash the upload while it streams in and attach the hex digest to the
+    finished file as `content_digest`, so storage does not read it again.
+    """
+
+    def new_file(self, *args, **kwargs):
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.content_digest = self.hasher.hexdigest()
+        return uploaded
+
+class HashingMemoryFileUploadHandler(HashingMixin, MemoryFileUploadHandler):
+    pass
+
+class HashingTemporaryFileUploadHandler(HashingMixin, TemporaryFileUploadHandler):
+    pass
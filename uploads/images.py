@@ -0,0 +1,136 @@
+# unitribe_server/uploads/images.py
+
+import io
+import logging
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .storage import blob_digest, content_addressed_storage
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_PREFIX = 'derivatives'
+FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+QUALITY = 82
+
+# size name -> (width, height); every image is cropped to fill the box
+IMAGE_SIZES = {
+    'avatar': {'thumb': (48, 48), 'small': (96, 96), 'medium': (256, 256)},
+    'logo': {'small': (96, 96), 'medium': (256, 256)},
+    'banner': {'small': (640, 160), 'large': (1280, 320)},
+}
+
+# Fields that get derivatives: model label -> {field name: kind}
+IMAGE_FIELDS = {
+    'users.User': {'profile_picture': 'avatar'},
+    'clubs.Club': {'logo': 'logo', 'banner': 'banner'},
+}
+
+# Derivative names known to exist, so serializers skip the stat. Derivatives
+# are never rewritten, only removed with their blob.
+_known = set()
+MAX_KNOWN = 50000
+
+def source_digest(name):
+    """Content hash of a stored image - only content-addressed files have derivatives"""
+    return blob_digest(name)
+
+def derivative_name(digest, size, extension):
+    width, height = size
+    return f'{DERIVATIVE_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}_{width}x{height}.{extension}'
+
+def derivative_exists(name):
+    if name in _known:
+        return True
+    if not content_addressed_storage.exists(name):
+        return False
+    if len(_known) >= MAX_KNOWN:
+        _known.clear()
+    _known.add(name)
+    return True
+
+def derivatives_ready(name, kind):
+    digest = source_digest(name)
+    if not digest:
+        return False
+    return all(
+        derivative_exists(derivative_name(digest, size, extension))
+        for size in IMAGE_SIZES[kind].values()
+        for extension in FORMATS
+    )
+
+def derivative_urls(name, kind):
+    """{size: {format: url}} once the derivatives exist, otherwise None"""
+    digest = source_digest(name)
+    if not digest:
+        return None
+    
+    urls = {}
+    for size_name, size in IMAGE_SIZES[kind].items():
+        names = {extension: derivative_name(digest, size, extension) for extension in FORMATS}
+        # The JPEG is written last, so it marks the size as complete
+        if not derivative_exists(names['jpeg']):
+            return None
+        urls[size_name] = {
+            extension: content_addressed_storage.url(name) for extension, name in names.items()
+        }
+    return urls
+
+def generate_derivatives(name, kind):
+    """Write any missing derivatives of a stored image; returns how many were written"""
+    digest = source_digest(name)
+    if not digest:
+        return 0
+    
+    missing = [
+        size for size in IMAGE_SIZES[kind].values()
+        if not all(derivative_exists(derivative_name(digest, size, extension)) for extension in FORMATS)
+    ]
+    if not missing:
+        return 0
+    
+    try:
+        with content_addressed_storage.open(name) as source:
+            image = Image.open(source)
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (FileNotFoundError, UnidentifiedImageError, OSError) as error:
+        logger.warning('Cannot make derivatives of %s: %s', name, error)
+        return 0
+    
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    
+    written = 0
+    for size in missing:
+        resized = ImageOps.fit(image, size, method=Image.Resampling.LANCZOS)
+        for extension, image_format in FORMATS.items():
+            output = resized
+            if image_format == 'JPEG' and output.mode == 'RGBA':
+                # JPEG has no alpha; flatten onto white
+                background = Image.new('RGB', output.size, (255, 255, 255))
+                background.paste(output, mask=output.getchannel('A'))
+                output = background
+            buffer = io.BytesIO()
+            output.save(buffer, format=image_format, quality=QUALITY, optimize=True)
+            content_addressed_storage.write_file(derivative_name(digest, size, extension), buffer)
+            written += 1
+    return written
+
+def delete_derivatives(digest):
+    """Remove every derivative of a blob - for prune_blobs"""
+    for sizes in IMAGE_SIZES.values():
+        for size in sizes.values():
+            for extension in FORMATS:
+                name = derivative_name(digest, size, extension)
+                _known.discard(name)
+                content_addressed_storage.delete_blob(name)
+
+def schedule_derivatives(sender, instance, **kwargs):
+    """post_save: make derivatives in the background for new images"""
+    from unitribe_server.background import run_in_background
+    
+    for field_name, kind in IMAGE_FIELDS[sender._meta.label].items():
+        name = getattr(instance, field_name).name
+        if source_digest(name) and not derivatives_ready(name, kind):
+            run_in_background(generate_derivatives, name, kind)
@@ -0,0 +1,48 @@
+#unitribe_server/uploads/management/commands/generate_image_derivatives.py
+
+import os
+
+from django.apps import apps
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from uploads.images import IMAGE_FIELDS, derivatives_ready, generate_derivatives, source_digest
+
+class Command(BaseCommand):
+    help = 'Generate missing resized copies of profile pictures, club logos and banners'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--adopt-legacy',
+            action='store_true',
+            help='Copy images stored before content addressing into blob storage first '
+                 '(the old files are left in place)'
+        )
+    
+    def handle(self, *args, **options):
+        generated = 0
+        adopted = 0
+        skipped = 0
+        
+        for label, fields in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for field_name, kind in fields.items():
+                storage = model._meta.get_field(field_name).storage
+                rows = model.objects.exclude(**{f'{field_name}__isnull': True}).exclude(**{field_name: ''})
+                
+                for pk, name in rows.values_list('pk', field_name).iterator():
+                    if not source_digest(name):
+                        if not options['adopt_legacy'] or not storage.exists(name):
+                            skipped += 1
+                            continue
+                        with storage.open(name) as legacy:
+                            name = storage.save(os.path.basename(name), File(legacy))
+                        model.objects.filter(pk=pk).update(**{field_name: name})
+                        adopted += 1
+                    
+                    if not derivatives_ready(name, kind):
+                        generated += generate_derivatives(name, kind)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {generated} derivatives, adopted {adopted} legacy images, skipped {skipped}'
+        ))
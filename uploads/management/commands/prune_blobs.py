@@ -0,0 +1,66 @@
+#unitribe_server/uploads/management/commands/prune_blobs.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from uploads.direct import expire_intents
+from uploads.images import delete_derivatives
+from uploads.models import Blob, UploadIntent
+from uploads.storage import content_addressed_storage
+
+class Command(BaseCommand):
+    help = 'Delete expired upload intents and stored blobs that nothing references any more'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=int,
+            default=24,
+            help='Only prune blobs unreferenced for at least this long (default: 24)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be deleted without actually deleting'
+        )
+    
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        candidates = Blob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff)
+        
+        if options['dry_run']:
+            expired = UploadIntent.objects.filter(
+                status__in=['pending', 'completed'], expires_at__lt=timezone.now()
+            ).count()
+            self.stdout.write(f'Would expire {expired} upload intents')
+            total = sum(candidates.values_list('size', flat=True))
+            self.stdout.write(f'Would prune {candidates.count()} blobs ({total / 1024 / 1024:.1f} MB)')
+            return
+        
+        # Unattached uploads give up their reference first, so their blobs
+        # are pruned once the grace period has passed
+        released = expire_intents()
+        self.stdout.write(f'Released {released} unattached uploads')
+        
+        pruned = 0
+        freed = 0
+        for blob_id in candidates.values_list('id', flat=True).iterator():
+            with transaction.atomic():
+                # Lock and re-check: an upload of the same bytes may have
+                # taken a new reference since the candidate query
+                blob = Blob.objects.select_for_update().filter(
+                    id=blob_id, ref_count__lte=0
+                ).first()
+                if blob is None:
+                    continue
+                blob.delete()
+                for name in content_addressed_storage.blob_files(blob.digest):
+                    content_addressed_storage.delete_blob(name)
+                delete_derivatives(blob.digest)
+            pruned += 1
+            freed += blob.size
+        
+        self.stdout.write(self.style.SUCCESS(f'Pruned {pruned} blobs ({freed / 1024 / 1024:.1f} MB)'))
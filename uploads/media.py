@@ -0,0 +1,224 @@
+# unitribe_server/uploads/media.py
+
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, quote_etag
+
+from .images import DERIVATIVE_PREFIX
+from .storage import BLOB_PREFIX
+
+ACCESS_CACHE_TIMEOUT = 300
+STREAM_CHUNK_SIZE = 256 * 1024
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Types browsers may render inline; anything else downloads, so an uploaded
+# HTML or SVG file can never run script on this origin
+INLINE_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp', 'application/pdf')
+INLINE_PREFIXES = ('video/', 'audio/')
+
+# Files only ever used for avatars, logos and banners - shown to anyone
+PUBLIC_PREFIXES = (f'{DERIVATIVE_PREFIX}/', 'profile_pics/', 'club_logos/', 'club_banners/')
+
+def media_access(name):
+    """
+    Who may read a stored file: 'public', 'authenticated' (post files, which
+    every signed-in user can see), 'participants' (message attachments) or
+    None when nothing references it. A blob shared by several objects gets
+    the most open of their levels.
+    """
+    if name.startswith(PUBLIC_PREFIXES):
+        return 'public'
+    if not name.startswith((f'{BLOB_PREFIX}/', 'post_files/', 'message_files/')):
+        return None
+    
+    cache_key = f'media_access:{name}'
+    access = cache.get(cache_key)
+    if access is None:
+        access = _lookup_access(name) or ''
+        cache.set(cache_key, access, ACCESS_CACHE_TIMEOUT)
+    return access or None
+
+def _lookup_access(name):
+    from clubs.models import Club
+    from messaging.models import Message
+    from posts.models import Post
+    from users.models import User
+    
+    if (
+        User.objects.filter(profile_picture=name).exists()
+        or Club.objects.filter(logo=name).exists()
+        or Club.objects.filter(banner=name).exists()
+    ):
+        return 'public'
+    if Post.objects.filter(file=name).exists():
+        return 'authenticated'
+    if Message.objects.filter(file=name).exists():
+        return 'participants'
+    return None
+
+def owns_file(user, name):
+    """Whether the user uploaded the stored file themselves - an upload, post, message or avatar"""
+    from messaging.models import Message
+    from posts.models import Post
+    from .models import UploadIntent
+    
+    return (
+        user.profile_picture.name == name
+        or UploadIntent.objects.filter(user=user, stored_name=name).exclude(status='pending').exists()
+        or Post.objects.filter(author=user, file=name).exists()
+        or Message.objects.filter(sender=user, file=name).exists()
+    )
+
+def can_read(user, name):
+    access = media_access(name)
+    if access == 'public':
+        return True
+    if not user or not user.is_authenticated:
+        return False
+    if access == 'authenticated':
+        return True
+    if access == 'participants':
+        from messaging.models import Message
+        
+        cache_key = f'media_access:{name}:{user.id}'
+        allowed = cache.get(cache_key)
+        if allowed is None:
+            allowed = Message.objects.filter(
+                file=name, conversation__participants=user
+            ).exists()
+            cache.set(cache_key, allowed, ACCESS_CACHE_TIMEOUT)
+        return allowed
+    return False
+
+def _etag(name, stat):
+    # Blob names carry their sha256; legacy files fall back to mtime and size
+    base = os.path.splitext(os.path.basename(name))[0]
+    if name.startswith((f'{BLOB_PREFIX}/', f'{DERIVATIVE_PREFIX}/')):
+        return quote_etag(base)
+    return quote_etag(f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return etag in [tag.strip().removeprefix('W/') for tag in header.split(',')]
+
+def _parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable range, 'invalid' or None"""
+    match = RANGE_PATTERN.match(header.replace(' ', ''))
+    if not match:
+        # Multiple ranges or other units: serve the whole file
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return 'invalid'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return 'invalid'
+    return start, end
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        while length > 0:
+            chunk = source.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def serve_media(request, name, access):
+    """
+    Response for an authorized file. With MEDIA_SENDFILE set, the front
+    proxy sends the bytes (nginx X-Accel-Redirect or X-Sendfile); otherwise
+    the file is streamed here with Range and conditional request support.
+    """
+    path = os.path.join(settings.MEDIA_ROOT, name)
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    
+    content_type, encoding = mimetypes.guess_type(name)
+    content_type = content_type or 'application/octet-stream'
+    etag = _etag(name, stat)
+    
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': (
+            f"{'public' if access == 'public' else 'private'}, max-age=31536000, immutable"
+            if name.startswith((f'{BLOB_PREFIX}/', f'{DERIVATIVE_PREFIX}/'))
+            else f"{'public' if access == 'public' else 'private'}, max-age=3600"
+        ),
+        'X-Content-Type-Options': 'nosniff',
+        'Accept-Ranges': 'bytes',
+    }
+    if access != 'public':
+        headers['Vary'] = 'Authorization'
+    if not (content_type in INLINE_TYPES or content_type.startswith(INLINE_PREFIXES)):
+        headers['Content-Disposition'] = f'attachment; filename="{os.path.basename(name)}"'
+    if encoding:
+        # Stored as-is - a .gz download must not be decoded by the browser
+        content_type = 'application/octet-stream'
+    
+    if _etag_matches(request.headers.get('If-None-Match'), etag):
+        response = HttpResponseNotModified()
+        for header in ('ETag', 'Cache-Control', 'Last-Modified', 'Vary'):
+            if header in headers:
+                response[header] = headers[header]
+        return response
+    
+    sendfile = getattr(settings, 'MEDIA_SENDFILE', '')
+    if sendfile:
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'nginx':
+            response['X-Accel-Redirect'] = settings.MEDIA_SENDFILE_PREFIX.rstrip('/') + '/' + name
+        else:
+            response['X-Sendfile'] = path
+        for header, value in headers.items():
+            response[header] = value
+        # The proxy answers Range requests itself
+        return response
+    
+    size = stat.st_size
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and request.method == 'GET':
+        if_range = request.headers.get('If-Range')
+        if not if_range or if_range.strip() == etag:
+            byte_range = _parse_range(range_header, size)
+    
+    if byte_range == 'invalid':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type, status=206 if byte_range else 200)
+    else:
+        response = StreamingHttpResponse(
+            _read_range(path, start, length),
+            content_type=content_type,
+            status=206 if byte_range else 200
+        )
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(length)
+    for header, value in headers.items():
+        response[header] = value
+    return response
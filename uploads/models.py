@@ -0,0 +1,65 @@
+# unitribe_server/uploads/models.py
+
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+from users.models import User
+
+class Blob(models.Model):
+    """
+    One stored file, shared by every field that uploaded the same bytes.
+    `ref_count` is the number of model fields pointing at it; blobs at zero
+    are removed by the prune_blobs command.
+    """
+    digest = models.CharField(max_length=64, unique=True)  # SHA-256 hex
+    name = models.CharField(max_length=255)  # storage path
+    size = models.BigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='uploads_blob_name_idx'),
+            models.Index(fields=['ref_count', 'updated_at'], name='uploads_blob_unref_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.ref_count} refs)"
+
+class UploadIntent(models.Model):
+    """
+    A file the client uploads straight to storage. The intent is created
+    first, the client PUTs the bytes to the signed URL, and a post or
+    message then attaches the result by `key`.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('completed', 'Completed'),
+        ('attached', 'Attached'),
+    ]
+    
+    key = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_intents')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    stored_name = models.CharField(max_length=255, blank=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='uploads_intent_expiry_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+    
+    @property
+    def is_expired(self):
+        return timezone.now() >= self.expires_at
@@ -0,0 +1,88 @@
+# unitribe_server/uploads/serializers.py
+
+import re
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+
+from .direct import DirectUploadError, claim_upload
+from .images import derivative_urls
+from .models import UploadIntent
+from .storage import content_addressed_storage
+
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+class UploadIntentSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UploadIntent
+        fields = ('key', 'filename', 'content_type', 'size', 'sha256', 'status', 'expires_at', 'url')
+        read_only_fields = ('key', 'status', 'expires_at', 'url')
+    
+    def get_url(self, obj):
+        if obj.status == 'pending' or not obj.stored_name:
+            return None
+        return content_addressed_storage.url(obj.stored_name)
+    
+    def validate_sha256(self, value):
+        value = value.lower()
+        if not SHA256_PATTERN.match(value):
+            raise serializers.ValidationError('sha256 must be a hex digest of the file')
+        return value
+    
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('File is empty')
+        if value > settings.UPLOADS_DIRECT_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'File exceeds {settings.UPLOADS_DIRECT_MAX_SIZE // (1024 * 1024)}MB limit'
+            )
+        return value
+
+class DirectUploadMixin(serializers.Serializer):
+    """
+    Accepts `upload_key` from a finished upload intent in place of a file
+    in the request body; the object's `file` then points at the upload.
+    """
+    upload_key = serializers.UUIDField(write_only=True, required=False)
+    
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs.get('upload_key') and attrs.get('file'):
+            raise serializers.ValidationError('Send either file or upload_key, not both')
+        return attrs
+    
+    def create(self, validated_data):
+        upload_key = validated_data.pop('upload_key', None)
+        if upload_key is None:
+            return super().create(validated_data)
+        
+        with transaction.atomic():
+            try:
+                validated_data['file'] = claim_upload(self.context['request'].user, upload_key)
+            except DirectUploadError as error:
+                raise serializers.ValidationError({'upload_key': str(error)})
+            return super().create(validated_data)
+
+class ImageSizesField(serializers.Field):
+    """
+    Resized WebP/JPEG URLs of an image field, {size: {format: url}}, or
+    null until they have been generated - fall back to the original then.
+    """
+    
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        urls = derivative_urls(value.name, self.kind)
+        request = self.context.get('request')
+        if urls and request is not None:
+            urls = {
+                size: {extension: request.build_absolute_uri(url) for extension, url in formats.items()}
+                for size, formats in urls.items()
+            }
+        return urls
@@ -0,0 +1,67 @@
+# unitribe_server/uploads/signals.py
+
+from django.apps import apps
+from django.db.models import FileField
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from .images import IMAGE_FIELDS, schedule_derivatives
+from .storage import ContentAddressedStorage, release_reference
+
+def blob_fields(model):
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+def remember_files(sender, instance, **kwargs):
+    # Names as loaded, to spot replaced files on save without a query
+    instance._blob_originals = {
+        attname: instance.__dict__.get(attname) for attname in sender._blob_fields
+    }
+
+def remember_written_files(sender, instance, update_fields=None, **kwargs):
+    # Fields whose file the save is about to store, each adding a reference
+    instance._blob_written = {
+        attname for attname in sender._blob_fields
+        if (update_fields is None or attname in update_fields)
+        and getattr(instance, attname) and not getattr(instance, attname)._committed
+    }
+
+def release_replaced_files(sender, instance, **kwargs):
+    originals = getattr(instance, '_blob_originals', {})
+    written = getattr(instance, '_blob_written', set())
+    for attname in sender._blob_fields:
+        current = getattr(instance, attname)
+        current_name = current.name if current else None
+        original = originals.get(attname)
+        original_name = getattr(original, 'name', original)
+        # The same bytes saved back onto the field store under the same
+        # name and add a second reference; the original one goes
+        if original_name and (original_name != current_name or attname in written):
+            release_reference(original_name)
+    instance._blob_written = set()
+    remember_files(sender, instance)
+
+def release_deleted_files(sender, instance, **kwargs):
+    for attname in sender._blob_fields:
+        value = getattr(instance, attname)
+        if value:
+            release_reference(value.name)
+
+def connect_reference_tracking():
+    """Keep Blob.ref_count in step for every model with a content-addressed file field"""
+    for model in apps.get_models():
+        fields = blob_fields(model)
+        if not fields:
+            continue
+        model._blob_fields = fields
+        post_init.connect(remember_files, sender=model, dispatch_uid=f'uploads_init_{model._meta.label}')
+        pre_save.connect(remember_written_files, sender=model, dispatch_uid=f'uploads_pre_save_{model._meta.label}')
+        post_save.connect(release_replaced_files, sender=model, dispatch_uid=f'uploads_save_{model._meta.label}')
+        post_delete.connect(release_deleted_files, sender=model, dispatch_uid=f'uploads_delete_{model._meta.label}')
+
+def connect_image_derivatives():
+    """Make resized copies of newly saved profile pictures, logos and banners"""
+    for label in IMAGE_FIELDS:
+        model = apps.get_model(label)
+        post_save.connect(schedule_derivatives, sender=model, dispatch_uid=f'uploads_images_{label}')
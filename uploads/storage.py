@@ -0,0 +1,166 @@
+# unitribe_server/uploads/storage.py
+
+import hashlib
+import os
+import tempfile
+
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs'
+# Objects uploaded straight to the object store (uploads.direct)
+DIRECT_PREFIX = 'direct'
+HASH_CHUNK_SIZE = 64 * 1024
+
+def hash_content(content):
+    """(sha256 hex digest, size) of a file, from the upload handler when it already hashed it"""
+    digest = getattr(content, 'content_digest', None)
+    if digest and content.size is not None:
+        return digest, content.size
+
+    hasher = hashlib.sha256()
+    size = 0
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        hasher.update(chunk)
+        size += len(chunk)
+    return hasher.hexdigest(), size
+
+def blob_digest(name):
+    """Content hash in a blob's stored name, whatever its extension"""
+    if not name or not name.startswith(f'{BLOB_PREFIX}/'):
+        return None
+    return os.path.splitext(os.path.basename(name))[0]
+
+def add_reference(digest, name, size):
+    """
+    Count one more field pointing at the blob, creating its row on first
+    use. Returns the blob's stored name - the first upload's, so the same
+    bytes under another extension share its file.
+    """
+    from .models import Blob
+
+    with transaction.atomic():
+        # Waits on prune_blobs if it holds the row, so a blob being pruned is
+        # either kept alive here or re-created below
+        updated = Blob.objects.filter(digest=digest).update(
+            ref_count=F('ref_count') + 1,
+            updated_at=timezone.now()
+        )
+        if updated:
+            return Blob.objects.filter(digest=digest).values_list('name', flat=True).get()
+        blob, created = Blob.objects.get_or_create(
+            digest=digest,
+            defaults={'name': name, 'size': size, 'ref_count': 1}
+        )
+        if not created:
+            Blob.objects.filter(digest=digest).update(ref_count=F('ref_count') + 1)
+        return blob.name
+
+def release_reference(name):
+    """Count one field fewer pointing at the blob stored as `name`"""
+    from .models import Blob
+
+    digest = blob_digest(name)
+    if not digest:
+        return
+    # By digest: files saved before blobs kept one name may carry another extension
+    Blob.objects.filter(digest=digest).update(
+        ref_count=F('ref_count') - 1,
+        updated_at=timezone.now()
+    )
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each distinct file once, at blobs/ab/cd/<sha256><ext>.
+
+    Saving a file whose bytes are already stored writes nothing and returns
+    the existing name (Blob.name, whatever the new file's extension); every
+    save adds a reference to the shared Blob row.
+    Files saved before this storage was introduced keep their old names and
+    are served as before.
+    """
+
+    def blob_name(self, digest, name):
+        extension = os.path.splitext(name)[1].lower()
+        return f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+    def get_available_name(self, name, max_length=None):
+        # The name is derived from the content in _save; never rename
+        return name
+
+    def _save(self, name, content):
+        digest, size = hash_content(content)
+        name = add_reference(digest, self.blob_name(digest, name), size)
+        if not self.exists(name):
+            self._write(name, content)
+        return name
+
+    def _write(self, name, content):
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, mode=self.directory_permissions_mode or 0o777, exist_ok=True)
+
+        # Write beside the target and rename into place, so a concurrent
+        # upload of the same bytes never sees a partial file
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            if hasattr(content, 'temporary_file_path'):
+                os.close(descriptor)
+                file_move_safe(content.temporary_file_path(), temp_path, allow_overwrite=True)
+            else:
+                with os.fdopen(descriptor, 'wb') as destination:
+                    if hasattr(content, 'seek'):
+                        content.seek(0)
+                    for chunk in content.chunks():
+                        destination.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def url(self, name):
+        if name and name.startswith(f'{DIRECT_PREFIX}/'):
+            from .direct import get_backend
+            return get_backend().url(name)
+        return super().url(name)
+
+    def write_file(self, name, content):
+        """Write content under an exact name, e.g. a derivative of a blob"""
+        self._write(name, File(content))
+
+    def delete(self, name):
+        # Blobs are shared; only prune_blobs removes them, once unreferenced
+        if name and name.startswith((f'{BLOB_PREFIX}/', f'{DIRECT_PREFIX}/')):
+            return
+        super().delete(name)
+    
+    def blob_files(self, digest):
+        """Stored files of a blob - more than one when the same bytes were saved
+        under other extensions before blobs kept the Blob row's name"""
+        directory = f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}'
+        try:
+            _, files = self.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return [f'{directory}/{name}' for name in files if os.path.splitext(name)[0] == digest]
+
+    def delete_blob(self, name):
+        """Remove a blob file - for prune_blobs, once nothing references it"""
+        super().delete(name)
+
+content_addressed_storage = ContentAddressedStorage()
+
+def get_blob_storage():
+    """Storage callable for FileField(storage=...), keeps migrations free of storage details"""
+    return content_addressed_storage
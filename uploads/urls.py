@@ -0,0 +1,10 @@
+# unitribe_server/uploads/urls.py
+
+from django.urls import path
+from .views import DirectUploadView, UploadIntentCompleteView, UploadIntentCreateView
+
+urlpatterns = [
+    path('intents/', UploadIntentCreateView.as_view(), name='upload-intent-create'),
+    path('intents/<uuid:key>/complete/', UploadIntentCompleteView.as_view(), name='upload-intent-complete'),
+    path('direct/<str:token>/', DirectUploadView.as_view(), name='direct-upload'),
+]
@@ -0,0 +1,134 @@
+# unitribe_server/uploads/views.py
+
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .media import can_read, media_access, owns_file, serve_media
+from .direct import TOKEN_SALT, DirectUploadError, complete_intent, get_backend, try_complete
+from .models import UploadIntent
+from .serializers import UploadIntentSerializer
+
+class UploadIntentCreateView(APIView):
+    """
+    Start a direct upload. Send filename, content_type, size and sha256;
+    PUT the file to `upload.url` with `upload.headers`, then attach it to a
+    post or message by `key`. Files the user has uploaded before come back
+    completed, with no upload needed.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        serializer = UploadIntentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        intent = serializer.save(
+            user=request.user,
+            expires_at=timezone.now() + timedelta(seconds=settings.UPLOAD_INTENT_TTL)
+        )
+        
+        backend = get_backend()
+        upload = None
+        existing = backend.find_existing(intent.sha256, intent.filename)
+        # A declared hash proves nothing - anyone else's copy must be uploaded
+        # and checked, or knowing a file's sha256 would be enough to claim it
+        if existing and owns_file(request.user, existing):
+            backend.add_reference(existing, intent)
+            complete_intent(intent, existing)
+        else:
+            upload = backend.upload_instructions(intent, request)
+        
+        data = UploadIntentSerializer(intent).data
+        data['upload'] = upload
+        return Response(data, status=status.HTTP_201_CREATED)
+
+class UploadIntentCompleteView(APIView):
+    """Confirm the file reached storage - optional, attaching also checks"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, key):
+        intent = get_object_or_404(UploadIntent, key=key, user=request.user)
+        if intent.status == 'pending' and intent.is_expired:
+            return Response({'error': 'Upload has expired'}, status=status.HTTP_410_GONE)
+        
+        try:
+            completed = try_complete(intent)
+        except DirectUploadError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        if not completed and intent.status == 'pending':
+            return Response({'error': 'Upload has not finished'}, status=status.HTTP_409_CONFLICT)
+        
+        return Response(UploadIntentSerializer(intent).data)
+
+class DirectUploadView(APIView):
+    """
+    Receives the PUT for the filesystem backend, standing in for the object
+    store. The signed token is the only credential, as with a presigned URL.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = []
+    
+    def put(self, request, token):
+        try:
+            intent_id = signing.loads(token, salt=TOKEN_SALT, max_age=settings.UPLOAD_INTENT_TTL)
+        except signing.BadSignature:
+            return Response({'error': 'Invalid or expired upload URL'}, status=status.HTTP_403_FORBIDDEN)
+        
+        intent = UploadIntent.objects.filter(id=intent_id, status='pending').first()
+        if intent is None or intent.is_expired:
+            return Response({'error': 'Upload is no longer pending'}, status=status.HTTP_409_CONFLICT)
+        
+        backend = get_backend()
+        try:
+            stored_name = backend.receive(intent, request.stream)
+        except DirectUploadError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        complete_intent(intent, stored_name)
+        
+        return Response({'status': 'completed'})
+
+class MediaTokenAuthentication(JWTAuthentication):
+    """JWT from the Authorization header, or ?token= for <img> and <video> tags"""
+    
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is not None:
+            return super().authenticate(request)
+        raw_token = request.query_params.get('token')
+        if not raw_token:
+            return None
+        validated_token = self.get_validated_token(raw_token.encode())
+        return self.get_user(validated_token), validated_token
+
+class MediaView(APIView):
+    """
+    Serves uploaded files after checking access: avatars, logos and banners
+    are public, post files need a signed-in user, and message attachments
+    only go to the conversation's participants.
+    """
+    authentication_classes = [MediaTokenAuthentication]
+    permission_classes = [permissions.AllowAny]
+    # Pages load many images at once - kept off the request quotas
+    throttle_classes = []
+    
+    def get(self, request, name):
+        name = os.path.normpath(name)
+        if name.startswith(('..', '/')) or os.path.isabs(name):
+            raise Http404
+        
+        # Unknown and forbidden files look the same, so names cannot be probed
+        if not can_read(request.user, name):
+            raise Http404
+        response = serve_media(request, name, media_access(name))
+        if response is None:
+            raise Http404
+        return response
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:40
+
+import uploads.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_alter_user_email_verification_token'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=uploads.storage.get_blob_storage, upload_to='profile_pics/'),
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 import uuid
 from django.utils import timezone
+from uploads.storage import get_blob_storage
 
 class CustomUserManager(BaseUserManager):
     """Custom manager for User model with email-based auth"""
@@ -45,7 +46,7 @@ class User(AbstractUser):
     student_id = models.CharField(max_length=20, blank=True, null=True, unique=True)
     department = models.CharField(max_length=100, blank=True)
     bio = models.TextField(blank=True)
-    profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    profile_picture = models.ImageField(upload_to='profile_pics/', storage=get_blob_storage, blank=True, null=True)
     interests = models.TextField(blank=True)
 
     # ✅ Email verification fields
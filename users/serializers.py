@@ -8,28 +8,33 @@ from django.contrib.auth import get_user_model
 from .models import User
 import uuid
 from django.utils import timezone
+from uploads.serializers import ImageSizesField
 
 User = get_user_model()
 
 # ============ BASIC SERIALIZERS (for other apps) ============
 class UserBasicSerializer(serializers.ModelSerializer):
     """Basic user info serializer for nested relationships"""
+    profile_picture_sizes = ImageSizesField('avatar', source='profile_picture')
+    
     class Meta:
         model = User
         fields = [
             'id', 'username', 'email', 'first_name', 'last_name',
             'role', 'student_id', 'department', 'profile_picture',
-            'is_verified'
+            'profile_picture_sizes', 'is_verified'
         ]
         read_only_fields = fields
 
 class UserMinimalSerializer(serializers.ModelSerializer):
     """Minimal user info for lists and search results"""
+    profile_picture_sizes = ImageSizesField('avatar', source='profile_picture')
+    
     class Meta:
         model = User
         fields = [
             'id', 'username', 'first_name', 'last_name',
-            'role', 'department', 'profile_picture'
+            'role', 'department', 'profile_picture', 'profile_picture_sizes'
         ]
         read_only_fields = fields
 
@@ -196,12 +201,14 @@ class UserLoginResponseSerializer(serializers.ModelSerializer):
 # ============ PROFILE SERIALIZERS ============
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile (GET/PUT)"""
+    profile_picture_sizes = ImageSizesField('avatar', source='profile_picture')
+    
     class Meta:
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name',
             'role', 'student_id', 'department', 'bio',
-            'profile_picture', 'interests', 'is_verified',
+            'profile_picture', 'profile_picture_sizes', 'interests', 'is_verified',
             'show_email', 'show_profile', 'date_joined',
             'created_at', 'updated_at'
         ]